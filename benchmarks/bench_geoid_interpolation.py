@@ -0,0 +1,70 @@
+"""Time of removing the geoid from a 10,000 x 10,000 DEM with a gdal warp vs. the separable numpy interpolation.
+
+Interpolates a synthetic 1 arcminute geoid (as `egm_08`) with cubic resampling onto a `glo_30`-like grid (1 arcsecond)
+and adds it to the DEM, (1) as `remove_geoid` did previously, warping the geoid with gdal into a new array and adding
+it to the DEM into a third one, and (2) with the separable interpolation added into the DEM in place. Elevations are
+up to 1,000 m, so differences of the outputs within float32 rounding are up to ~1e-4 m. Run from the top of the repo:
+
+    python benchmarks/bench_geoid_interpolation.py
+"""
+
+import time
+
+import numpy as np
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+
+from dem_stitcher.geoid import _add_separable_geoid_offset
+from dem_stitcher.rio_tools import reproject_arr_to_match_profile
+
+
+SIZE = 10_000
+N_REPEATS = 3
+
+
+def get_profile(res: float, size: int, lon: float, lat: float) -> dict:
+    return {
+        'driver': 'GTiff',
+        'dtype': 'float32',
+        'nodata': np.nan,
+        'count': 1,
+        'width': size,
+        'height': size,
+        'crs': CRS.from_epsg(4326),
+        'transform': from_origin(lon, lat, res, res),
+    }
+
+
+def main() -> None:
+    dem_profile = get_profile(1 / 3600, SIZE, 10, 50)
+    # Window of the geoid covering the DEM with a buffer of 2 pixels (as read by `remove_geoid`)
+    geoid_size = SIZE // 60 + 5
+    geoid_profile = get_profile(1 / 60, geoid_size, 10 - 2 / 60, 50 + 2 / 60)
+    rng = np.random.default_rng(0)
+    geoid_arr = (rng.normal(size=(1, geoid_size, geoid_size)).cumsum(axis=1).cumsum(axis=2) / 10 + 40).astype(
+        np.float32
+    )
+    dem_arr = rng.uniform(0, 1_000, size=(1, SIZE, SIZE)).astype(np.float32)
+
+    elapsed_gdal = []
+    for _ in range(N_REPEATS):
+        start = time.perf_counter()
+        geoid_offset, _ = reproject_arr_to_match_profile(geoid_arr, geoid_profile, dem_profile, resampling='cubic')
+        dem_gdal = dem_arr + geoid_offset
+        elapsed_gdal.append(time.perf_counter() - start)
+        del geoid_offset
+
+    elapsed_separable = []
+    for _ in range(N_REPEATS):
+        dem_separable = dem_arr.copy()
+        start = time.perf_counter()
+        _add_separable_geoid_offset(dem_separable, dem_profile, geoid_arr, geoid_profile, 'cubic')
+        elapsed_separable.append(time.perf_counter() - start)
+
+    max_diff = float(np.max(np.abs(dem_separable - dem_gdal)))
+    print(f'{"gdal warp (s)":>14} {"separable (s)":>14} {"max abs diff (m)":>17}')
+    print(f'{min(elapsed_gdal):14.2f} {min(elapsed_separable):14.2f} {max_diff:17.2e}')
+
+
+if __name__ == '__main__':
+    main()
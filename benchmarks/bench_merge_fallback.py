@@ -0,0 +1,89 @@
+"""Time of merging unaligned arrays through in-memory GTiffs (previous fallback) vs. gdal MEM datasets.
+
+Merges (1) a 3600 x 3600 `glo_30`-like array with the adjacent 1200 x 1200 `glo_90`-like array, as when missing
+`glo_30` tiles are filled, and (2) two 3600 x 3600 arrays offset by half a pixel, as when tiles with different
+Area/Point registration (e.g. translated across the dateline) are merged. Run from the top of the repo:
+
+    python benchmarks/bench_merge_fallback.py
+"""
+
+import time
+
+import numpy as np
+import rasterio
+from rasterio.crs import CRS
+from rasterio.enums import Resampling
+from rasterio.io import MemoryFile
+from rasterio.merge import merge
+from rasterio.transform import from_origin
+
+from dem_stitcher.merge import merge_arrays_with_geometadata
+from dem_stitcher.rio_tools import in_memory_profile
+
+
+N_REPEATS = 3
+
+
+def get_profile(lon: float, lat: float, size: int) -> dict:
+    return {
+        'driver': 'GTiff',
+        'dtype': 'float32',
+        'nodata': np.nan,
+        'count': 1,
+        'width': size,
+        'height': size,
+        'crs': CRS.from_epsg(4326),
+        'transform': from_origin(lon, lat + 1, 1 / size, 1 / size),
+        'compress': 'deflate',
+        'tiled': True,
+    }
+
+
+def get_cases() -> dict[str, tuple[list[np.ndarray], list[dict]]]:
+    rng = np.random.default_rng(0)
+    glo_30 = rng.normal(size=(1, 3600, 3600)).cumsum(axis=2).astype(np.float32)
+    glo_90 = rng.normal(size=(1, 1200, 1200)).cumsum(axis=2).astype(np.float32)
+    profile_shifted = get_profile(0, 0, 3600)
+    profile_shifted['transform'] = from_origin(1 - 0.5 / 3600, 1 + 0.5 / 3600, 1 / 3600, 1 / 3600)
+    return {
+        'glo_30 + glo_90': ([glo_30, glo_90], [get_profile(0, 0, 3600), get_profile(1, 0, 1200)]),
+        'half pixel offset': ([glo_30, glo_30.copy()], [get_profile(0, 0, 3600), profile_shifted]),
+    }
+
+
+def merge_with_gtiff_memory_files(arrays: list[np.ndarray], profiles: list[dict]) -> tuple[np.ndarray, object]:
+    memfiles = [MemoryFile() for _ in profiles]
+    datasets = [mfile.open(**in_memory_profile(p)) for (mfile, p) in zip(memfiles, profiles)]
+    [ds.write(arr) for (ds, arr) in zip(datasets, arrays)]
+    merged = merge(datasets, resampling=Resampling.bilinear, nodata=np.nan, dtype='float32')
+    [ds.close() for ds in datasets]
+    [mfile.close() for mfile in memfiles]
+    return merged
+
+
+def merge_with_mem_datasets(arrays: list[np.ndarray], profiles: list[dict]) -> tuple[np.ndarray, object]:
+    arr, profile = merge_arrays_with_geometadata(arrays, profiles, resampling='bilinear')
+    return arr, profile['transform']
+
+
+def main() -> None:
+    print(f'{"case":>18} {"GTiff MemoryFile (s)":>21} {"MEM (s)":>8} {"identical":>10}')
+    for name, (arrays, profiles) in get_cases().items():
+        timings = {}
+        outputs = {}
+        for path_name, func in [('gtiff', merge_with_gtiff_memory_files), ('mem', merge_with_mem_datasets)]:
+            elapsed = []
+            for _ in range(N_REPEATS):
+                start = time.perf_counter()
+                outputs[path_name] = func(arrays, profiles)
+                elapsed.append(time.perf_counter() - start)
+            timings[path_name] = min(elapsed)
+        identical = np.array_equal(outputs['gtiff'][0], outputs['mem'][0], equal_nan=True) and (
+            outputs['gtiff'][1] == outputs['mem'][1]
+        )
+        print(f'{name:>18} {timings["gtiff"]:21.2f} {timings["mem"]:8.2f} {identical!s:>10}')
+
+
+if __name__ == '__main__':
+    with rasterio.Env():
+        main()
@@ -0,0 +1,81 @@
+"""Bytes read and time of merging tiles at full resolution vs. decimated (overview) reads for coarse resolutions.
+
+Writes a 3 x 3 grid of synthetic `glo_30`-like COGs (3600 x 3600, deflate, 512 pixel blocks, overviews 2-16) to a
+temporary directory and merges a 2.5 x 2.5 degree extent as `merge_and_transform_dem_tiles` does for 30, 90 and
+250 meter `dst_resolution`. Run from the top of the repo:
+
+    python benchmarks/bench_overview_reads.py
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.crs import CRS
+from rasterio.enums import Resampling
+from rasterio.shutil import copy as rio_copy
+from rasterio.transform import from_origin
+
+from dem_stitcher.merge import merge_tile_datasets_within_extent
+
+
+SIZE = 3600
+RESOLUTIONS = {'30 m': 1 / 3600, '90 m': 3 / 3600, '250 m': 0.0025}
+
+
+def write_cogs(tile_dir: Path) -> list[Path]:
+    rng = np.random.default_rng(0)
+    paths = []
+    for lat in range(3):
+        for lon in range(3):
+            arr = rng.normal(size=(SIZE, SIZE)).cumsum(axis=1).astype(np.float32)
+            profile = {
+                'driver': 'GTiff',
+                'dtype': 'float32',
+                'nodata': np.nan,
+                'count': 1,
+                'width': SIZE,
+                'height': SIZE,
+                'crs': CRS.from_epsg(4326),
+                'transform': from_origin(lon, lat + 1, 1 / SIZE, 1 / SIZE),
+            }
+            tmp_path = tile_dir / f'tmp_{lat}_{lon}.tif'
+            with rasterio.open(tmp_path, 'w', **profile) as ds:
+                ds.write(arr, 1)
+                ds.build_overviews([2, 4, 8, 16], Resampling.average)
+            path = tile_dir / f'tile_{lat}_{lon}.tif'
+            rio_copy(tmp_path, path, driver='COG', compress='deflate', blocksize=512, overviews='force_use_existing')
+            tmp_path.unlink()
+            paths.append(path)
+    return paths
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = write_cogs(Path(tmp_dir))
+        extent = [0.25, 0.25, 2.75, 2.75]
+        print(f'{"dst_resolution":>14} {"read":>8} {"MB read":>9} {"MB full res":>12} {"time (s)":>9}')
+        for name, res in RESOLUTIONS.items():
+            for read_resampling in [None, 'average']:
+                if (read_resampling is not None) and (name == '30 m'):
+                    continue
+                read_stats = {}
+                start = time.perf_counter()
+                merge_tile_datasets_within_extent(
+                    list(map(str, paths)),
+                    extent,
+                    dtype=np.float32,
+                    dst_resolution=res if read_resampling else None,
+                    read_stats=read_stats,
+                )
+                elapsed = time.perf_counter() - start
+                print(
+                    f'{name:>14} {read_resampling or "full":>8} {read_stats["bytes_read"] / 1e6:9.1f} '
+                    f'{read_stats["bytes_full_resolution"] / 1e6:12.1f} {elapsed:9.2f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Time of many small `stitch_dem` calls drawing tqdm bars (the default) vs. a callback vs. quiet (`progress=False`).
+
+The same extent of 0.02 x 0.02 degrees, straddling the corner of four tiles, is stitched 200 times from `glo_30` in
+geoid heights. The tiles are small synthetic `glo_30`-like GeoTIFFs (360 x 360) put in a `TileCache` under the urls
+of the tiles, so the tiles are looked up as usual and read locally and each stitch reads little. The bars (written to
+a null device, as in a batch job whose stderr is discarded) are created, updated and closed for the tiles opened,
+planned and read by every stitch; quiet stitches skip that bookkeeping entirely. The modes are run in 3 interleaved
+rounds (the best is reported) and the outputs are compared pixel by pixel. Run from the top of the repo:
+
+    python benchmarks/bench_progress.py
+"""
+
+import contextlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+
+from dem_stitcher import TileCache, stitch_dem
+from dem_stitcher.datasets import get_overlapping_dem_tile_urls
+
+
+SIZE = 360
+N_STITCHES = 200
+N_ROUNDS = 3
+BOUNDS = [-118.01, 33.99, -117.99, 34.01]
+
+
+def write_tile(url: str, dest_path: Path) -> None:
+    """Write a synthetic `glo_30`-like GeoTIFF in place of the tile at `url` (e.g. `..._N35_00_W117_00_DEM.tif`)."""
+    lat, _, lon, _, _ = url.split('/')[-1].split('_10_')[1].split('_', 4)
+    lat = int(lat[1:]) * (1 if lat[0] == 'N' else -1)
+    lon = int(lon[1:]) * (1 if lon[0] == 'E' else -1)
+    rng = np.random.default_rng(abs(lat * 1000 + lon))
+    profile = {
+        'driver': 'GTiff',
+        'dtype': 'float32',
+        'nodata': np.nan,
+        'count': 1,
+        'width': SIZE,
+        'height': SIZE,
+        'crs': CRS.from_epsg(4326),
+        'transform': from_origin(lon - 0.5 / SIZE, lat + 1 + 0.5 / SIZE, 1 / SIZE, 1 / SIZE),
+    }
+    with rasterio.open(dest_path, 'w', **profile) as ds:
+        ds.write(rng.normal(size=(SIZE, SIZE)).cumsum(axis=1).astype(np.float32), 1)
+        ds.update_tags(AREA_OR_POINT='Point')
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tile_cache = TileCache(Path(tmp_dir) / 'tiles')
+        urls = get_overlapping_dem_tile_urls(BOUNDS, 'glo_30')
+        for url in urls:
+            tile_cache.put(url, url.split('/')[-1], lambda path, url=url: write_tile(url, path))
+
+        events = []
+        modes = [('tqdm', True), ('callback', events.append), ('quiet', False)]
+        kwargs = {'dst_ellipsoidal_height': False, 'fill_in_glo_30': False, 'tile_cache': tile_cache}
+        # The modes are interleaved and the best of the rounds is kept, so warming up does not favor any
+        times = {name: [] for (name, _) in modes}
+        outputs = {}
+        for _ in range(N_ROUNDS):
+            for name, progress in modes:
+                with Path(os.devnull).open('w') as devnull, contextlib.redirect_stderr(devnull):
+                    start = time.perf_counter()
+                    for _ in range(N_STITCHES):
+                        X, _ = stitch_dem(BOUNDS, 'glo_30', progress=progress, **kwargs)
+                    times[name].append(time.perf_counter() - start)
+                outputs[name] = X
+
+    X_quiet = outputs['quiet']
+    print(f'{N_STITCHES} stitches of {X_quiet.shape[0]} x {X_quiet.shape[1]} pixels from {len(urls)} tiles')
+    print(f'{"progress":>9} {"time (s)":>9} {"ms/stitch":>10} {"identical":>10}')
+    for name, _ in modes:
+        elapsed = min(times[name])
+        identical = np.array_equal(outputs[name], X_quiet, equal_nan=True)
+        print(f'{name:>9} {elapsed:9.2f} {1000 * elapsed / N_STITCHES:10.2f} {str(identical):>10}')
+    print(f'{len(events) // N_ROUNDS} events received by the callback per round')
+
+
+if __name__ == '__main__':
+    main()
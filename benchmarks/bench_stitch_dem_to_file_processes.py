@@ -0,0 +1,87 @@
+"""Time of `stitch_dem_to_file` stitching its blocks in this process vs. in pools of processes (`n_processes`).
+
+A 2 x 2 degree extent of `glo_30` is stitched with ellipsoidal heights (`egm_96`, bundled) and resampled to 0.0005
+degrees, in 64 MB blocks. Its tiles are synthetic `glo_30`-like COGs (3600 x 3600, deflate, 512 pixel blocks) put in
+a `TileCache` under the urls of the tiles, so the tiles are looked up as usual and read locally. The masks, geoid
+interpolation and resampling of the blocks hold the GIL for part of their time, so processes scale with the cores
+available where the threads of a single process do not; each pool also pays for spawning its processes. The
+outputs are compared pixel by pixel. Run from the top of the repo:
+
+    python benchmarks/bench_stitch_dem_to_file_processes.py
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.crs import CRS
+from rasterio.shutil import copy as rio_copy
+from rasterio.transform import from_origin
+
+from dem_stitcher import TileCache, stitch_dem_to_file
+from dem_stitcher.datasets import get_overlapping_dem_tile_urls
+from dem_stitcher.geoid import get_geoid_path
+
+
+SIZE = 3600
+BOUNDS = [-118.9, 33.1, -116.9, 35.1]
+
+
+def write_tile(url: str, dest_path: Path) -> None:
+    """Write a synthetic `glo_30`-like COG in place of the tile at `url` (e.g. `..._N35_00_W117_00_DEM.tif`)."""
+    lat, _, lon, _, _ = url.split('/')[-1].split('_10_')[1].split('_', 4)
+    lat = int(lat[1:]) * (1 if lat[0] == 'N' else -1)
+    lon = int(lon[1:]) * (1 if lon[0] == 'E' else -1)
+    rng = np.random.default_rng(abs(lat * 1000 + lon))
+    profile = {
+        'driver': 'GTiff',
+        'dtype': 'float32',
+        'nodata': np.nan,
+        'count': 1,
+        'width': SIZE,
+        'height': SIZE,
+        'crs': CRS.from_epsg(4326),
+        'transform': from_origin(lon - 0.5 / SIZE, lat + 1 + 0.5 / SIZE, 1 / SIZE, 1 / SIZE),
+    }
+    tmp_path = dest_path.with_suffix('.tmp.tif')
+    with rasterio.open(tmp_path, 'w', **profile) as ds:
+        ds.write(rng.normal(size=(SIZE, SIZE)).cumsum(axis=1).astype(np.float32), 1)
+        ds.update_tags(AREA_OR_POINT='Point')
+    rio_copy(tmp_path, dest_path, driver='COG', compress='deflate', blocksize=512)
+    tmp_path.unlink()
+
+
+def main() -> None:
+    kwargs = {
+        'fill_in_glo_30': False,
+        'geoid_path': str(get_geoid_path('egm_96')),
+        'dst_resolution': 0.0005,
+        'max_block_bytes': 2**26,
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tile_cache = TileCache(Path(tmp_dir) / 'tiles')
+        urls = get_overlapping_dem_tile_urls(BOUNDS, 'glo_30')
+        for url in urls:
+            tile_cache.put(url, url.split('/')[-1], lambda path, url=url: write_tile(url, path))
+
+        results = []
+        for n_processes in [None, 2, 4]:
+            dest_path = Path(tmp_dir) / f'dem_{n_processes}.tif'
+            start = time.perf_counter()
+            stitch_dem_to_file(BOUNDS, 'glo_30', dest_path, tile_cache=tile_cache, n_processes=n_processes, **kwargs)
+            elapsed = time.perf_counter() - start
+            with rasterio.open(dest_path) as ds:
+                results.append((n_processes, elapsed, ds.read(1)))
+
+    X_single = results[0][2]
+    print(f'{len(urls)} tiles, {X_single.shape[0]} x {X_single.shape[1]} pixels, {os.cpu_count()} cpus')
+    print(f'{"n_processes":>11} {"time (s)":>9} {"identical":>10}')
+    for n_processes, elapsed, X in results:
+        print(f'{str(n_processes):>11} {elapsed:9.2f} {str(np.array_equal(X, X_single, equal_nan=True)):>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Time of stitching the frames of a track with `stitch_dem` for each frame vs. once with `stitch_dems`.
+
+Frames of a synthetic descending track (20 frames of 0.6 x 0.4 degrees, overlapping by 0.1 degrees along the track
+and drifting west) over California are stitched from `glo_30` with ellipsoidal heights (`egm_96`, bundled). Their
+tiles are synthetic `glo_30`-like COGs (3600 x 3600, deflate, 512 pixel blocks) put in a `TileCache` under the
+urls of the tiles, so the tiles are looked up as usual and read locally; neighboring frames share most of them.
+Reads of remote tiles (where each tile is also fetched again by every `stitch_dem`) save more. Run from the top of
+the repo:
+
+    python benchmarks/bench_stitch_dems.py
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.crs import CRS
+from rasterio.shutil import copy as rio_copy
+from rasterio.transform import from_origin
+
+from dem_stitcher import TileCache, stitch_dem, stitch_dems
+from dem_stitcher.datasets import get_overlapping_dem_tile_urls
+from dem_stitcher.geoid import get_geoid_path
+
+
+SIZE = 3600
+N_FRAMES = 20
+
+
+def get_track_frames() -> list[list[float]]:
+    frames = []
+    for i in range(N_FRAMES):
+        ymax = 40.0 - 0.3 * i
+        xmin = -118.0 - 0.05 * i
+        frames.append([xmin, ymax - 0.4, xmin + 0.6, ymax])
+    return frames
+
+
+def write_tile(url: str, dest_path: Path) -> None:
+    """Write a synthetic `glo_30`-like COG in place of the tile at `url` (e.g. `..._N35_00_W117_00_DEM.tif`)."""
+    lat, _, lon, _, _ = url.split('/')[-1].split('_10_')[1].split('_', 4)
+    lat = int(lat[1:]) * (1 if lat[0] == 'N' else -1)
+    lon = int(lon[1:]) * (1 if lon[0] == 'E' else -1)
+    rng = np.random.default_rng(abs(lat * 1000 + lon))
+    profile = {
+        'driver': 'GTiff',
+        'dtype': 'float32',
+        'nodata': np.nan,
+        'count': 1,
+        'width': SIZE,
+        'height': SIZE,
+        'crs': CRS.from_epsg(4326),
+        'transform': from_origin(lon - 0.5 / SIZE, lat + 1 + 0.5 / SIZE, 1 / SIZE, 1 / SIZE),
+    }
+    tmp_path = dest_path.with_suffix('.tmp.tif')
+    with rasterio.open(tmp_path, 'w', **profile) as ds:
+        ds.write(rng.normal(size=(SIZE, SIZE)).cumsum(axis=1).astype(np.float32), 1)
+        ds.update_tags(AREA_OR_POINT='Point')
+    rio_copy(tmp_path, dest_path, driver='COG', compress='deflate', blocksize=512)
+    tmp_path.unlink()
+
+
+def main() -> None:
+    frames = get_track_frames()
+    kwargs = {'fill_in_glo_30': False, 'geoid_path': str(get_geoid_path('egm_96'))}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tile_cache = TileCache(Path(tmp_dir) / 'tiles')
+        urls = list(dict.fromkeys(url for bounds in frames for url in get_overlapping_dem_tile_urls(bounds, 'glo_30')))
+        for url in urls:
+            tile_cache.put(url, url.split('/')[-1], lambda path, url=url: write_tile(url, path))
+        n_frames_per_tile = sum(len(get_overlapping_dem_tile_urls(bounds, 'glo_30')) for bounds in frames) / len(urls)
+
+        start = time.perf_counter()
+        dems_each = [stitch_dem(bounds, 'glo_30', tile_cache=tile_cache, **kwargs) for bounds in frames]
+        elapsed_each = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dems_batch = stitch_dems(frames, 'glo_30', tile_cache=tile_cache, **kwargs)
+        elapsed_batch = time.perf_counter() - start
+
+    max_diff = max(float(np.nanmax(np.abs(X - Y))) for ((X, _), (Y, _)) in zip(dems_each, dems_batch))
+    print(f'{len(frames)} frames, {len(urls)} tiles ({n_frames_per_tile:.1f} frames per tile)')
+    print(f'{"stitch_dem (s)":>15} {"stitch_dems (s)":>16} {"max abs diff (m)":>17}')
+    print(f'{elapsed_each:15.2f} {elapsed_batch:16.2f} {max_diff:17.2e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Per-query latency of `get_overlapping_dem_tiles` against the bundled tile catalogs.
+
+Compares the current lookups against the previous full-catalog scan (`GeoDataFrame.intersects` followed by a
+per-row `intersection(...).geom_type`), which is reproduced below for reference. `get_overlapping_dem_tile_urls` is
+the lookup `stitch_dem` uses; `get_overlapping_dem_tiles` additionally builds a GeoDataFrame of the tiles found.
+Run from the top of the repo:
+
+    python benchmarks/bench_tile_lookup.py
+"""
+
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+
+from dem_stitcher.datasets import (
+    get_global_dem_tile_extents,
+    get_overlapping_dem_tile_urls,
+    get_overlapping_dem_tiles,
+)
+from dem_stitcher.dateline import get_dateline_crossing
+
+
+def get_overlapping_dem_tiles_full_scan(bounds: list, dem_name: str) -> pd.DataFrame:
+    box_geo = box(*bounds)
+    df_tiles_all = get_global_dem_tile_extents(dem_name)
+    crossing = get_dateline_crossing(bounds)
+    if crossing:
+        df_tiles_all_translated = df_tiles_all.copy()
+        df_tiles_all_translated.geometry = df_tiles_all.geometry.translate(xoff=2 * crossing)
+        df_tiles_all = pd.concat([df_tiles_all, df_tiles_all_translated], axis=0).reset_index(drop=True)
+    df_tiles = df_tiles_all[df_tiles_all.intersects(box_geo)].copy()
+    if not df_tiles.empty:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            geo_type_index = df_tiles.geometry.intersection(box_geo).map(lambda geo: geo.geom_type == 'Polygon')
+        df_tiles = df_tiles[geo_type_index].copy()
+    return df_tiles.sort_values(by='tile_id').reset_index(drop=True)
+
+
+def time_per_query(lookup: callable, bounds_list: list, dem_name: str) -> float:
+    start = time.perf_counter()
+    for bounds in bounds_list:
+        lookup(bounds, dem_name)
+    return (time.perf_counter() - start) / len(bounds_list)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    # SAR frame sized AOIs (~2.5 x 2 degrees)
+    xs, ys = rng.uniform(-179, 176, 200), rng.uniform(-60, 70, 200)
+    bounds_list = [[x, y, x + 2.5, y + 2.0] for (x, y) in zip(xs, ys)]
+
+    print(f'{"dataset":<16}{"tiles":>8}{"full scan (ms)":>16}{"GeoDataFrame (ms)":>19}{"urls (ms)":>11}{"speedup":>9}')
+    for dem_name in ['glo_30', 'glo_90', 'glo_90_missing', 'nasadem', 'nisar_dem', '3dep']:
+        # Load catalog and build index outside of the timings
+        get_overlapping_dem_tiles(bounds_list[0], dem_name)
+        t_scan = time_per_query(get_overlapping_dem_tiles_full_scan, bounds_list, dem_name)
+        t_gdf = time_per_query(get_overlapping_dem_tiles, bounds_list, dem_name)
+        t_urls = time_per_query(get_overlapping_dem_tile_urls, bounds_list, dem_name)
+        n_tiles = get_global_dem_tile_extents(dem_name).shape[0]
+        print(
+            f'{dem_name:<16}{n_tiles:>8}{1e3 * t_scan:>16.3f}{1e3 * t_gdf:>19.3f}{1e3 * t_urls:>11.3f}'
+            f'{t_scan / t_urls:>8.0f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Time of computing the windows of 50 tiles for an extent with and without cached pyproj transformers.
+
+`merge_tile_datasets_within_extent` computes one window per tile (`get_window_from_extent`), each transforming the
+extent from epsg:4326 to the CRS of the tile. Previously a `pyproj.Transformer` was constructed on every call; it
+is now cached per pair of CRSs and skipped altogether when the CRSs are equal. `glo_30`-like tiles are in
+epsg:4326 (identity) and `3dep`-like tiles in epsg:4269 (cached transformer). Run from the top of the repo:
+
+    python benchmarks/bench_tile_windows.py
+"""
+
+import time
+import warnings
+
+from pyproj import Transformer
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+
+import dem_stitcher.rio_window as rio_window
+from dem_stitcher.rio_window import get_window_from_extent
+
+
+N_TILES = 50
+N_REPEATS = 5
+
+
+def tile_profiles(epsg: int) -> list[dict]:
+    return [
+        {
+            'crs': CRS.from_epsg(epsg),
+            'transform': from_origin(-120 + (i % 10), 40 - (i // 10), 1 / 3600, 1 / 3600),
+            'width': 3600,
+            'height': 3600,
+        }
+        for i in range(N_TILES)
+    ]
+
+
+def time_windows(profiles: list[dict]) -> float:
+    extent = [-121, 34, -109, 41]
+    start = time.perf_counter()
+    # Tiles only partially overlap the extent, which warns (as in `merge_tile_datasets_within_extent`)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        for _ in range(N_REPEATS):
+            for profile in profiles:
+                get_window_from_extent(profile, extent)
+    return (time.perf_counter() - start) / N_REPEATS
+
+
+def main() -> None:
+    # Warm up the PROJ database so the first construction is not charged to either case
+    Transformer.from_crs(CRS.from_epsg(4326), CRS.from_epsg(4269), always_xy=True)
+
+    def construct_every_call(src_bounds: list, src_crs: CRS, dest_crs: CRS) -> list[float]:
+        proj = Transformer.from_crs(src_crs, dest_crs, always_xy=True)
+        return list(proj.transform(src_bounds[0], src_bounds[1])) + list(proj.transform(src_bounds[2], src_bounds[3]))
+
+    transform_bounds = rio_window.transform_bounds
+    print(f'{"tile crs":>10} {"uncached (ms)":>14} {"cached (ms)":>12}')
+    for epsg in [4326, 4269]:
+        profiles = tile_profiles(epsg)
+        rio_window.transform_bounds = construct_every_call
+        try:
+            uncached = time_windows(profiles)
+        finally:
+            rio_window.transform_bounds = transform_bounds
+        rio_window.get_transformer.cache_clear()
+        cached = time_windows(profiles)
+        print(f'{"epsg:" + str(epsg):>10} {1e3 * uncached:14.1f} {1e3 * cached:12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,6 @@
+import importlib
 import warnings
-
-# FIXME: Python 3.8+ this should be `from importlib.metadata...`
-from importlib_metadata import PackageNotFoundError, version
-
-from .datasets import get_global_dem_tile_extents, get_overlapping_dem_tiles
-from .stitcher import get_dem_tile_paths, stitch_dem
+from importlib.metadata import PackageNotFoundError, version
 
 
 try:
@@ -19,10 +15,50 @@ except PackageNotFoundError:
     )
 
 
+# The public API is imported on first access so `import dem_stitcher` does not pay for rasterio, geopandas, etc.
+_LAZY_ATTRIBUTES = {
+    'get_dem_tile_paths': 'stitcher',
+    'get_global_dem_tile_extents': 'datasets',
+    'get_overlapping_dem_tiles': 'datasets',
+    'iter_stitch_dems': 'stitcher',
+    'stitch_dem': 'stitcher',
+    'stitch_dem_to_file': 'stitcher',
+    'stitch_dem_to_profile': 'stitcher',
+    'stitch_dem_to_vrt': 'stitcher',
+    'stitch_dems': 'stitcher',
+    'GeoidCache': 'geoid_cache',
+    'StageTimings': 'instrumentation',
+    'TileCache': 'tile_cache',
+    'TqdmProgress': 'progress',
+}
+
+
+def __getattr__(name: str) -> object:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module = importlib.import_module(f'.{_LAZY_ATTRIBUTES[name]}', __name__)
+    attribute = getattr(module, name)
+    globals()[name] = attribute
+    return attribute
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
+
 __all__ = [
     'get_dem_tile_paths',
     'get_global_dem_tile_extents',
     'get_overlapping_dem_tiles',
+    'iter_stitch_dems',
     'stitch_dem',
+    'stitch_dem_to_file',
+    'stitch_dem_to_profile',
+    'stitch_dem_to_vrt',
+    'stitch_dems',
+    'GeoidCache',
+    'StageTimings',
+    'TileCache',
+    'TqdmProgress',
     '__version__',
 ]
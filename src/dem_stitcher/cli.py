@@ -0,0 +1,227 @@
+"""Command-line interface: `dem-stitcher` stitches the DEMs of bounds or of a manifest of AOIs into GeoTIFFs."""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+
+MANIFEST_BOUNDS_COLUMNS = ['xmin', 'ymin', 'xmax', 'ymax']
+
+
+@dataclass
+class Job:
+    """A DEM to stitch: a name (for the summary), [xmin, ymin, xmax, ymax] in epsg:4326 and the GeoTIFF written."""
+
+    name: str
+    bounds: list[float]
+    dest_path: Path
+
+
+@dataclass
+class JobResult:
+    name: str
+    dest_path: Path
+    seconds: float
+    height: int | None = None
+    width: int | None = None
+    error: str | None = None
+
+
+def _get_geometry_bounds(geometry: dict) -> list[float]:
+    import shapely.geometry
+
+    return list(shapely.geometry.shape(geometry).bounds)
+
+
+def _get_row_bounds(row: dict, k: int, manifest_path: Path) -> list[float]:
+    # Short rows are padded with None by `csv.DictReader`
+    values = [row[column] for column in MANIFEST_BOUNDS_COLUMNS]
+    if any(value is None for value in values):
+        raise ValueError(f'Row {k} of CSV manifest {manifest_path} is missing bounds')
+    return [float(value) for value in values]
+
+
+def read_manifest(manifest_path: str | Path) -> list[tuple[str, list[float]]]:
+    """Read the (name, bounds) of the AOIs of a GeoJSON or CSV manifest.
+
+    GeoJSON manifests are FeatureCollections (in epsg:4326) whose features are named by their `name` property,
+    else their `id`, else their position; the bounds are those of their geometries. CSV manifests have `xmin`,
+    `ymin`, `xmax` and `ymax` columns and an optional `name` column (rows are named by their position otherwise).
+    Names must be unique file names (without path separators), as they name the GeoTIFFs written.
+    """
+    manifest_path = Path(manifest_path)
+    if manifest_path.suffix.lower() == '.csv':
+        with manifest_path.open(newline='') as file:
+            rows = list(csv.DictReader(file))
+        missing = [column for column in MANIFEST_BOUNDS_COLUMNS if rows and column not in rows[0]]
+        if missing:
+            raise ValueError(f'CSV manifest {manifest_path} is missing the columns {missing}')
+        aois = [(row.get('name') or f'aoi_{k}', _get_row_bounds(row, k, manifest_path)) for (k, row) in enumerate(rows)]
+    elif manifest_path.suffix.lower() in ['.geojson', '.json']:
+        features = json.loads(manifest_path.read_text())['features']
+        aois = [
+            (
+                str((feature.get('properties') or {}).get('name') or feature.get('id') or f'aoi_{k}'),
+                _get_geometry_bounds(feature['geometry']),
+            )
+            for (k, feature) in enumerate(features)
+        ]
+    else:
+        raise ValueError(f'Manifest {manifest_path} must be a GeoJSON (.geojson, .json) or CSV (.csv) file')
+    names = [name for (name, _) in aois]
+    invalid_names = [name for name in names if ('/' in name) or ('\\' in name)]
+    if invalid_names:
+        raise ValueError(f'Names of the AOIs of manifest {manifest_path} must be file names; {invalid_names} are not')
+    if len(set(names)) != len(names):
+        raise ValueError(f'Names of the AOIs of manifest {manifest_path} must be unique')
+    return aois
+
+
+def run_job(job: Job, stitch_kwargs: dict, tile_cache_kwargs: dict | None = None) -> JobResult:
+    """Stitch the DEM of a job with `stitch_dem_to_file`; errors are recorded in the result rather than raised."""
+    from .stitcher import stitch_dem_to_file
+    from .tile_cache import TileCache
+
+    start = time.perf_counter()
+    try:
+        tile_cache = TileCache(**tile_cache_kwargs) if tile_cache_kwargs is not None else None
+        profile = stitch_dem_to_file(job.bounds, dest_path=job.dest_path, tile_cache=tile_cache, **stitch_kwargs)
+    except Exception as e:
+        return JobResult(job.name, job.dest_path, time.perf_counter() - start, error=f'{type(e).__name__}: {e}')
+    return JobResult(job.name, job.dest_path, time.perf_counter() - start, profile['height'], profile['width'])
+
+
+def run_jobs(
+    jobs: list[Job],
+    stitch_kwargs: dict,
+    tile_cache_kwargs: dict | None = None,
+    n_jobs: int = 1,
+    use_processes: bool = False,
+) -> list[JobResult]:
+    """Run `n_jobs` jobs at a time in threads (or spawned processes); results are in the order of the jobs."""
+    if n_jobs < 1:
+        raise ValueError('n_jobs must be positive')
+    executor: Executor
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('spawn'))
+    else:
+        executor = ThreadPoolExecutor(max_workers=n_jobs)
+    with executor:
+        futures = [executor.submit(run_job, job, stitch_kwargs, tile_cache_kwargs) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def format_summary(results: list[JobResult], elapsed: float) -> str:
+    """Table of the time, size and status of each job, and the total."""
+    width_name = max([len(result.name) for result in results] + [4])
+    lines = [f'{"name":<{width_name}} {"seconds":>9} {"height":>7} {"width":>7}  status']
+    for result in results:
+        status = 'ok' if result.error is None else f'failed ({result.error})'
+        height = result.height if result.height is not None else '-'
+        width = result.width if result.width is not None else '-'
+        lines.append(f'{result.name:<{width_name}} {result.seconds:9.2f} {height:>7} {width:>7}  {status}')
+    n_failed = sum(result.error is not None for result in results)
+    lines.append(f'{len(results)} jobs ({n_failed} failed) in {elapsed:.2f} s')
+    return '\n'.join(lines)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='dem-stitcher',
+        description='Stitch DEMs for bounds or a manifest of AOIs into tiled, compressed GeoTIFFs.',
+    )
+    aoi = parser.add_mutually_exclusive_group(required=True)
+    aoi.add_argument(
+        '--bounds', nargs=4, type=float, metavar=('XMIN', 'YMIN', 'XMAX', 'YMAX'), help='Bounds in epsg:4326'
+    )
+    aoi.add_argument('--manifest', type=Path, help='GeoJSON or CSV (xmin, ymin, xmax, ymax, [name]) of AOIs')
+    parser.add_argument('--dem-name', default='glo_30', help='DEM to stitch (default: %(default)s)')
+    parser.add_argument('--output', type=Path, help='GeoTIFF written for --bounds (default: dem.tif)')
+    parser.add_argument(
+        '--output-dir', type=Path, default=Path(), help='Directory of the GeoTIFFs (<name>.tif) of --manifest'
+    )
+    parser.add_argument(
+        '--ellipsoidal-height',
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help='Heights relative to the ellipsoid rather than the geoid (default: %(default)s)',
+    )
+    parser.add_argument('--area-or-point', choices=['Area', 'Point'], help='Pixel registration of the outputs')
+    parser.add_argument('--resolution', type=float, help='Resolution of the outputs (default: that of the DEM)')
+    parser.add_argument(
+        '--fill-in-glo-30',
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help='Fill the missing glo_30 tiles with glo_90 (default: %(default)s)',
+    )
+    parser.add_argument('--fill-dem-names', nargs='+', help='DEMs filling the missing tiles of --dem-name')
+    parser.add_argument('--geoid-path', help='Geoid (default: that of the DEM)')
+    parser.add_argument('--tile-cache', type=Path, help='Directory of a tile cache shared by the jobs (and runs)')
+    parser.add_argument('--tile-cache-max-bytes', type=int, help='Size bound of the tile cache')
+    parser.add_argument('--compress', default='lzw', help='GeoTIFF compression (default: %(default)s)')
+    parser.add_argument(
+        '--max-block-bytes', type=int, default=2**28, help='Memory to stitch one block (default: %(default)s)'
+    )
+    parser.add_argument('--n-jobs', type=int, default=1, help='Jobs run at a time (default: %(default)s)')
+    parser.add_argument(
+        '--processes', action='store_true', help='Run the jobs in processes rather than threads of this process'
+    )
+    parser.add_argument('--n-block-processes', type=int, help='Processes stitching the blocks of each job')
+    parser.add_argument(
+        '--n-threads-downloading', type=int, default=10, help='Threads reading tiles (default: %(default)s)'
+    )
+    parser.add_argument('--quiet', action='store_true', help='Print the summary only (no progress bars)')
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of `dem-stitcher`; returns 1 (after running all the jobs) if any of them failed."""
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if (args.manifest is not None) and (args.output is not None):
+        parser.error('--output is only used with --bounds; use --output-dir with --manifest')
+    if args.n_jobs < 1:
+        parser.error('--n-jobs must be positive')
+
+    if args.bounds is not None:
+        jobs = [Job('dem', args.bounds, args.output or Path('dem.tif'))]
+    else:
+        try:
+            aois = read_manifest(args.manifest)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            parser.error(f'Could not read the manifest: {e}')
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        jobs = [Job(name, bounds, args.output_dir / f'{name}.tif') for (name, bounds) in aois]
+
+    stitch_kwargs = dict(
+        dem_name=args.dem_name,
+        dst_ellipsoidal_height=args.ellipsoidal_height,
+        dst_area_or_point=args.area_or_point,
+        dst_resolution=args.resolution,
+        n_threads_downloading=args.n_threads_downloading,
+        fill_in_glo_30=args.fill_in_glo_30,
+        fill_dem_names=args.fill_dem_names,
+        geoid_path=args.geoid_path,
+        max_block_bytes=args.max_block_bytes,
+        creation_options={'compress': args.compress},
+        n_processes=args.n_block_processes,
+        progress=not args.quiet,
+    )
+    tile_cache_kwargs = None
+    if args.tile_cache is not None:
+        tile_cache_kwargs = {'root': args.tile_cache, 'max_bytes': args.tile_cache_max_bytes}
+
+    start = time.perf_counter()
+    results = run_jobs(jobs, stitch_kwargs, tile_cache_kwargs, n_jobs=args.n_jobs, use_processes=args.processes)
+    print(format_summary(results, time.perf_counter() - start))
+    return int(any(result.error is not None for result in results))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,23 @@
+import math
 import warnings
 from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 from warnings import warn
 
-import geopandas as gpd
-import pandas as pd
+import numpy as np
+import shapely
+from shapely import STRtree
 from shapely.geometry import box
 
 from .dateline import check_4326_bounds, get_dateline_crossing
 from .exceptions import DEMNotSupported
 
 
+# geopandas (and pandas) are only needed for the GeoDataFrame api and are imported on first use
+if TYPE_CHECKING:
+    import geopandas as gpd
+
 DATA_PATH = Path(__file__).parents[0].absolute() / 'data'
 
 _DATASET_PATHS = list(DATA_PATH.glob('*.parquet'))
@@ -23,7 +30,7 @@ def get_available_datasets() -> list[str]:
 
 # TODO: maxsize=None is not needed for 3.8+
 @cache
-def get_global_dem_tile_extents(dataset: str) -> gpd.GeoDataFrame:
+def get_global_dem_tile_extents(dataset: str) -> 'gpd.GeoDataFrame':
     """Obtain globally avaialable tiles from DEM names supported.
 
     Parameters
@@ -43,12 +50,161 @@ def get_global_dem_tile_extents(dataset: str) -> gpd.GeoDataFrame:
     """
     if dataset not in DATASETS:
         raise DEMNotSupported(f'{dataset} must be in {", ".join(DATASETS)}')
+    import geopandas as gpd
+
     df = gpd.read_parquet(DATA_PATH / f'{dataset}.parquet')
     df['dem_name'] = dataset
     return df
 
 
-def get_overlapping_dem_tiles(bounds: list, dem_name: str) -> gpd.GeoDataFrame:
+@cache
+def _read_tile_table(dataset: str) -> dict[str, np.ndarray]:
+    """Read a tile catalog as numpy arrays (`tile_id`, `url` and shapely `geometry`) without geopandas.
+
+    Rows are in the same order as `get_global_dem_tile_extents(dataset)`.
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(DATA_PATH / f'{dataset}.parquet', columns=['tile_id', 'url', 'geometry'])
+    return {
+        'tile_id': table.column('tile_id').to_numpy(zero_copy_only=False),
+        'url': table.column('url').to_numpy(zero_copy_only=False),
+        'geometry': shapely.from_wkb(table.column('geometry').to_numpy(zero_copy_only=False)),
+    }
+
+
+@cache
+def _get_tile_bounds(dataset: str) -> tuple[np.ndarray, np.ndarray]:
+    """Get the packed bounds of a tile catalog and a mask of the tiles that are rectangles.
+
+    Bounds are an n x 4 array of xmin, ymin, xmax, ymax; a tile is a rectangle if it is equal to its envelope.
+    """
+    geometries = _read_tile_table(dataset)['geometry']
+    return shapely.bounds(geometries), shapely.equals(geometries, shapely.envelope(geometries))
+
+
+@cache
+def _get_tile_tree(dataset: str) -> STRtree:
+    return STRtree(_read_tile_table(dataset)['geometry'])
+
+
+@cache
+def _get_tile_grid(dataset: str) -> dict[tuple[int, int], int] | None:
+    """Map the integer (latitude, longitude) of the lower left corner of each tile to its row in the catalog.
+
+    Only defined for catalogs that are regular 1 x 1 degree grids (one tile per cell); None otherwise.
+    """
+    tile_bounds, is_rectangle = _get_tile_bounds(dataset)
+    xmin, ymin, xmax, ymax = tile_bounds.T
+    is_regular = (
+        is_rectangle.all()
+        and np.all(xmax - xmin == 1)
+        and np.all(ymax - ymin == 1)
+        and np.all(xmin == np.floor(xmin))
+        and np.all(ymin == np.floor(ymin))
+    )
+    if not is_regular:
+        return None
+    cells = list(zip(ymin.astype(int).tolist(), xmin.astype(int).tolist()))
+    grid = {cell: row for (row, cell) in enumerate(cells)}
+    return grid if len(grid) == len(cells) else None
+
+
+def _translate_bounds(bounds: list, x_translation: float) -> list:
+    xmin, ymin, xmax, ymax = bounds
+    return [xmin + x_translation, ymin, xmax + x_translation, ymax]
+
+
+def _query_tile_grid(grid: dict[tuple[int, int], int], bounds: list) -> np.ndarray:
+    """Enumerate the 1 x 1 degree cells that overlap bounds with positive area and look up the available tiles.
+
+    Cells without a tile (e.g. over the ocean) are skipped. The work is proportional to the number of tiles touched
+    rather than the size of the catalog.
+    """
+    xmin, ymin, xmax, ymax = bounds
+    if (xmin >= xmax) or (ymin >= ymax):
+        return np.zeros(0, dtype=int)
+    cells = (
+        (lat, lon)
+        for lat in range(math.floor(ymin), math.ceil(ymax))
+        for lon in range(math.floor(xmin), math.ceil(xmax))
+    )
+    rows = [grid[cell] for cell in cells if cell in grid]
+    return np.sort(np.array(rows, dtype=int))
+
+
+def _query_tile_tree(dataset: str, bounds: list) -> np.ndarray:
+    """Query the STRtree of the catalog and remove overlaps that are only a Point or LineString.
+
+    For rectangular tiles this is bounds arithmetic on the query hits; any other tile keeps an exact (vectorized)
+    intersection.
+    """
+    tree = _get_tile_tree(dataset)
+    tile_bounds, is_rectangle = _get_tile_bounds(dataset)
+    box_geo = box(*bounds)
+    index = np.sort(tree.query(box_geo, predicate='intersects'))
+
+    xmin, ymin, xmax, ymax = bounds
+    hit_bounds = tile_bounds[index]
+    overlap_width = np.minimum(hit_bounds[:, 2], xmax) - np.maximum(hit_bounds[:, 0], xmin)
+    overlap_height = np.minimum(hit_bounds[:, 3], ymax) - np.maximum(hit_bounds[:, 1], ymin)
+    is_polygon = (overlap_width > 0) & (overlap_height > 0)
+
+    not_rectangle = ~is_rectangle[index]
+    if not_rectangle.any():
+        geometries = tree.geometries[index[not_rectangle]]
+        # Degenerate geometries raise warning in shapely - intersection is black box to us
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            intersections = shapely.intersection(geometries, box_geo)
+        is_polygon[not_rectangle] = shapely.get_type_id(intersections) == shapely.GeometryType.POLYGON
+    return index[is_polygon]
+
+
+def _query_tile_index(dataset: str, bounds: list) -> np.ndarray:
+    """Get the sorted catalog rows of the tiles whose overlap with bounds is a Polygon i.e. has positive area.
+
+    Regular 1 x 1 degree catalogs (all of the bundled ones) are resolved in closed form; any other catalog falls back
+    to the spatial index.
+    """
+    grid = _get_tile_grid(dataset)
+    if grid is not None:
+        return _query_tile_grid(grid, bounds)
+    return _query_tile_tree(dataset, bounds)
+
+
+def _get_overlapping_tile_rows(bounds: list, dem_name: str) -> tuple[np.ndarray, np.ndarray]:
+    """Get the catalog rows of the tiles overlapping bounds sorted by `tile_id`.
+
+    Also returns the longitudinal translation of each tile (0 or +/- 360 when bounds cross the dateline).
+    """
+    check_4326_bounds(bounds)
+
+    if dem_name not in DATASETS:
+        raise DEMNotSupported(f'Please use dem_name in: {", ".join(DATASETS)}')
+    rows = _query_tile_index(dem_name, bounds)
+    x_translations = np.zeros(rows.size)
+
+    crossing = get_dateline_crossing(bounds)
+    if crossing:
+        warn(
+            'Getting tiles across dateline on the opposite hemisphere; '
+            f'The source tiles will be {-2 * crossing} deg along the'
+            'longitudinal axis from the extent requested',
+            category=UserWarning,
+        )
+        # Rather than translating the whole catalog, query it with the bounds translated to the opposite
+        # hemisphere and translate the tiles found back
+        rows_translated = _query_tile_index(dem_name, _translate_bounds(bounds, -2 * crossing))
+        rows = np.concatenate([rows, rows_translated])
+        x_translations = np.concatenate([x_translations, np.full(rows_translated.size, 2 * crossing)])
+
+    # Merging is order dependent - ensures consistency
+    order = np.argsort(_read_tile_table(dem_name)['tile_id'][rows], kind='stable')
+    return rows[order], x_translations[order]
+
+
+def get_overlapping_dem_tiles(bounds: list, dem_name: str) -> 'gpd.GeoDataFrame':
     """Get tiles from dem-shortname that overlap with the bounds.
 
     Parameters
@@ -68,47 +224,44 @@ def get_overlapping_dem_tiles(bounds: list, dem_name: str) -> gpd.GeoDataFrame:
     DEMNotSupported
        If not in supported dem Name
     """
-    check_4326_bounds(bounds)
+    rows, x_translations = _get_overlapping_tile_rows(bounds, dem_name)
+    df_tiles = get_global_dem_tile_extents(dem_name).iloc[rows].reset_index(drop=True)
+    translated = x_translations != 0
+    if translated.any():
+        x_translation = x_translations[translated][0]
+        df_tiles.loc[translated, 'geometry'] = df_tiles.geometry[translated].translate(xoff=x_translation)
+    return df_tiles
 
-    if dem_name not in DATASETS:
-        raise DEMNotSupported(f'Please use dem_name in: {", ".join(DATASETS)}')
-    box_geo = box(*bounds)
-    df_tiles_all = get_global_dem_tile_extents(dem_name)
 
-    crossing = get_dateline_crossing(bounds)
-    if crossing:
-        warn(
-            'Getting tiles across dateline on the opposite hemisphere; '
-            f'The source tiles will be {-2 * crossing} deg along the'
-            'longitudinal axis from the extent requested',
-            category=UserWarning,
-        )
-        df_tiles_all_translated = df_tiles_all.copy()
-        x_translation = 2 * crossing
-        df_tiles_all_translated.geometry = df_tiles_all.geometry.translate(xoff=x_translation)
-        df_tiles_all = pd.concat([df_tiles_all, df_tiles_all_translated], axis=0).reset_index(drop=True)
-
-    overlap_index = df_tiles_all.intersects(box_geo)
-    df_tiles = df_tiles_all[overlap_index].copy()
-
-    # This removes de-generate instances when the bounds overlap is a Point or LineString
-    # If empty, then additional intersection removes column names so addition this conditional flow
-    # so subsequent sorting does not fail
-    if not df_tiles.empty:
-        # Degenerate geometries raise warning in shapely - intersection is black box to us
-        with warnings.catch_warnings():
-            warnings.simplefilter('ignore', category=RuntimeWarning)
-            df_tiles_intersection = df_tiles.geometry.intersection(box_geo)
-            geo_type_index = df_tiles_intersection.geometry.map(lambda geo: geo.geom_type == 'Polygon')
-        df_tiles = df_tiles[geo_type_index].copy()
+def get_overlapping_dem_tile_urls(bounds: list, dem_name: str) -> list[str]:
+    """Get the urls of the tiles from dem-shortname that overlap with the bounds.
 
-    # Merging is order dependent - ensures consistency
-    df_tiles = df_tiles.sort_values(by='tile_id')
-    df_tiles = df_tiles.reset_index(drop=True)
-    return df_tiles
+    Same tiles and order as `get_overlapping_dem_tiles`, without building a GeoDataFrame.
+
+    Parameters
+    ----------
+    bounds : list
+        4326 bounds as xmin, ymin, xmax, ymax
+    dem_name : str
+        A DEM name supported e.g. 'glo_30', 'glo_90', 'nasadem'
+
+    Returns
+    -------
+    list[str]
+        Urls of the overlapping tiles
+
+    Raises
+    ------
+    DEMNotSupported
+       If not in supported dem Name
+    """
+    rows, _ = _get_overlapping_tile_rows(bounds, dem_name)
+    return _read_tile_table(dem_name)['url'][rows].tolist()
 
 
 def intersects_missing_glo_30_tiles(extent: list) -> bool:
-    extent_geo = box(*extent)
-    df_missing = get_overlapping_dem_tiles(extent, 'glo_90_missing')
-    return df_missing.intersects(extent_geo).sum() > 0
+    crossing = get_dateline_crossing(extent)
+    n_tiles = _query_tile_index('glo_90_missing', extent).size
+    if crossing:
+        n_tiles += _query_tile_index('glo_90_missing', _translate_bounds(extent, -2 * crossing)).size
+    return n_tiles > 0
@@ -1,17 +1,26 @@
 import io
+import tempfile
 import zipfile
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
 import rasterio
-import requests
-from rasterio.io import MemoryFile
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
 from .rio_tools import with_gdal_read_env
 
 
-def _get_retrying_session() -> requests.Session:
+# requests is imported when the first download is made
+if TYPE_CHECKING:
+    import requests
+
+
+def _get_retrying_session() -> 'requests.Session':
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
     session = requests.Session()
     retries = Retry(total=5, connect=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
     session.mount('https://', HTTPAdapter(max_retries=retries))
@@ -19,7 +28,17 @@ def _get_retrying_session() -> requests.Session:
     return session
 
 
-SESSION = _get_retrying_session()
+@cache
+def get_session() -> 'requests.Session':
+    """Get the retrying `requests` session shared by all downloads; created on first use."""
+    return _get_retrying_session()
+
+
+def __getattr__(name: str) -> object:
+    # `SESSION` was historically created at import
+    if name == 'SESSION':
+        return get_session()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 @with_gdal_read_env
@@ -30,10 +49,14 @@ def read_dem(dem_path: str) -> rasterio.DatasetReader:
     return dem_arr, dem_profile
 
 
+def _is_url(dem_path: str) -> bool:
+    return (dem_path[:7] == 'http://') or (dem_path[:8] == 'https://')
+
+
 def read_dem_bytes(dem_path: str, suffix: str = '.img') -> bytes:
     # online
-    if (dem_path[:7] == 'http://') or (dem_path[:8] == 'https://'):
-        resp = SESSION.get(dem_path)
+    if _is_url(dem_path):
+        resp = get_session().get(dem_path)
         resp.raise_for_status()
         data = io.BytesIO(resp.content)
     # local file
@@ -51,24 +74,40 @@ def read_dem_bytes(dem_path: str, suffix: str = '.img') -> bytes:
     return img_bytes
 
 
-def read_srtm(dem_path: str, version: str = 'srtm') -> tuple[np.ndarray, dict]:
-    img_bytes = read_dem_bytes(dem_path, suffix='.hgt')
-    # The gdal driver hgt depends on filename convention
-    filename = dem_path.split('/')[-1]
-    if version == 'srtm':
-        filename = filename.replace('.zip', '')
-    elif version == 'nasadem':
-        filename = filename.replace('.zip', '.hgt')
-        filename = filename.replace('NASADEM_HGT_', '')
-    else:
-        raise ValueError('version must be either nasadem or srtm')
+def spool_url_to_file(url: str, dest_path: Path, chunk_size: int = 2**20) -> Path:
+    """Stream the response of `url` to `dest_path` in chunks of `chunk_size` bytes (never holding it in memory)."""
+    with get_session().get(url, stream=True) as resp:
+        resp.raise_for_status()
+        with Path(dest_path).open('wb') as file:
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                file.write(chunk)
+    return dest_path
+
+
+def _read_zipped_hgt(zip_path: str | Path) -> tuple[np.ndarray, dict]:
+    # Only the central directory of the zip is read here
+    with zipfile.ZipFile(zip_path) as zip_ob:
+        hgt_name = [name for name in zip_ob.namelist() if name.endswith('.hgt')][0]
+    # The gdal driver hgt depends on filename convention, which the zip member follows
+    with rasterio.open(f'/vsizip/{Path(zip_path).resolve().as_posix()}/{hgt_name}') as dataset:
+        dem_arr = dataset.read(out_dtype=np.float32)
+        dem_profile = dataset.profile
+    return dem_arr, dem_profile
 
-    with MemoryFile(img_bytes, filename=filename) as memfile:
-        with memfile.open() as dataset:
-            dem_arr = dataset.read().astype(np.float32)
-            dem_profile = dataset.profile
 
-    return dem_arr, dem_profile
+def read_srtm(dem_path: str, version: str = 'srtm') -> tuple[np.ndarray, dict]:
+    """Read a zipped SRTM v3 or NASADEM tile (url or local path) as a float32 array.
+
+    Remote zips are spooled to a temporary file in chunks and the `.hgt` is decoded by gdal through `/vsizip/`
+    directly into the float32 array, so the only copy of the tile held in memory is the returned array.
+    """
+    if version not in ['srtm', 'nasadem']:
+        raise ValueError('version must be either nasadem or srtm')
+    if not _is_url(dem_path):
+        return _read_zipped_hgt(dem_path)
+    with tempfile.TemporaryDirectory(prefix='dem_stitcher_') as tmp_dir:
+        zip_path = spool_url_to_file(dem_path, Path(tmp_dir) / dem_path.split('/')[-1])
+        return _read_zipped_hgt(zip_path)
 
 
 def read_nasadem(dem_path: str) -> tuple[np.ndarray, dict]:
@@ -1,16 +1,19 @@
+import math
 import warnings
 from pathlib import Path
 
 import numpy as np
-import rasterio
 from rasterio.crs import CRS
 from rasterio.transform import array_bounds
+from rasterio.windows import Window
+from rasterio.windows import transform as window_transform
 
 from .datasets import DATA_PATH
 from .dateline import get_dateline_crossing, split_extent_across_dateline
+from .geoid_cache import GEOID_CACHE, GeoidCache
 from .merge import merge_arrays_with_geometadata
-from .rio_tools import reproject_arr_to_match_profile, translate_profile, with_gdal_read_env
-from .rio_window import read_raster_from_window
+from .rio_tools import reproject_arr_to_match_profile, translate_profile
+from .rio_window import get_array_bounds
 
 
 DEM2GEOID = {
@@ -23,6 +26,11 @@ DEM2GEOID = {
 }
 
 ARIA_GEOIDS = 'https://aria-geoid.s3.us-west-2.amazonaws.com'
+# Number of source pixels weighted along each axis by the resamplings applied separably (see `_add_geoid_offset`)
+SEPARABLE_RESAMPLING_TAPS = {'bilinear': 2, 'cubic': 4}
+# Bound of the blocks of the interpolated geoid held while it is added to a DEM (as gdal's default warp memory)
+MAX_MEMORY_BYTES = 2**26
+
 GEOID_PATHS_AGI = {
     'geoid_18': f'{DATA_PATH}/geoid_18.tif',
     'egm_08': f'{ARIA_GEOIDS}/us_nga_egm2008_1_4326__agisoft.tif',
@@ -65,36 +73,42 @@ def validate_geoid_path(geoid_path: str | Path) -> None:
     raise TypeError(f'Geoid path {geoid_path} is not of type str or Path.')
 
 
-@with_gdal_read_env
 def read_geoid(
     geoid_path: str | Path,
     extent: list | None = None,
     res_buffer: int = 1,
     extent_crs: CRS = CRS.from_epsg(4326),
+    geoid_cache: GeoidCache | None = None,
 ) -> tuple:
+    """Read the geoid (the window containing `extent` buffered by `res_buffer` pixels) with nodata as nan.
+
+    Pixels are read through `geoid_cache` (by default the in-process `geoid_cache.GEOID_CACHE`), so extents
+    near each other (and both halves of an extent crossing the dateline) do not read the same part of the geoid
+    twice.
+    """
+    cache = geoid_cache if geoid_cache is not None else GEOID_CACHE
     if extent is None:
-        with rasterio.open(geoid_path) as ds:
-            geoid_arr = ds.read()
-            geoid_profile = ds.profile
+        geoid_arr, geoid_profile = cache.read_window(geoid_path)
     else:
         crossing = get_dateline_crossing(extent)
 
         if crossing == 0:
-            geoid_arr, geoid_profile = read_raster_from_window(geoid_path, extent, extent_crs, res_buffer=res_buffer)
+            geoid_arr, geoid_profile = cache.read_raster_from_window(
+                geoid_path, extent, extent_crs, res_buffer=res_buffer
+            )
         else:
-            with rasterio.open(geoid_path) as ds:
-                xmin, _, xmax, _ = ds.bounds
-                if xmin > -180 or xmax < 180:
-                    warnings.warn(
-                        'Geoid file does not cover the dateline. May have np.nan values after removal'
-                        ' or unexpected behavior. Recommend using geoid with 1 pixel buffer around dateline.',
-                        category=UserWarning,
-                    )
+            xmin, _, xmax, _ = get_array_bounds(cache.get_profile(geoid_path))
+            if xmin > -180 or xmax < 180:
+                warnings.warn(
+                    'Geoid file does not cover the dateline. May have np.nan values after removal'
+                    ' or unexpected behavior. Recommend using geoid with 1 pixel buffer around dateline.',
+                    category=UserWarning,
+                )
             extent_l, extent_r = split_extent_across_dateline(extent)
-            geoid_arr_l, geoid_profile_l = read_raster_from_window(
+            geoid_arr_l, geoid_profile_l = cache.read_raster_from_window(
                 geoid_path, extent_l, extent_crs, res_buffer=res_buffer
             )
-            geoid_arr_r, geoid_profile_r = read_raster_from_window(
+            geoid_arr_r, geoid_profile_r = cache.read_raster_from_window(
                 geoid_path, extent_r, extent_crs, res_buffer=res_buffer
             )
             res_x = geoid_profile_l['transform'].a
@@ -113,26 +127,43 @@ def read_geoid(
     return geoid_arr, geoid_profile
 
 
-def remove_geoid(
-    dem_arr: np.ndarray,
-    dem_profile: dict,
-    geoid_path: str | Path,
-    res_buffer: int = 2,
-    resampling: str = 'cubic',
-    geoid_correction_mode: str = 'native',
-    dem_area_or_point: str | None = None,
-) -> np.ndarray:
-    """Interpolate the geoid at the sample locations implied by `dem_profile['transform']` and add it to the DEM.
-
-    Must be applied on the native DEM grid *before* any Area/Point pixel-registration relabeling so the geoid
-    is sampled where the DEM samples physically are.
-    See: https://github.com/ACCESS-Cloud-Based-InSAR/dem-stitcher/issues/151
+def prefetch_geoid(
+    geoid_path: str | Path, bounds: list[float], res_buffer: int = 2, geoid_cache: GeoidCache | None = None
+) -> tuple[np.ndarray, dict]:
+    """Read the geoid window `remove_geoid` needs for a DEM within `bounds` (in epsg:4326) before the DEM is read.
 
-    `geoid_correction_mode='aria-legacy'` intentionally reproduces the pre-3.0.0 behavior of issue #151:
-    when `dem_area_or_point='Point'`, the geoid grid is translated by half a *geoid* pixel before
-    interpolation. Full parity with 2.5.x additionally requires `resampling='bilinear'` and a `dem_profile`
-    that has already been relabeled via `shift_profile_for_pixel_loc`.
+    The window is buffered by one geoid pixel more than `res_buffer` so it also covers the DEM pixels straddling
+    `bounds`. Pass it to `remove_geoid` as `geoid_window`; `stitch_dem` reads it concurrently with the tiles.
     """
+    validate_geoid_path(geoid_path)
+    return read_geoid(geoid_path, extent=list(bounds), res_buffer=res_buffer + 1, geoid_cache=geoid_cache)
+
+
+def _window_covers_extent(geoid_profile: dict, extent: tuple[float, ...], extent_crs: CRS, res_buffer: int) -> bool:
+    """Check the geoid window contains the extent buffered by `res_buffer` geoid pixels."""
+    if geoid_profile['crs'] != extent_crs:
+        return False
+    xmin, ymin, xmax, ymax = get_array_bounds(geoid_profile)
+    buffer_x = res_buffer * geoid_profile['transform'].a
+    buffer_y = res_buffer * abs(geoid_profile['transform'].e)
+    return (
+        (xmin <= extent[0] - buffer_x + 1e-9)
+        and (ymin <= extent[1] - buffer_y + 1e-9)
+        and (xmax >= extent[2] + buffer_x - 1e-9)
+        and (ymax >= extent[3] + buffer_y - 1e-9)
+    )
+
+
+def _read_geoid_for_profile(
+    dem_profile: dict,
+    geoid_path: str | Path,
+    res_buffer: int,
+    geoid_correction_mode: str,
+    dem_area_or_point: str | None,
+    geoid_cache: GeoidCache | None,
+    geoid_window: tuple[np.ndarray, dict] | None = None,
+) -> tuple[np.ndarray, dict]:
+    """Read the geoid window covering the DEM grid of `dem_profile` (see `remove_geoid` for the parameters)."""
     if geoid_correction_mode not in ['native', 'aria-legacy']:
         raise ValueError("geoid_correction_mode must be 'native' or 'aria-legacy'")
     if geoid_correction_mode == 'aria-legacy' and dem_area_or_point not in ['Area', 'Point']:
@@ -142,10 +173,17 @@ def remove_geoid(
 
     extent = array_bounds(dem_profile['height'], dem_profile['width'], dem_profile['transform'])
 
-    validate_geoid_path(geoid_path)
-    geoid_arr, geoid_profile = read_geoid(
-        geoid_path, extent=list(extent), res_buffer=res_buffer, extent_crs=dem_profile['crs']
-    )
+    if (geoid_window is not None) and _window_covers_extent(geoid_window[1], extent, dem_profile['crs'], res_buffer):
+        geoid_arr, geoid_profile = geoid_window
+    else:
+        validate_geoid_path(geoid_path)
+        geoid_arr, geoid_profile = read_geoid(
+            geoid_path,
+            extent=list(extent),
+            res_buffer=res_buffer,
+            extent_crs=dem_profile['crs'],
+            geoid_cache=geoid_cache,
+        )
 
     t_dem = dem_profile['transform']
     t_geoid = geoid_profile['transform']
@@ -165,7 +203,201 @@ def remove_geoid(
     if geoid_correction_mode == 'aria-legacy' and dem_area_or_point == 'Point':
         geoid_profile = translate_profile(geoid_profile, -0.5, -0.5)
 
-    geoid_offset, _ = reproject_arr_to_match_profile(geoid_arr, geoid_profile, dem_profile, resampling=resampling)
+    return geoid_arr, geoid_profile
+
+
+def _cubic_kernel(t: np.ndarray) -> np.ndarray:
+    """Cubic convolution kernel (Keys, a = -0.5) used by gdal for 'cubic' resampling."""
+    t = np.abs(t)
+    near = (1.5 * t - 2.5) * t**2 + 1
+    far = ((-0.5 * t + 2.5) * t - 4) * t + 2
+    return np.where(t <= 1, near, np.where(t < 2, far, 0))
+
+
+def _interpolation_weights(
+    n_dst: int, start: float, step: float, n_src: int, resampling: str
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """Get the indices and weights of the source pixels interpolated at `n_dst` positions along one axis.
+
+    Positions are `start + step * i` in fractional source pixels measured from the center of the first source
+    pixel. Returns None if a position has a non-zero weight outside of the source.
+    """
+    u = start + step * np.arange(n_dst)
+    n_taps = SEPARABLE_RESAMPLING_TAPS[resampling]
+    indices = np.floor(u).astype(int)[:, None] + np.arange(1 - n_taps // 2, 1 + n_taps // 2)
+    distances = u[:, None] - indices
+    weights = _cubic_kernel(distances) if resampling == 'cubic' else np.clip(1 - np.abs(distances), 0, 1)
+    outside = (indices < 0) | (indices >= n_src)
+    if np.any(weights[outside] != 0):
+        return None
+    return np.clip(indices, 0, n_src - 1), weights
+
+
+def _interpolation_matrix(indices: np.ndarray, weights: np.ndarray, start: int, stop: int) -> tuple[slice, np.ndarray]:
+    """Get the source slice spanned by the positions `start:stop` and their (dense) weights over that slice."""
+    indices, weights = indices[start:stop], weights[start:stop]
+    src_start, src_stop = int(indices.min()), int(indices.max()) + 1
+    matrix = np.zeros((stop - start, src_stop - src_start))
+    rows = np.broadcast_to(np.arange(stop - start)[:, None], indices.shape)
+    # Positions clipped to the edge of the source repeat an index (with zero weight)
+    np.add.at(matrix, (rows, indices - src_start), weights)
+    return slice(src_start, src_stop), matrix
+
+
+def _separable_block_shape(step_y: float, step_x: float, max_memory_bytes: int) -> tuple[int, int]:
+    """Block shape so the source pixels spanned by a block are few relative to its size and it fits in memory."""
+    rows, cols = (int(np.clip(64 / step, 64, 512)) for step in (step_y, step_x))
+    # A (float64) block and the intermediate product are at most twice the block
+    scale = min(1.0, math.sqrt(max_memory_bytes / (16 * rows * cols)))
+    return max(int(rows * scale), 1), max(int(cols * scale), 1)
+
+
+def _add_separable_geoid_offset(
+    dem_arr: np.ndarray,
+    dem_profile: dict,
+    geoid_arr: np.ndarray,
+    geoid_profile: dict,
+    resampling: str,
+    max_memory_bytes: int = MAX_MEMORY_BYTES,
+) -> bool:
+    """Interpolate the geoid on the DEM grid with 1-D weights along x and y and add it to `dem_arr` in place.
+
+    Both grids are north-up in the same CRS, so the interpolation is separable: each block of the DEM is the
+    product (weights along y) @ geoid @ (weights along x).T of small dense matrices. The weights are those of gdal's
+    bilinear and cubic kernels when upsampling, so the result matches `reproject_arr_to_match_profile` up to
+    float32 rounding (within 1e-5 m for geoid heights). Returns False without modifying `dem_arr` when the geoid
+    cannot be interpolated this way, i.e. grids in different CRSs or rotated, a DEM coarser than the geoid (gdal
+    widens the kernels), geoid pixels needed outside of `geoid_arr` or nodata within the pixels needed.
+    """
+    if resampling not in SEPARABLE_RESAMPLING_TAPS or (geoid_arr.ndim == 3 and geoid_arr.shape[0] != 1):
+        return False
+    if dem_profile['crs'] != geoid_profile['crs']:
+        return False
+    t_dem, t_geoid = dem_profile['transform'], geoid_profile['transform']
+    transforms = [t_dem, t_geoid]
+    if not all(t.b == 0 and t.d == 0 and t.a > 0 and t.e < 0 for t in transforms):
+        return False
+    step_x, step_y = t_dem.a / t_geoid.a, t_dem.e / t_geoid.e
+    if step_x > 1 + 1e-9 or step_y > 1 + 1e-9:
+        return False
+
+    geoid = geoid_arr[0] if geoid_arr.ndim == 3 else geoid_arr
+    height, width = dem_arr.shape[-2:]
+    start_x = (t_dem.c + t_dem.a / 2 - t_geoid.c) / t_geoid.a - 0.5
+    start_y = (t_dem.f + t_dem.e / 2 - t_geoid.f) / t_geoid.e - 0.5
+    weights_x = _interpolation_weights(width, start_x, step_x, geoid.shape[1], resampling)
+    weights_y = _interpolation_weights(height, start_y, step_y, geoid.shape[0], resampling)
+    if weights_x is None or weights_y is None:
+        return False
+    geoid_rows = slice(int(weights_y[0].min()), int(weights_y[0].max()) + 1)
+    geoid_cols = slice(int(weights_x[0].min()), int(weights_x[0].max()) + 1)
+    if np.isnan(geoid[geoid_rows, geoid_cols]).any():
+        return False
+
+    geoid = geoid.astype(np.float64)
+    block_rows, block_cols = _separable_block_shape(step_y, step_x, max_memory_bytes)
+    for row_start in range(0, height, block_rows):
+        row_stop = min(row_start + block_rows, height)
+        src_rows, matrix_y = _interpolation_matrix(*weights_y, row_start, row_stop)
+        for col_start in range(0, width, block_cols):
+            col_stop = min(col_start + block_cols, width)
+            src_cols, matrix_x = _interpolation_matrix(*weights_x, col_start, col_stop)
+            dem_arr[..., row_start:row_stop, col_start:col_stop] += matrix_y @ geoid[src_rows, src_cols] @ matrix_x.T
+    return True
+
+
+def _add_geoid_offset(
+    dem_arr: np.ndarray,
+    dem_profile: dict,
+    geoid_arr: np.ndarray,
+    geoid_profile: dict,
+    resampling: str,
+    max_memory_bytes: int = MAX_MEMORY_BYTES,
+) -> np.ndarray:
+    """Add the geoid interpolated on the DEM grid to `dem_arr` in place, in blocks of at most `max_memory_bytes`.
+
+    The geoid is interpolated separably with numpy (see `_add_separable_geoid_offset`) when possible and is
+    otherwise warped with gdal (`reproject_arr_to_match_profile`) into blocks of rows of the DEM grid.
+    """
+    if _add_separable_geoid_offset(dem_arr, dem_profile, geoid_arr, geoid_profile, resampling, max_memory_bytes):
+        return dem_arr
+    height, width = dem_arr.shape[-2:]
+    block_rows = max(max_memory_bytes // (4 * width), 1)
+    for row_start in range(0, height, block_rows):
+        window = Window(0, row_start, width, min(block_rows, height - row_start))
+        block_profile = dem_profile.copy()
+        block_profile.update(
+            height=window.height, width=width, transform=window_transform(window, dem_profile['transform'])
+        )
+        geoid_offset, _ = reproject_arr_to_match_profile(geoid_arr, geoid_profile, block_profile, resampling=resampling)
+        dem_arr[..., window.row_off : window.row_off + window.height, :] += geoid_offset[0]
+    return dem_arr
+
+
+def sample_geoid(
+    dem_profile: dict,
+    geoid_path: str | Path,
+    res_buffer: int = 2,
+    resampling: str = 'cubic',
+    geoid_correction_mode: str = 'native',
+    dem_area_or_point: str | None = None,
+    geoid_cache: GeoidCache | None = None,
+    geoid_window: tuple[np.ndarray, dict] | None = None,
+) -> np.ndarray:
+    """Interpolate the geoid at the sample locations implied by `dem_profile['transform']`.
+
+    See `remove_geoid` for the parameters.
+    """
+    geoid_arr, geoid_profile = _read_geoid_for_profile(
+        dem_profile, geoid_path, res_buffer, geoid_correction_mode, dem_area_or_point, geoid_cache, geoid_window
+    )
+    geoid_offset = np.zeros((1, dem_profile['height'], dem_profile['width']), dtype=np.float32)
+    return _add_geoid_offset(geoid_offset, dem_profile, geoid_arr, geoid_profile, resampling)
+
 
-    dem_arr_offset = dem_arr + geoid_offset
-    return dem_arr_offset
+def remove_geoid(
+    dem_arr: np.ndarray,
+    dem_profile: dict,
+    geoid_path: str | Path,
+    res_buffer: int = 2,
+    resampling: str = 'cubic',
+    geoid_correction_mode: str = 'native',
+    dem_area_or_point: str | None = None,
+    geoid_cache: GeoidCache | None = None,
+    in_place: bool = False,
+    max_memory_bytes: int = MAX_MEMORY_BYTES,
+    geoid_window: tuple[np.ndarray, dict] | None = None,
+) -> np.ndarray:
+    """Interpolate the geoid at the sample locations implied by `dem_profile['transform']` and add it to the DEM.
+
+    Must be applied on the native DEM grid *before* any Area/Point pixel-registration relabeling so the geoid
+    is sampled where the DEM samples physically are.
+    See: https://github.com/ACCESS-Cloud-Based-InSAR/dem-stitcher/issues/151
+
+    `geoid_correction_mode='aria-legacy'` intentionally reproduces the pre-3.0.0 behavior of issue #151:
+    when `dem_area_or_point='Point'`, the geoid grid is translated by half a *geoid* pixel before
+    interpolation. Full parity with 2.5.x additionally requires `resampling='bilinear'` and a `dem_profile`
+    that has already been relabeled via `shift_profile_for_pixel_loc`.
+
+    The geoid is read through `geoid_cache` (see `read_geoid`). When the DEM and geoid are north-up grids in the
+    same CRS and the DEM is not coarser than the geoid, 'bilinear' and 'cubic' interpolation are computed separably
+    with numpy block by block and added into the output; they match gdal's warp within float32 rounding (1e-5 m).
+    Otherwise the geoid is warped with gdal. Either way, the interpolated geoid is held in blocks of at most
+    `max_memory_bytes` (64 MB by default). With `in_place=True`, the geoid is added into `dem_arr` itself (which
+    must be a floating point array) instead of a copy, so no array the size of the DEM is allocated.
+
+    `geoid_window` is an (array, profile) of the geoid already read (e.g. by `prefetch_geoid`); it is used instead
+    of reading the geoid if it contains the DEM grid buffered by `res_buffer` geoid pixels.
+    """
+    geoid_arr, geoid_profile = _read_geoid_for_profile(
+        dem_profile, geoid_path, res_buffer, geoid_correction_mode, dem_area_or_point, geoid_cache, geoid_window
+    )
+    if in_place:
+        if not np.issubdtype(dem_arr.dtype, np.floating):
+            raise ValueError('dem_arr must be a floating point array to remove the geoid in place')
+        dem_arr_offset = dem_arr
+    else:
+        shape = np.broadcast_shapes(dem_arr.shape, (1, dem_profile['height'], dem_profile['width']))
+        dem_arr_offset = np.empty(shape, dtype=np.result_type(dem_arr.dtype, np.float32))
+        dem_arr_offset[...] = dem_arr
+    return _add_geoid_offset(dem_arr_offset, dem_profile, geoid_arr, geoid_profile, resampling, max_memory_bytes)
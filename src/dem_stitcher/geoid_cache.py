@@ -0,0 +1,308 @@
+import hashlib
+import math
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.crs import CRS
+from rasterio.windows import Window
+from rasterio.windows import transform as window_transform
+
+from .rio_tools import with_gdal_read_env
+from .rio_window import format_window_profile, get_window_from_extent
+
+
+# Local geoids up to this size (e.g. the bundled `egm96_15.gtx`, ~4 MB) are held in memory entirely
+FULL_READ_MAX_BYTES = 2**26
+
+
+@dataclass
+class GeoidCacheStats:
+    """Counters of a `GeoidCache`.
+
+    Blocks (or entire local geoids) are counted as `hits` when served from memory, `disk_hits` when loaded from
+    `cache_dir`, and `misses` when read from the geoid itself; `bytes_fetched` is the (decoded) size of the latter.
+    """
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    bytes_fetched: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        n_reads = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / n_reads if n_reads else 0.0
+
+    def __add__(self, other: 'GeoidCacheStats') -> 'GeoidCacheStats':
+        return GeoidCacheStats(**{key: value + getattr(other, key) for key, value in asdict(self).items()})
+
+
+def _is_remote(geoid_path: str) -> bool:
+    return geoid_path.startswith(('http://', 'https://', 's3://', '/vsi'))
+
+
+class GeoidCache:
+    """In-process cache of geoid pixels so neighboring extents do not read the same geoid windows again.
+
+    Local geoids of at most `full_read_max_bytes` (e.g. the bundled `egm96_15.gtx`) are read entirely on first
+    use and kept in memory. Other geoids (e.g. the remote `egm_08` COG) are cached by square blocks of
+    `block_size` pixels in a least recently used cache of at most `max_bytes`; windows are assembled from the
+    blocks they intersect, so the arrays and profiles returned are identical to reading the windows directly.
+    Blocks can also be persisted to `cache_dir` (as `.npy` files written atomically) and are then loaded from
+    there by later processes before being read from the geoid. The metadata of each geoid is read once.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Bound of the blocks (and entire geoids) held in memory, by default 2**28 (256 MB). The most recently
+        read entry is kept even if it alone exceeds `max_bytes`.
+    cache_dir : str | Path | None, optional
+        Directory persisting the blocks of geoids that are not held entirely, by default None (not persisted)
+    block_size : int, optional
+        Height and width of the cached blocks, by default 512
+    full_read_max_bytes : int, optional
+        Largest local geoid held in memory entirely, by default 2**26 (64 MB)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 2**28,
+        cache_dir: str | Path | None = None,
+        block_size: int = 512,
+        full_read_max_bytes: int = FULL_READ_MAX_BYTES,
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError('max_bytes must be non-negative')
+        if block_size <= 0:
+            raise ValueError('block_size must be positive')
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir is not None else None
+        self.block_size = block_size
+        self.full_read_max_bytes = full_read_max_bytes
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._blocks = OrderedDict()
+        self._n_bytes = 0
+        self._profiles = {}
+        self._stats = GeoidCacheStats()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        cache_dir = str(self.cache_dir) if self.cache_dir is not None else None
+        return f'GeoidCache(max_bytes={self.max_bytes}, cache_dir={cache_dir!r}, block_size={self.block_size})'
+
+    @staticmethod
+    def _source_key(geoid_path: str) -> str:
+        """Key of a geoid; local files are also keyed by their modification time and size."""
+        if _is_remote(geoid_path):
+            return geoid_path
+        path = Path(geoid_path).resolve()
+        # Left to rasterio to raise when opened
+        if not path.is_file():
+            return geoid_path
+        stat = path.stat()
+        return f'{path}:{stat.st_mtime_ns}:{stat.st_size}'
+
+    def _record(self, **counts: int) -> None:
+        for name, count in counts.items():
+            setattr(self._stats, name, getattr(self._stats, name) + count)
+
+    @with_gdal_read_env
+    def get_profile(self, geoid_path: str | Path) -> dict:
+        """Get the (cached) profile of the geoid."""
+        geoid_path = str(geoid_path)
+        key = self._source_key(geoid_path)
+        with self._lock:
+            profile = self._profiles.get(key)
+        if profile is None:
+            with rasterio.open(geoid_path) as ds:
+                profile = ds.profile
+            with self._lock:
+                self._profiles[key] = profile
+        return profile.copy()
+
+    def _holds_entire_geoid(self, geoid_path: str, profile: dict) -> bool:
+        n_bytes = profile['count'] * profile['height'] * profile['width'] * np.dtype(profile['dtype']).itemsize
+        return (not _is_remote(geoid_path)) and (n_bytes <= self.full_read_max_bytes)
+
+    def _get_memory(self, key: tuple) -> np.ndarray | None:
+        with self._lock:
+            arr = self._blocks.get(key)
+            if arr is not None:
+                self._blocks.move_to_end(key)
+                self._record(hits=1)
+            return arr
+
+    def _put_memory(self, key: tuple, arr: np.ndarray) -> None:
+        with self._lock:
+            if key in self._blocks:
+                return
+            self._blocks[key] = arr
+            self._n_bytes += arr.nbytes
+            while (self._n_bytes > self.max_bytes) and (len(self._blocks) > 1):
+                _, evicted = self._blocks.popitem(last=False)
+                self._n_bytes -= evicted.nbytes
+                self._record(evictions=1)
+
+    def _disk_path(self, key: tuple) -> Path:
+        source_key, row, col = key
+        digest = hashlib.sha256(f'{source_key}:{self.block_size}'.encode()).hexdigest()
+        return self.cache_dir / digest[:2] / digest / f'{row}_{col}.npy'
+
+    def _get_disk(self, key: tuple) -> np.ndarray | None:
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        arr = np.load(path)
+        with self._lock:
+            self._record(disk_hits=1)
+        return arr
+
+    def _put_disk(self, key: tuple, arr: np.ndarray) -> None:
+        if self.cache_dir is None:
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp_', suffix='.npy')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                np.save(file, arr)
+            Path(tmp_name).replace(path)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+    @with_gdal_read_env
+    def _read_blocks(self, geoid_path: str, keys: list[tuple], profile: dict) -> dict:
+        """Read the blocks that are neither in memory nor on disk from the geoid (opening it once)."""
+        blocks = {}
+        missing = []
+        for key in keys:
+            arr = self._get_memory(key)
+            if arr is None:
+                arr = self._get_disk(key)
+                if arr is not None:
+                    self._put_memory(key, arr)
+            if arr is None:
+                missing.append(key)
+            else:
+                blocks[key] = arr
+        if missing:
+            with rasterio.open(geoid_path) as ds:
+                for key in missing:
+                    _, row, col = key
+                    if row is None:
+                        arr = ds.read()
+                    else:
+                        window = Window.from_slices(
+                            (row * self.block_size, min((row + 1) * self.block_size, profile['height'])),
+                            (col * self.block_size, min((col + 1) * self.block_size, profile['width'])),
+                        )
+                        arr = ds.read(window=window)
+                    with self._lock:
+                        self._record(misses=1, bytes_fetched=arr.nbytes)
+                    if row is not None:
+                        self._put_disk(key, arr)
+                    self._put_memory(key, arr)
+                    blocks[key] = arr
+        return blocks
+
+    def read_window(self, geoid_path: str | Path, window: Window | None = None) -> tuple[np.ndarray, dict]:
+        """Read a window (by default all) of the geoid, as `dataset.read(window=window)` and its profile.
+
+        Parameters
+        ----------
+        geoid_path : str | Path
+            Path or url of the geoid
+        window : Window | None, optional
+            Window within the geoid (e.g. from `get_window_from_extent`), by default None (the entire geoid)
+
+        Returns
+        -------
+        tuple[np.ndarray, dict]
+            (array, profile) of the window; the array is a copy the caller may modify.
+        """
+        geoid_path = str(geoid_path)
+        profile = self.get_profile(geoid_path)
+        if window is None:
+            window = Window(0, 0, profile['width'], profile['height'])
+        (row_start, row_stop), (col_start, col_stop) = window.toranges()
+        row_start, row_stop, col_start, col_stop = map(int, (row_start, row_stop, col_start, col_stop))
+        source_key = self._source_key(geoid_path)
+
+        if self._holds_entire_geoid(geoid_path, profile):
+            key = (source_key, None, None)
+            arr = self._read_blocks(geoid_path, [key], profile)[key]
+            arr_window = arr[:, row_start:row_stop, col_start:col_stop].copy()
+        else:
+            size = self.block_size
+            keys = [
+                (source_key, row, col)
+                for row in range(row_start // size, math.ceil(row_stop / size))
+                for col in range(col_start // size, math.ceil(col_stop / size))
+            ]
+            blocks = self._read_blocks(geoid_path, keys, profile)
+            arr_window = np.empty(
+                (profile['count'], row_stop - row_start, col_stop - col_start), dtype=np.dtype(profile['dtype'])
+            )
+            for (_, row, col), block in blocks.items():
+                rows = slice(max(row * size, row_start), min(row * size + block.shape[1], row_stop))
+                cols = slice(max(col * size, col_start), min(col * size + block.shape[2], col_stop))
+                arr_window[
+                    :, rows.start - row_start : rows.stop - row_start, cols.start - col_start : cols.stop - col_start
+                ] = block[
+                    :,
+                    rows.start - row * size : rows.stop - row * size,
+                    cols.start - col * size : cols.stop - col * size,
+                ]
+        t_window = window_transform(window, profile['transform'])
+        return arr_window, format_window_profile(profile, arr_window, t_window)
+
+    def read_raster_from_window(
+        self,
+        geoid_path: str | Path,
+        window_extent: list,
+        window_crs: CRS = CRS.from_epsg(4326),
+        res_buffer: int = 0,
+    ) -> tuple[np.ndarray, dict]:
+        """Read the window of the geoid containing an extent as `rio_window.read_raster_from_window` does."""
+        if (window_extent[0] >= window_extent[2]) or (window_extent[1] >= window_extent[3]):
+            raise ValueError('Extents must be in the form of (xmin, ymin, xmax, ymax)')
+        profile = self.get_profile(geoid_path)
+        window = get_window_from_extent(profile, window_extent, window_crs, res_buffer=res_buffer)
+        return self.read_window(geoid_path, window)
+
+    @property
+    def stats(self) -> GeoidCacheStats:
+        """Counters of this `GeoidCache`."""
+        with self._lock:
+            return GeoidCacheStats(**asdict(self._stats))
+
+    def size(self) -> int:
+        """Bytes of geoid pixels held in memory."""
+        with self._lock:
+            return self._n_bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._blocks)
+
+    def clear(self) -> None:
+        """Drop the blocks and profiles held in memory (not those persisted to `cache_dir`) and reset the counters."""
+        with self._lock:
+            self._blocks.clear()
+            self._profiles.clear()
+            self._n_bytes = 0
+            self._stats = GeoidCacheStats()
+
+
+# Cache used by `read_geoid` (and hence `stitch_dem`) unless another one is specified
+GEOID_CACHE = GeoidCache()
@@ -1,19 +1,25 @@
 import gzip
 import json
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import geopandas as gpd
 import shapely
-from rasterio.crs import CRS
 
 
-def read_geojson_gzip(input_zip_path: str | Path) -> gpd.GeoDataFrame:
+# geopandas is imported on first use
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+
+def read_geojson_gzip(input_zip_path: str | Path) -> 'gpd.GeoDataFrame':
+    import geopandas as gpd
+
     with gzip.GzipFile(input_zip_path, 'r') as file_in:
         data_gjson = json.loads(file_in.read().decode('utf-8'))
-    return gpd.GeoDataFrame.from_features(data_gjson['features'], crs=CRS.from_epsg(4326))
+    return gpd.GeoDataFrame.from_features(data_gjson['features'], crs='EPSG:4326')
 
 
-def to_geojson_obj(geodataframe: gpd.geodataframe.GeoDataFrame) -> dict:
+def to_geojson_obj(geodataframe: 'gpd.GeoDataFrame') -> dict:
     features = geodataframe.to_dict('records')
 
     def mapping_geojson(entry: dict) -> dict:
@@ -26,7 +32,7 @@ def to_geojson_obj(geodataframe: gpd.geodataframe.GeoDataFrame) -> dict:
     return geojson
 
 
-def to_geojson_gzip(geodataframe: gpd.geodataframe.GeoDataFrame, dest_path: str) -> Path:
+def to_geojson_gzip(geodataframe: 'gpd.GeoDataFrame', dest_path: str) -> Path:
     geojson_ob = to_geojson_obj(geodataframe)
     with gzip.GzipFile(dest_path, 'w') as file_out:
         file_out.write(json.dumps(geojson_ob).encode('utf-8'))
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+# Stages of `stitch_dem`, in the order they start
+STAGES = ['lookup', 'open', 'geoid_fetch', 'read', 'merge', 'geoid', 'resample']
+
+
+@dataclass(frozen=True)
+class StageEvent:
+    """A stage of the stitching pipeline, emitted to the `on_stage` callback of `stitch_dem` when it completes.
+
+    Stages are 'lookup' (finding and localizing the tiles of a DEM), 'open' (opening the tiles of all the DEMs),
+    'geoid_fetch' (reading the geoid window, concurrently with the previous and next stages), 'read' (reading and
+    merging the tiles of a DEM), 'merge' (filling the first DEM with the others), 'geoid' (removing the geoid,
+    including waiting for its window) and 'resample' (cropping or resampling to the output grid). Stages run in
+    threads emit their events from those threads.
+
+    `bytes_read` is the (decoded) size of the tile pixels read and `shape` that of the array the stage outputs.
+    """
+
+    stage: str
+    seconds: float
+    dem_name: str | None = None
+    n_tiles: int = 0
+    bytes_read: int = 0
+    shape: tuple[int, ...] | None = None
+
+
+@contextmanager
+def record_stage(on_stage: Callable[[StageEvent], None] | None, stage: str, **fields: object) -> Iterator[dict]:
+    """Time the block and emit its `StageEvent` to `on_stage` (if not None) when the block completes.
+
+    Yields the fields of the event, which the block can update (e.g. with the shape of its output).
+    """
+    if on_stage is None:
+        yield fields
+        return
+    start = time.perf_counter()
+    yield fields
+    on_stage(StageEvent(stage, time.perf_counter() - start, **fields))
+
+
+class StageTimings:
+    """Collector of the `StageEvent`s of one or more stitches, passed as their `on_stage` callback.
+
+    Events can be emitted concurrently (from the threads of a stitch or from concurrent stitches).
+
+    Examples
+    --------
+    >>> timings = StageTimings()
+    >>> X, p = stitch_dem(bounds, 'glo_30', on_stage=timings)
+    >>> print(timings.summary())
+    """
+
+    def __init__(self) -> None:
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event: StageEvent) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def report(self) -> dict[str, dict]:
+        """Totals of the events of each stage: 'count', 'seconds', 'n_tiles' and 'bytes_read'.
+
+        Stages are in pipeline order. The seconds of stages run concurrently (e.g. 'geoid_fetch') overlap.
+        """
+        with self._lock:
+            events = list(self.events)
+        order = STAGES + sorted({event.stage for event in events} - set(STAGES))
+        report = {}
+        for stage in order:
+            stage_events = [event for event in events if event.stage == stage]
+            if stage_events:
+                report[stage] = {
+                    'count': len(stage_events),
+                    'seconds': sum(event.seconds for event in stage_events),
+                    'n_tiles': sum(event.n_tiles for event in stage_events),
+                    'bytes_read': sum(event.bytes_read for event in stage_events),
+                }
+        return report
+
+    def summary(self) -> str:
+        """Table of the report."""
+        lines = [f'{"stage":<12} {"count":>5} {"seconds":>9} {"tiles":>6} {"MB read":>9}']
+        for stage, totals in self.report().items():
+            lines.append(
+                f'{stage:<12} {totals["count"]:>5} {totals["seconds"]:9.3f} {totals["n_tiles"]:>6} '
+                f'{totals["bytes_read"] / 2**20:9.2f}'
+            )
+        return '\n'.join(lines)
@@ -1,20 +1,190 @@
 import concurrent.futures
 import math
 import warnings
+from contextlib import ExitStack
 
 import numpy as np
 import rasterio
 from affine import Affine
 from rasterio.crs import CRS
 from rasterio.enums import Resampling
-from rasterio.io import MemoryFile
 from rasterio.merge import MERGE_METHODS, merge
 from rasterio.windows import Window
+from rasterio.windows import transform as window_transform
 from shapely.geometry import box
-from tqdm import tqdm
 
+from .progress import Progress, track
 from .rio_tools import in_memory_profile
-from .rio_window import format_window_profile, get_window_from_extent
+from .rio_window import get_array_bounds, get_window_from_extent
+
+
+def _get_decimation(size: int, ratio: float) -> int:
+    """Get the largest integer factor at most `ratio` dividing `size` so decimated pixels never straddle tiles."""
+    for decimation in range(max(math.floor(ratio + 1e-9), 1), 0, -1):
+        if size % decimation == 0:
+            return decimation
+
+
+def _decimate_window(window: Window, decimation: tuple[int, int], shape: tuple[int, int]) -> Window:
+    """Expand a window to whole (row, col) blocks of `decimation` pixels counted from the tile origin."""
+    (d_row, d_col), (height, width) = decimation, shape
+    row_start = (int(window.row_off) // d_row) * d_row
+    col_start = (int(window.col_off) // d_col) * d_col
+    row_stop = min(math.ceil((window.row_off + window.height) / d_row) * d_row, height)
+    col_stop = min(math.ceil((window.col_off + window.width) / d_col) * d_col, width)
+    return Window.from_slices((row_start, row_stop), (col_start, col_stop))
+
+
+def _get_overview_factor(dataset: rasterio.DatasetReader, decimation: tuple[int, int]) -> int:
+    """Estimate the overview level gdal reads for a decimated read, i.e. the coarsest one not exceeding it."""
+    factors = [factor for factor in dataset.overviews(1) if factor <= min(decimation)]
+    return max(factors, default=1)
+
+
+def _overlaps_as_polygon(bounds: list[float], extent: list[float]) -> bool:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        return box(*bounds).intersects(box(*extent)) and (
+            box(*bounds).intersection(box(*extent)).geom_type == 'Polygon'
+        )
+
+
+def _get_window_profile(profile: dict, window: Window, decimation: tuple[int, int]) -> dict:
+    d_row, d_col = decimation
+    profile_window = profile.copy()
+    profile_window['transform'] = window_transform(window, profile['transform']) * Affine.scale(d_col, d_row)
+    profile_window['height'] = window.height // d_row
+    profile_window['width'] = window.width // d_col
+    return profile_window
+
+
+def _plan_tile_windows(
+    profiles: list[dict],
+    extent: list,
+    dst_resolution: float | tuple[float] | None = None,
+    n_threads: int = 5,
+    progress: Progress = True,
+) -> tuple[list[int], list[Window], list[Window], list[tuple[int, int]], list[dict]]:
+    """Find the tiles overlapping the extent and the windows (and profiles) that are read from them.
+
+    Returns the indices of the overlapping tiles, the minimal windows containing the extent, the windows read
+    (expanded to whole decimated pixels), the (row, col) decimations and the profiles of the windows read.
+    """
+    indices = [i for (i, p) in enumerate(profiles) if _overlaps_as_polygon(get_array_bounds(p), extent)]
+    profiles = [profiles[i] for i in indices]
+
+    def window_partial(profile: dict) -> Window:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            window = get_window_from_extent(profile, extent, window_crs=CRS.from_epsg(4326))
+        return window
+
+    def decimation_partial(profile: dict) -> tuple[int, int]:
+        if dst_resolution is None:
+            return (1, 1)
+        x_res, y_res = (dst_resolution, dst_resolution) if np.isscalar(dst_resolution) else dst_resolution
+        transform = profile['transform']
+        return (
+            _get_decimation(profile['height'], abs(y_res / transform.e)),
+            _get_decimation(profile['width'], abs(x_res / transform.a)),
+        )
+
+    decimations = list(map(decimation_partial, profiles))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
+        windows = list(
+            track(
+                executor.map(window_partial, profiles),
+                progress,
+                'metadata',
+                total=len(profiles),
+                desc='Reading tile metadata',
+            )
+        )
+    read_windows = [
+        _decimate_window(window, decimation, (p['height'], p['width'])) if decimation != (1, 1) else window
+        for (window, decimation, p) in zip(windows, decimations, profiles)
+    ]
+    profs_window = [
+        _get_window_profile(p, window, decimation)
+        for (p, window, decimation) in zip(profiles, read_windows, decimations)
+    ]
+    return indices, windows, read_windows, decimations, profs_window
+
+
+def _get_merged_grid(profiles: list[dict]) -> tuple[Affine, int, int, list[tuple[slice, slice]] | None]:
+    """Get the grid (transform, height, width) windows are merged into and, if pixel-aligned, their slices of it.
+
+    Unaligned windows are merged by `rasterio.merge` into the grid spanning their union at the resolution of the
+    first one, which is reproduced here.
+    """
+    t_ref = profiles[0]['transform']
+    offsets = _aligned_pixel_offsets(profiles)
+    if offsets is None:
+        bounds = np.array([get_array_bounds(p) for p in profiles])
+        xmin, ymax = bounds[:, 0].min(), bounds[:, 3].max()
+        width = round((bounds[:, 2].max() - xmin) / t_ref.a)
+        height = round((ymax - bounds[:, 1].min()) / -t_ref.e)
+        return Affine.translation(xmin, ymax) * Affine.scale(t_ref.a, t_ref.e), height, width, None
+
+    row_offs, col_offs = zip(*offsets)
+    row_min, col_min = min(row_offs), min(col_offs)
+    height = max(r - row_min + p['height'] for r, p in zip(row_offs, profiles))
+    width = max(c - col_min + p['width'] for c, p in zip(col_offs, profiles))
+    slices = [
+        (slice(r - row_min, r - row_min + p['height']), slice(c - col_min, c - col_min + p['width']))
+        for (r, c), p in zip(offsets, profiles)
+    ]
+    transform = Affine.translation(t_ref.c + col_min * t_ref.a, t_ref.f + row_min * t_ref.e) * Affine.scale(
+        t_ref.a, t_ref.e
+    )
+    return transform, height, width, slices
+
+
+def get_merged_profile_within_extent(
+    profiles: list[dict],
+    extent: list,
+    nodata: float = None,
+    dtype: str | np.dtype = None,
+    dst_resolution: float | tuple[float] | None = None,
+    progress: Progress = True,
+) -> dict | None:
+    """Get the profile of `merge_tile_datasets_within_extent` (with the same arguments) without reading any pixels.
+
+    Parameters
+    ----------
+    profiles : list[dict]
+        Profiles of the tiles
+    extent : list
+        [xmin, ymin, xmax, ymax] in epsg:4326
+    nodata : float, optional
+        Nodata of the merged array, by default None (the nodata of the first tile)
+    dtype : str | np.dtype, optional
+        Dtype of the merged array, by default None (the dtype of the first tile)
+    dst_resolution : float | tuple[float], optional
+        See `merge_tile_datasets_within_extent`, by default None
+    progress : Callable[[ProgressEvent], None] | bool, optional
+        See `merge_tile_datasets_within_extent`, by default True
+
+    Returns
+    -------
+    dict | None
+        Merged profile or None if no tile overlaps the extent
+    """
+    indices, _, _, _, profs_window = _plan_tile_windows(
+        profiles, extent, dst_resolution=dst_resolution, progress=progress
+    )
+    if not indices:
+        return None
+    transform, height, width, _ = _get_merged_grid(profs_window)
+    profile = profs_window[0].copy()
+    profile.update(
+        transform=transform,
+        height=height,
+        width=width,
+        nodata=nodata if nodata is not None else profile['nodata'],
+        dtype=dtype if dtype is not None else profile['dtype'],
+    )
+    return profile
 
 
 def merge_tile_datasets_within_extent(
@@ -24,7 +194,48 @@ def merge_tile_datasets_within_extent(
     nodata: float = None,
     n_threads: int = 5,
     dtype: str | np.dtype = None,
+    dst_resolution: float | tuple[float] | None = None,
+    read_resampling: str = 'average',
+    read_stats: dict | None = None,
+    progress: Progress = True,
 ) -> tuple[np.ndarray, dict]:
+    """Merge the minimum pixels of the tiles that contain the extent.
+
+    Parameters
+    ----------
+    datasets : list[rasterio.DatasetReader] | list[str]
+        Tiles (or paths to them) in epsg:4326 or epsg:4269
+    extent : list
+        [xmin, ymin, xmax, ymax] in epsg:4326
+    resampling : str, optional
+        Resampling used if the tiles are not pixel-aligned, i.e. resampled along x if they only share rows (e.g.
+        Copernicus tiles across latitude bands) or merged with `rasterio.merge` otherwise, by default 'nearest'
+    nodata : float, optional
+        Nodata of the merged array, by default None (the nodata of the first tile)
+    n_threads : int, optional
+        Threads for reading tiles, by default 5
+    dtype : str | np.dtype, optional
+        Dtype of the merged array, by default None (the dtype of the first tile)
+    dst_resolution : float | tuple[float], optional
+        Resolution (x_res, y_res) the merged array will be resampled to. When at least twice as coarse as a tile,
+        the tile is read decimated by the largest integer factor (per axis) not exceeding the ratio of the
+        resolutions that divides the tile dimensions, so gdal reads the tile's overviews (if any) and fewer
+        pixels. Windows are expanded to whole decimated pixels counted from the tile origin, so decimated tiles
+        remain aligned with each other. By default None, i.e. tiles are read at full resolution.
+    read_resampling : str, optional
+        Resampling of decimated reads, by default 'average'
+    read_stats : dict, optional
+        If specified, updated with the number of 'pixels_read' and 'bytes_read' (estimated from the overview
+        level gdal reads) and the 'bytes_full_resolution' the same windows take at full resolution.
+    progress : Callable[[ProgressEvent], None] | bool, optional
+        Progress of planning ('metadata') and reading ('read') the tile windows: a callback receiving
+        `dem_stitcher.progress.ProgressEvent`s, True for tqdm bars (default) or False for none
+
+    Returns
+    -------
+    tuple[np.ndarray, dict]
+        Merged array and profile
+    """
     # 4269 is North American epsg similar to 4326 and used for 3dep DEM
     inputs_str = isinstance(datasets[0], str)
     if inputs_str:
@@ -35,56 +246,155 @@ def merge_tile_datasets_within_extent(
     if datasets_objs[0].profile['crs'] not in [CRS.from_epsg(4326), CRS.from_epsg(4269)]:
         raise ValueError('CRS must be epgs:4326')
 
-    with warnings.catch_warnings():
-        warnings.simplefilter('ignore', category=RuntimeWarning)
-        datasets_filtered = [
-            ds
-            for ds in datasets_objs
-            if (
-                box(*ds.bounds).intersects(box(*extent))
-                and (box(*ds.bounds).intersection(box(*extent)).geom_type == 'Polygon')
+    src_profiles = [ds.profile for ds in datasets_objs]
+    indices, windows, read_windows, decimations, profs_window = _plan_tile_windows(
+        src_profiles, extent, dst_resolution=dst_resolution, n_threads=n_threads, progress=progress
+    )
+    datasets_filtered = [datasets_objs[i] for i in indices]
+    src_profiles = [src_profiles[i] for i in indices]
+
+    if read_stats is not None:
+        for ds, window, read_window, decimation, prof in zip(
+            datasets_filtered, windows, read_windows, decimations, profs_window
+        ):
+            factor = _get_overview_factor(ds, decimation) if decimation != (1, 1) else 1
+            bytes_per_pixel = ds.count * np.dtype(ds.dtypes[0]).itemsize
+            pixels_decoded = math.ceil(read_window.height / factor) * math.ceil(read_window.width / factor)
+            pixels_read = prof['count'] * prof['height'] * prof['width']
+            read_stats['pixels_read'] = read_stats.get('pixels_read', 0) + pixels_read
+            read_stats['bytes_read'] = read_stats.get('bytes_read', 0) + pixels_decoded * bytes_per_pixel
+            read_stats['bytes_full_resolution'] = (
+                read_stats.get('bytes_full_resolution', 0) + window.height * window.width * bytes_per_pixel
             )
-        ]
 
-    src_profiles = [ds.profile for ds in datasets_filtered]
+    merged = _read_into_mosaic(
+        datasets_filtered,
+        read_windows,
+        profs_window,
+        nodata=nodata if nodata is not None else src_profiles[0]['nodata'],
+        dtype=dtype if dtype is not None else src_profiles[0]['dtype'],
+        read_resampling=read_resampling,
+        n_threads=n_threads,
+        progress=progress,
+    )
+    if merged is not None:
+        arr_merged, prof_merged = merged
+    else:
 
-    def window_partial(profile: dict) -> Window:
-        with warnings.catch_warnings():
-            warnings.simplefilter('ignore', category=RuntimeWarning)
-            window = get_window_from_extent(profile, extent, window_crs=CRS.from_epsg(4326))
-        return window
+        def read_in_window(dataset: rasterio.DatasetReader, window: Window, profile: dict) -> np.ndarray:
+            out_shape = (profile['count'], profile['height'], profile['width'])
+            return dataset.read(window=window, out_shape=out_shape, resampling=Resampling[read_resampling])
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
+            arrs_window = list(
+                track(
+                    executor.map(read_in_window, datasets_filtered, read_windows, profs_window),
+                    progress,
+                    'read',
+                    total=len(read_windows),
+                    desc='Reading tile imagery',
+                    nbytes=lambda _, arr: arr.nbytes,
+                )
+            )
+        if dtype is not None:
+            arrs_window = [arr.astype(dtype) for arr in arrs_window]
+        arr_merged, prof_merged = merge_arrays_with_geometadata(
+            arrs_window, profs_window, resampling=resampling, method='first', nodata=nodata, dtype=dtype
+        )
+    if inputs_str:
+        [ds.close() for ds in datasets_objs]
+    return arr_merged, prof_merged
+
+
+def _nodata_mask(arr: np.ndarray, nodataval: float) -> np.ndarray:
+    if math.isnan(nodataval):
+        return np.isnan(arr)
+    if np.issubdtype(arr.dtype, np.integer):
+        return arr == nodataval
+    return np.isclose(arr, nodataval)
+
+
+def _is_same_nodata(nodata: float, other: float) -> bool:
+    return (nodata == other) or (math.isnan(nodata) and math.isnan(other))
+
+
+def _slices_overlap(slices: tuple[slice, slice], other: tuple[slice, slice]) -> bool:
+    return all((s.start < o.stop) and (o.start < s.stop) for (s, o) in zip(slices, other))
+
+
+def _read_into_mosaic(
+    datasets: list[rasterio.DatasetReader],
+    windows: list[Window],
+    profiles: list[dict],
+    nodata: float | None,
+    dtype: str | np.dtype,
+    read_resampling: str,
+    n_threads: int,
+    progress: Progress = True,
+) -> tuple[np.ndarray, dict] | None:
+    """Read pixel-aligned tile windows directly into their slices of a preallocated mosaic.
+
+    The mosaic is allocated once (in `dtype`, filled with `nodata`) from the pixel offsets of the windows and
+    each thread reads its window (with gdal converting the dtype) into a view of it, so the tile data is neither
+    copied nor cast afterwards. Source nodata is then replaced by `nodata` in place. Windows overlapping other
+    windows (e.g. the buffered `3dep` tiles) are read into their own arrays and composited in order as in
+    `_merge_aligned_arrays` so the first tile wins. Returns None when the windows are not pixel-aligned so the
+    caller can fall back to `merge_arrays_with_geometadata`.
+    """
+    transform, height, width, slices = _get_merged_grid(profiles)
+    if slices is None:
+        return None
+    dt = np.dtype(dtype)
+    if nodata is not None and not _nodata_representable(nodata, dt):
+        return None
+    nodataval = 0 if nodata is None else nodata
+    count = profiles[0]['count']
+    mosaic = np.full((count, height, width), nodataval, dtype=dt)
+
+    overlapping = [
+        any(_slices_overlap(slices[i], slices[j]) for j in range(len(slices)) if j != i) for i in range(len(slices))
+    ]
 
-    def read_in_window(dataset: rasterio.DatasetReader, window: rasterio.windows.Window) -> np.ndarray:
-        return dataset.read(window=window)
+    def read_one_tile(i: int) -> np.ndarray | None:
+        rows, cols = slices[i]
+        if overlapping[i]:
+            out = np.empty((count, rows.stop - rows.start, cols.stop - cols.start), dtype=dt)
+        else:
+            out = mosaic[:, rows, cols]
+        # The shape of out decimates the read if needed
+        datasets[i].read(window=windows[i], out=out, resampling=Resampling[read_resampling])
+        src_nodata = profiles[i]['nodata']
+        if (src_nodata is not None) and not _is_same_nodata(src_nodata, nodataval):
+            out[np.isnan(out) if math.isnan(src_nodata) else (out == src_nodata)] = nodataval
+        return out if overlapping[i] else None
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
-        windows = list(
-            tqdm(executor.map(window_partial, src_profiles[:]), total=len(src_profiles), desc='Reading tile metadata')
-        )
-        assert len(datasets_filtered) == len(windows), 'input_lengths of datasets and windows not aligned'
-        arrs_window = list(
-            tqdm(
-                executor.map(read_in_window, datasets_filtered, windows),
-                total=len(windows),
+        arrs_overlapping = list(
+            track(
+                executor.map(read_one_tile, range(len(datasets))),
+                progress,
+                'read',
+                total=len(datasets),
                 desc='Reading tile imagery',
+                nbytes=lambda i, _: count * profiles[i]['height'] * profiles[i]['width'] * dt.itemsize,
             )
         )
 
-    # arrs_window = [ds.read(window=window) for (ds, window) in zip(datasets_filtered, windows)]
-    if dtype is not None:
-        arrs_window = [arr.astype(dtype) for arr in arrs_window]
-    trans_window = [ds.window_transform(window=window) for (ds, window) in zip(datasets_filtered, windows)]
-    profs_window = [
-        format_window_profile(p_s, arr_w, tran_w)
-        for (p_s, arr_w, tran_w) in zip(src_profiles, arrs_window, trans_window)
-    ]
+    copyto = MERGE_METHODS['first']
+    for (rows, cols), arr in zip(slices, arrs_overlapping):
+        if arr is None:
+            continue
+        region = mosaic[:, rows, cols]
+        copyto(region, arr, _nodata_mask(region, nodataval), _nodata_mask(arr, nodataval))
 
-    arr_merged, prof_merged = merge_arrays_with_geometadata(
-        arrs_window, profs_window, resampling=resampling, method='first', nodata=nodata, dtype=dtype
-    )
-    if inputs_str:
-        [ds.close() for ds in datasets_objs]
-    return arr_merged, prof_merged
+    prof_merged = profiles[0].copy()
+    prof_merged['transform'] = transform
+    prof_merged['count'] = count
+    prof_merged['height'] = height
+    prof_merged['width'] = width
+    prof_merged['nodata'] = nodata
+    prof_merged['dtype'] = dtype
+    return mosaic, prof_merged
 
 
 def _integer_pixel_offset(value: float) -> int | None:
@@ -109,6 +419,108 @@ def _aligned_pixel_offsets(profiles: list[dict]) -> list[tuple[int | None, int |
     return None if any(None in offset for offset in offsets) else offsets
 
 
+def _row_aligned_pixel_offsets(profiles: list[dict]) -> list[int] | None:
+    """Get the row offsets of grids sharing rows (CRS, y resolution and row origins) but not column spacing.
+
+    Copernicus tiles above 50 degrees latitude are coarser in longitude by a factor that changes with the latitude
+    band, so a mosaic spanning a band boundary has this structure.
+    """
+    t_ref = profiles[0]['transform']
+    transforms = [p['transform'] for p in profiles]
+    north_up = all(t.b == 0 and t.d == 0 and t.a > 0 and t.e < 0 for t in transforms)
+    same_crs = all(p['crs'] == profiles[0]['crs'] for p in profiles)
+    same_y_res = all(math.isclose(t.e, t_ref.e, rel_tol=1e-9) for t in transforms)
+    if not (north_up and same_crs and same_y_res):
+        return None
+    row_offsets = [_integer_pixel_offset((t.f - t_ref.f) / t_ref.e) for t in transforms]
+    return None if None in row_offsets else row_offsets
+
+
+def _resample_columns(
+    arr: np.ndarray, src_transform: Affine, dst_transform: Affine, dst_width: int, mask: np.ndarray, resampling: str
+) -> tuple[slice, np.ndarray, np.ndarray]:
+    """Resample an array along x (rows are shared) onto the columns of the destination grid it covers.
+
+    Returns the destination column slice and the resampled array and nodata mask. Bilinear interpolation weights
+    only valid neighbors and is clamped at the edges of the array, as gdal does.
+    """
+    width = arr.shape[-1]
+    # Destination columns whose centers are within the array
+    x_left, x_right = src_transform.c, src_transform.c + width * src_transform.a
+    col_start = max(math.ceil((x_left - dst_transform.c) / dst_transform.a - 0.5 - 1e-9), 0)
+    col_stop = min(math.ceil((x_right - dst_transform.c) / dst_transform.a - 0.5 - 1e-9), dst_width)
+    centers = dst_transform.c + (np.arange(col_start, col_stop) + 0.5) * dst_transform.a
+    # Fractional column of the destination centers measured from the center of the first column
+    u = (centers - src_transform.c) / src_transform.a - 0.5
+    if resampling == 'nearest':
+        index = np.clip(np.floor(u + 0.5).astype(int), 0, width - 1)
+        return slice(col_start, col_stop), np.take(arr, index, axis=-1), np.take(mask, index, axis=-1)
+
+    left = np.clip(np.floor(u).astype(int), 0, width - 1)
+    right = np.clip(left + 1, 0, width - 1)
+    w_right = np.clip(u - left, 0, 1)
+    w_left = 1 - w_right
+    valid_left, valid_right = ~np.take(mask, left, axis=-1), ~np.take(mask, right, axis=-1)
+    weights = w_left * valid_left + w_right * valid_right
+    data = np.where(valid_left, w_left * np.take(arr, left, axis=-1), 0) + np.where(
+        valid_right, w_right * np.take(arr, right, axis=-1), 0
+    )
+    # A neighbor with zero weight does not count as valid data
+    out_mask = weights <= 1e-12
+    with np.errstate(invalid='ignore', divide='ignore'):
+        data = data / np.where(out_mask, 1, weights)
+    return slice(col_start, col_stop), data, out_mask
+
+
+def _merge_row_aligned_arrays(
+    arrays: list[np.ndarray],
+    profiles: list[dict],
+    nodata: float | None,
+    dtype: str | np.dtype,
+    method: str,
+    resampling: str,
+) -> tuple[np.ndarray, Affine] | None:
+    """Composite arrays sharing rows but not column spacing by resampling them along x with numpy.
+
+    The arrays are merged into the grid `rasterio.merge` uses (the union of the arrays at the resolution of the
+    first) after resampling each along x only ('nearest' or 'bilinear'), so the in-memory GTiff round-trip is
+    skipped for e.g. Copernicus tiles spanning latitude bands. Arrays are sampled at the pixel centers of the grid
+    whereas `rasterio.merge` first snaps each array to whole pixels of the grid, so values may be shifted by up to
+    a pixel relative to it. Composited with `MERGE_METHODS` as in `_merge_aligned_arrays`. Returns None when the
+    grids do not share rows or the resampling is not supported so the caller can fall back to `rasterio.merge`.
+    """
+    if resampling not in ['nearest', 'bilinear']:
+        return None
+    row_offsets = _row_aligned_pixel_offsets(profiles)
+    if row_offsets is None:
+        return None
+    dt = np.dtype(dtype)
+    if nodata is not None and not _nodata_representable(nodata, dt):
+        return None
+    nodataval = 0 if nodata is None else nodata
+
+    transform, height, width, _ = _get_merged_grid(profiles)
+    row_min = _integer_pixel_offset((transform.f - profiles[0]['transform'].f) / transform.e)
+    copyto = MERGE_METHODS[method]
+    dest = np.full((arrays[0].shape[0], height, width), nodataval, dtype=dt)
+    for arr, profile, row_off in zip(arrays, profiles, row_offsets):
+        data = np.asarray(arr, dtype=np.dtype(profile['dtype']))
+        src_nodata = profile['nodata']
+        if src_nodata is None:
+            data_mask = np.zeros(data.shape, dtype=bool)
+        elif math.isnan(src_nodata):
+            data_mask = np.isnan(data)
+        else:
+            data_mask = data == src_nodata
+        cols, data, data_mask = _resample_columns(data, profile['transform'], transform, width, data_mask, resampling)
+        if np.issubdtype(dt, np.integer) and not np.issubdtype(data.dtype, np.integer):
+            data = np.rint(data)
+        rows = slice(row_off - row_min, row_off - row_min + data.shape[1])
+        region = dest[:, rows, cols]
+        copyto(region, data.astype(dt, copy=False), _nodata_mask(region, nodataval), data_mask)
+    return dest, transform
+
+
 def _nodata_representable(nodataval: float, dt: np.dtype) -> bool:
     if np.issubdtype(dt, np.integer):
         info = np.iinfo(dt)
@@ -154,12 +566,7 @@ def _merge_aligned_arrays(
         rows = slice(row_off - row_min, row_off - row_min + data.shape[1])
         cols = slice(col_off - col_min, col_off - col_min + data.shape[2])
         region = dest[:, rows, cols]
-        if math.isnan(nodataval):
-            region_mask = np.isnan(region)
-        elif np.issubdtype(dt, np.integer):
-            region_mask = region == nodataval
-        else:
-            region_mask = np.isclose(region, nodataval)
+        region_mask = _nodata_mask(region, nodataval)
         src_nodata = profile['nodata']
         if src_nodata is None:
             data_mask = np.zeros(data.shape, dtype=bool)
@@ -175,6 +582,29 @@ def _merge_aligned_arrays(
     return dest, merged_transform
 
 
+def _merge_in_memory_datasets(
+    arrays: list[np.ndarray],
+    profiles: list[dict],
+    resampling: str,
+    method: str,
+    nodata: float | None,
+    dtype: str | np.dtype,
+) -> tuple[np.ndarray, Affine]:
+    """Merge arrays with `rasterio.merge` from gdal MEM datasets holding them.
+
+    The MEM driver stores the pixels as a plain buffer, so unlike a GTiff `MemoryFile` nothing is encoded when
+    the arrays are written or decoded when `rasterio.merge` reads them back into its output; the results are the
+    same.
+    """
+    with ExitStack() as stack:
+        datasets = []
+        for arr, profile in zip(arrays, profiles):
+            dataset = stack.enter_context(rasterio.open('', 'w+', **in_memory_profile(profile, driver='MEM')))
+            dataset.write(arr)
+            datasets.append(dataset)
+        return merge(datasets, resampling=Resampling[resampling], method=method, nodata=nodata, dtype=dtype)
+
+
 def merge_arrays_with_geometadata(
     arrays: list[np.ndarray],
     profiles: list[dict],
@@ -240,18 +670,15 @@ def merge_arrays_with_geometadata(
     merged = None
     if method in MERGE_METHODS:
         merged = _merge_aligned_arrays(arrays_input, profiles, dst_nodata, dst_dtype, method)
+        if merged is None:
+            merged = _merge_row_aligned_arrays(arrays_input, profiles, dst_nodata, dst_dtype, method, resampling)
 
     if merged is not None:
         merged_arr, merged_trans = merged
     else:
-        memfiles = [MemoryFile() for p in profiles]
-        datasets = [mfile.open(**in_memory_profile(p)) for (mfile, p) in zip(memfiles, profiles)]
-        [ds.write(arr) for (ds, arr) in zip(datasets, arrays_input)]
-        merged_arr, merged_trans = merge(
-            datasets, resampling=Resampling[resampling], method=method, nodata=dst_nodata, dtype=dst_dtype
+        merged_arr, merged_trans = _merge_in_memory_datasets(
+            arrays_input, profiles, resampling=resampling, method=method, nodata=dst_nodata, dtype=dst_dtype
         )
-        [ds.close() for ds in datasets]
-        [mfile.close() for mfile in memfiles]
 
     prof_merged = profiles[0].copy()
     prof_merged['transform'] = merged_trans
@@ -0,0 +1,99 @@
+import itertools
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """Progress of a task of the stitcher (e.g. the tiles of a DEM being read), emitted as each item completes.
+
+    Tasks are 'download' (tiles localized), 'open' (tiles opened), 'metadata' (tile windows planned), 'read' (tile
+    windows read), 'blocks' (blocks of `stitch_dem_to_file`) and 'extents' (bounds of `stitch_dems`). Each run of
+    a task has its own `task_id`, and emits an event with `completed=0` when it starts. `nbytes` is the total
+    size of the items completed where known (tiles downloaded and tile windows read), else 0.
+    """
+
+    task: str
+    desc: str
+    completed: int
+    total: int
+    nbytes: int = 0
+    task_id: int = 0
+
+
+# The progress of the stitcher is a callback receiving `ProgressEvent`s, True for tqdm bars or False for none
+Progress = Callable[[ProgressEvent], None] | bool
+
+_TASK_IDS = itertools.count()
+
+
+class TqdmProgress:
+    """Progress callback drawing a tqdm bar (to stderr) for each run of a task, closed when the run completes.
+
+    This is the callback used when `progress=True`, the default of the stitcher.
+    """
+
+    def __init__(self, **tqdm_kwargs: object) -> None:
+        self.tqdm_kwargs = tqdm_kwargs
+        self._bars = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: ProgressEvent) -> None:
+        from tqdm import tqdm
+
+        with self._lock:
+            bar = self._bars.get(event.task_id)
+            if bar is None:
+                bar = tqdm(total=event.total, desc=event.desc, **self.tqdm_kwargs)
+                self._bars[event.task_id] = bar
+            bar.update(event.completed - bar.n)
+            if event.completed >= event.total:
+                bar.close()
+                del self._bars[event.task_id]
+
+
+def get_progress_callback(progress: Progress) -> Callable[[ProgressEvent], None] | None:
+    """Get the callback of `progress` (None when quiet)."""
+    if progress is True:
+        return TqdmProgress()
+    if progress is False or progress is None:
+        return None
+    return progress
+
+
+def track(
+    iterable: Iterable,
+    progress: Progress,
+    task: str,
+    total: int,
+    desc: str,
+    nbytes: Callable[[int, object], int] | None = None,
+) -> Iterable:
+    """Report the progress of consuming `iterable` (e.g. of `executor.map`) as a `task` of `total` items.
+
+    `nbytes(index, item)` is the size of an item. Quiet progress (False) returns `iterable` itself, so no
+    bookkeeping is done per item.
+    """
+    callback = get_progress_callback(progress)
+    if callback is None:
+        return iterable
+    return _track(iterable, callback, task, total, desc, nbytes)
+
+
+def _track(
+    iterable: Iterable,
+    callback: Callable[[ProgressEvent], None],
+    task: str,
+    total: int,
+    desc: str,
+    nbytes: Callable[[int, object], int] | None,
+) -> Iterator:
+    task_id = next(_TASK_IDS)
+    n_bytes = 0
+    callback(ProgressEvent(task, desc, 0, total, 0, task_id))
+    for k, item in enumerate(iterable):
+        if nbytes is not None:
+            n_bytes += nbytes(k, item)
+        callback(ProgressEvent(task, desc, k + 1, total, n_bytes, task_id))
+        yield item
@@ -34,15 +34,16 @@ def with_gdal_read_env(func: Callable) -> Callable:
     return wrapper
 
 
-def in_memory_profile(profile: dict) -> dict:
+def in_memory_profile(profile: dict, driver: str = 'GTiff') -> dict:
     """Strip creation options (compression, tiling, interleaving) from a profile.
 
     In-memory datasets are written and then read back before they are closed. Creation options inherited from a
     source COG - notably `compress` - put GDAL into multi-threaded compression, whose queued writes are not
-    reliably visible to those read backs when `GDAL_NUM_THREADS` is large.
+    reliably visible to those read backs when `GDAL_NUM_THREADS` is large. `driver` is 'GTiff' for a
+    `MemoryFile` or 'MEM' for gdal's (uncompressed, unencoded) in-memory raster driver.
     See: https://github.com/ACCESS-Cloud-Based-InSAR/dem-stitcher/issues/157
     """
-    return {**{key: profile[key] for key in GEOMETADATA_KEYS if key in profile}, 'driver': 'GTiff'}
+    return {**{key: profile[key] for key in GEOMETADATA_KEYS if key in profile}, 'driver': driver}
 
 
 def translate_profile(
@@ -131,6 +132,7 @@ def reproject_arr_to_match_profile(
     resampling: str = 'bilinear',
     preserve_rank: bool = False,
     src_nodata: float | int = None,
+    warp_mem_limit: int = 0,
 ) -> tuple[np.ndarray, dict]:
     """
     Reproject an array to match a reference profile providing the reprojected array and the new profile.
@@ -163,6 +165,9 @@ def reproject_arr_to_match_profile(
         the source nodata undeclared, which treats every source pixel as valid data - with an integer
         destination gdal then remaps source values that collide with the output nodata (e.g. 255 -> 254 for
         `uint8`) so they are not read back as nodata, silently turning nodata into data.
+    warp_mem_limit : int, optional
+        Memory (in MB) gdal's warper uses for the chunks it resamples the array in, by default 0, i.e. gdal's
+        default (64 MB). The output array is allocated once regardless.
 
     Returns
     -------
@@ -216,6 +221,7 @@ def reproject_arr_to_match_profile(
         dst_nodata=nodata,
         resampling=Resampling[resampling],
         num_threads=num_threads,
+        warp_mem_limit=warp_mem_limit,
     )
     return dst_array, reproject_profile
 
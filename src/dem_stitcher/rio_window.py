@@ -1,5 +1,6 @@
 import math
 import warnings
+from functools import lru_cache
 from warnings import warn
 
 import numpy as np
@@ -14,6 +15,10 @@ from shapely.geometry import box
 from .rio_tools import with_gdal_read_env
 
 
+# Distinct (source, destination) CRS pairs whose transformers are kept
+TRANSFORMER_CACHE_SIZE = 32
+
+
 def get_cropped_profile(profile: dict, slice_x: slice, slice_y: slice) -> dict:
     """Return a cropped profile from a reference profile and numpy slices.
 
@@ -66,9 +71,28 @@ def get_array_bounds(profile: dict) -> list[float]:
     return array_bounds(profile['height'], profile['width'], profile['transform'])
 
 
+@lru_cache(maxsize=TRANSFORMER_CACHE_SIZE)
+def get_transformer(src_crs: CRS, dest_crs: CRS) -> Transformer:
+    """Get the (cached) transformer from `src_crs` to `dest_crs` with x, y (i.e. lon, lat) axis order.
+
+    Constructing a transformer takes milliseconds (tens of milliseconds for the first one using the PROJ
+    database), whereas transforming a few points takes microseconds. `lru_cache` is thread-safe and pyproj
+    transformers can be shared across threads (pyproj >= 3.1).
+    """
+    return Transformer.from_crs(src_crs, dest_crs, always_xy=True)
+
+
 def transform_bounds(src_bounds: list, src_crs: CRS, dest_crs: CRS) -> list[float]:
-    """Source: https://gis.stackexchange.com/a/392407."""
-    proj = Transformer.from_crs(src_crs, dest_crs, always_xy=True)
+    """Transform the corners of `src_bounds` (see https://gis.stackexchange.com/a/392407).
+
+    Bounds are returned unchanged when the CRSs are equal. epsg:4269 and epsg:4326 are deliberately not treated
+    as equal: PROJ's transformation between them is a null offset unless NAD83 to WGS84 grids are installed, and
+    it is the same transformation gdal uses to reproject `3dep` tiles, so windows stay consistent with it.
+    """
+    src_crs, dest_crs = CRS.from_user_input(src_crs), CRS.from_user_input(dest_crs)
+    if src_crs == dest_crs:
+        return list(src_bounds)
+    proj = get_transformer(src_crs, dest_crs)
 
     bl = proj.transform(src_bounds[0], src_bounds[1])
     tr = proj.transform(src_bounds[2], src_bounds[3])
@@ -1,33 +1,73 @@
+import math
+import multiprocessing
 import shutil
 import uuid
-from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 from warnings import warn
 
 import numpy as np
 import rasterio
+import rasterio.shutil
 from rasterio import default_gtiff_profile
 from rasterio.crs import CRS
-from rasterio.io import MemoryFile
-from tqdm import tqdm
+from rasterio.enums import Resampling
+from rasterio.warp import transform_bounds
+from rasterio.windows import Window
+from rasterio.windows import transform as window_transform
 
 from .credentials import earthdata_gdal_env, ensure_earthdata_credentials
-from .datasets import get_overlapping_dem_tiles, intersects_missing_glo_30_tiles
+from .datasets import (
+    DATASETS,
+    get_overlapping_dem_tile_urls,
+    get_overlapping_dem_tiles,  # noqa: F401 (historically importable from this module)
+    intersects_missing_glo_30_tiles,
+)
 from .dateline import get_dateline_crossing
 from .dem_readers import read_dem, read_nasadem, read_srtm
-from .exceptions import NoDEMCoverage
-from .geoid import get_default_geoid_path, remove_geoid, validate_geoid_path
-from .merge import merge_arrays_with_geometadata, merge_tile_datasets_within_extent
+from .exceptions import DEMNotSupported, NoDEMCoverage
+from .geoid import (
+    DEM2GEOID,
+    MAX_MEMORY_BYTES,
+    get_default_geoid_path,
+    get_geoid_path,
+    prefetch_geoid,
+    remove_geoid,
+    sample_geoid,
+    validate_geoid_path,
+)
+from .geoid_cache import GeoidCache
+from .instrumentation import StageEvent, record_stage
+from .merge import (
+    _aligned_pixel_offsets,
+    _get_merged_grid,
+    get_merged_profile_within_extent,
+    merge_arrays_with_geometadata,
+    merge_tile_datasets_within_extent,
+)
+from .progress import Progress, track
 from .rio_tools import (
     gdal_read_env,
     reproject_arr_to_match_profile,
     reproject_arr_to_new_crs,
     reproject_profile_to_new_crs,
-    translate_dataset,
     translate_profile,
     update_profile_resolution,
 )
+from .rio_window import get_array_bounds, get_cropped_profile
+from .tile_cache import TileCache
+from .vrt import (
+    build_mosaic_vrt,
+    build_sum_vrt,
+    build_warped_vrt,
+    open_translated_dataset,
+    relabel_vrt,
+    to_gdal_path,
+    write_vrt,
+)
 
 
 RASTER_READERS = {
@@ -41,6 +81,7 @@ RASTER_READERS = {
 }
 
 PIXEL_CENTER_DEMS = ['srtm_v3', 'nasadem', 'glo_30', 'glo_90', 'glo_90_missing', 'nisar_dem']
+# Datasets distributed as GeoTIFFs (COGs), which are read remotely and localized by copying the files
 DIRECT_READ_DEMS = ['glo_30', 'glo_90', '3dep', 'glo_90_missing', 'nisar_dem']
 EARTHDATA_DEMS = ['srtm_v3', 'nasadem', 'nisar_dem']
 ELLIPSOIDAL_HEIGHT_DEMS = ['nisar_dem']
@@ -49,6 +90,9 @@ DEFAULT_GTIFF_PROFILE.pop('nodata')
 DEFAULT_GTIFF_PROFILE.pop('dtype')
 EPSG_4269 = CRS.from_epsg(4269)
 EPSG_4326 = CRS.from_epsg(4326)
+GLO_30_RESOLUTION = 0.0002777777777777777775
+# Degrees the tiles read for a reference grid extend beyond it, i.e. 2 pixels of `glo_90` (3 arcseconds) and more
+PROFILE_BUFFER_DEGREES = 0.005
 # Datasets read through GDAL (as opposed to `requests`) that require Earthdata login
 GDAL_EARTHDATA_DEMS = ['nisar_dem']
 
@@ -57,7 +101,23 @@ def get_gdal_env(dem_name: str) -> rasterio.Env:
     return earthdata_gdal_env() if dem_name in GDAL_EARTHDATA_DEMS else gdal_read_env()
 
 
+def _copy_one_tile_to_gtiff(url: str, dest_path: Path, dem_name: str) -> dict:
+    # The GeoTIFF/COG is copied byte for byte (streamed by gdal) rather than decoded and re-encoded
+    with get_gdal_env(dem_name):
+        rasterio.shutil.copyfiles(url, dest_path)
+    with rasterio.open(dest_path) as ds:
+        dem_profile = ds.profile
+        tags = ds.tags()
+    # Updating the metadata in place leaves the (compressed) image data untouched
+    if (dem_name in PIXEL_CENTER_DEMS) and (tags.get('AREA_OR_POINT') != 'Point'):
+        with rasterio.open(dest_path, 'r+') as ds:
+            ds.update_tags(AREA_OR_POINT='Point')
+    return dem_profile
+
+
 def _download_and_write_one_tile_to_gtiff(url: str, dest_path: Path, reader: Callable, dem_name: str) -> dict:
+    if dem_name in DIRECT_READ_DEMS:
+        return _copy_one_tile_to_gtiff(url, dest_path, dem_name)
     dem_arr, dem_profile = reader(url)
     if dem_profile['driver'] != 'GTiff':
         dem_profile.update(**DEFAULT_GTIFF_PROFILE)
@@ -68,46 +128,82 @@ def _download_and_write_one_tile_to_gtiff(url: str, dest_path: Path, reader: Cal
     return dem_profile
 
 
+def _get_tile_filename(url: str) -> str:
+    tile_id = url.split('/')[-1]
+    # glo DEMs
+    if '.tif' in tile_id:
+        return tile_id
+    # USGS or NASA DEMs
+    if '.zip' in tile_id:
+        return tile_id.replace('.zip', '.tif')
+    else:
+        raise ValueError('The dataset format was not considered')
+
+
 def download_tiles_to_gtiff(
     urls: list[str],
     dem_name: str,
-    dest_dir: Path,
+    dest_dir: Path | None,
     max_workers_for_download: int = 5,
     overwrite_existing_tiles: bool = False,
+    tile_cache: TileCache | None = None,
+    progress: Progress = True,
 ) -> list[str]:
-    tile_ids = list(map(lambda x: x.split('/')[-1], urls))
-
-    def extract_dest_path_from_url(tile_id: str) -> Path:
-        # glo DEMs
-        if '.tif' in tile_id:
-            return dest_dir / tile_id
-        # USGS or NASA DEMs
-        if '.zip' in tile_id:
-            return dest_dir / tile_id.replace('.zip', '.tif')
-        else:
-            raise ValueError('The dataset format was not considered')
+    """Localize DEM tiles as Geotiffs.
 
-    dest_paths = list(map(extract_dest_path_from_url, tile_ids))
+    When `tile_cache` is given, tiles are only downloaded if they are not in the cache, and are copied from the
+    cache to `dest_dir`. When `dest_dir` is None (which requires `tile_cache`), the paths of the cached tiles are
+    returned, pinned in the cache so they are not evicted until the caller passes them to `tile_cache.unpin`. The
+    tiles localized (and their size on disk) are reported to `progress` as 'download' (see
+    `dem_stitcher.progress.ProgressEvent`).
+    """
+    if (dest_dir is None) and (tile_cache is None):
+        raise ValueError('dest_dir must be specified when no tile_cache is used')
+    filenames = list(map(_get_tile_filename, urls))
     reader = RASTER_READERS[dem_name]
 
-    def download_and_write_one_partial(zipped_data: tuple[str, Path]) -> dict:
-        return _download_and_write_one_tile_to_gtiff(zipped_data[0], zipped_data[1], reader, dem_name)
+    def localize_one_tile(zipped_data: tuple[str, str]) -> Path:
+        url, filename = zipped_data
+        dest_path = dest_dir / filename if dest_dir is not None else None
+        if tile_cache is None:
+            _download_and_write_one_tile_to_gtiff(url, dest_path, reader, dem_name)
+            return dest_path
+        # The cached tile is pinned so no process evicts it before it is read
+        cached_path = tile_cache.get_or_put(
+            url,
+            filename,
+            lambda tmp_path: _download_and_write_one_tile_to_gtiff(url, tmp_path, reader, dem_name),
+            pin=True,
+        )
+        if dest_path is None:
+            return cached_path
+        try:
+            shutil.copyfile(cached_path, dest_path)
+        finally:
+            tile_cache.unpin([cached_path])
+        return dest_path
 
     # filter non existing destination path
-    if not overwrite_existing_tiles:
-        data_list = [(u, d) for u, d in zip(urls, dest_paths) if not d.exists()]
-    else:
-        data_list = list(zip(urls, dest_paths))
+    data_list = [
+        (u, f)
+        for u, f in zip(urls, filenames)
+        if (dest_dir is None) or overwrite_existing_tiles or not (dest_dir / f).exists()
+    ]
     with ThreadPoolExecutor(max_workers=max_workers_for_download) as executor:
-        list(
-            tqdm(
-                executor.map(download_and_write_one_partial, data_list),
+        localized_paths = list(
+            track(
+                executor.map(localize_one_tile, data_list),
+                progress,
+                'download',
                 total=len(data_list),
                 desc=f'Downloading {dem_name} tiles',
+                nbytes=lambda _, path: Path(path).stat().st_size,
             )
         )
 
-    return list(map(str, dest_paths))
+    if dest_dir is None:
+        return list(map(str, localized_paths))
+    return [str(dest_dir / filename) for filename in filenames]
 
 
 def get_dem_tile_paths(
@@ -117,6 +213,8 @@ def get_dem_tile_paths(
     n_threads_downloading: int = 5,
     tile_dir: str | Path | None = None,
     overwrite_existing_tiles: bool = False,
+    tile_cache: TileCache | None = None,
+    progress: Progress = True,
 ) -> list[str]:
     """Obtain paths or urls to DEM tiles.
 
@@ -144,22 +242,39 @@ def get_dem_tile_paths(
         Directory to localize files, by default None, which saves to `dem_name`.
     overwrite_existing_tiles : bool, optional
         If True, overwrite existing tiles, by default False
+    tile_cache : TileCache, optional
+        Persistent tile cache consulted before downloading. When specified, tiles of all datasets are localized
+        through the cache and, if `tile_dir` is None, the paths of the cached tiles are returned (nothing is
+        written to `dem_name`); these are pinned in the cache until passed to `tile_cache.unpin` once read (see
+        `download_tiles_to_gtiff`). By default None.
+    progress : Callable[[ProgressEvent], None] | bool, optional
+        Progress of localizing the tiles (see `stitch_dem`), by default True
 
     Returns
     -------
     list[str]
         List of paths to dem as urls or paths on disk
     """
-    df_tiles = get_overlapping_dem_tiles(bounds, dem_name)
-    urls = df_tiles.url.tolist()
+    urls = get_overlapping_dem_tile_urls(bounds, dem_name)
 
     if dem_name in EARTHDATA_DEMS:
         ensure_earthdata_credentials()
 
     # Datasets that permit direct reading
-    if (dem_name in DIRECT_READ_DEMS) and not localize_tiles_to_gtiff:
+    if (dem_name in DIRECT_READ_DEMS) and not localize_tiles_to_gtiff and (tile_cache is None):
         return urls
 
+    if (tile_cache is not None) and (tile_dir is None):
+        with get_gdal_env(dem_name):
+            return download_tiles_to_gtiff(
+                urls,
+                dem_name,
+                None,
+                max_workers_for_download=n_threads_downloading,
+                tile_cache=tile_cache,
+                progress=progress,
+            )
+
     tile_dir = Path(tile_dir) if tile_dir is not None else Path(dem_name)
     if not localize_tiles_to_gtiff:
         warn(f'We need to localize the tiles as a Geotiff. Saving to {tile_dir}', category=UserWarning)
@@ -174,6 +289,8 @@ def get_dem_tile_paths(
             tile_dir,
             max_workers_for_download=n_threads_downloading,
             overwrite_existing_tiles=overwrite_existing_tiles,
+            tile_cache=tile_cache,
+            progress=progress,
         )
 
 
@@ -205,33 +322,46 @@ def _build_target_profile(src_profile: dict, dst_resolution: float | tuple[float
     return dst_profile
 
 
-def merge_and_transform_dem_tiles(
+def _get_aligned_window(profile: dict, target_profile: dict) -> Window | None:
+    """Window of the array of `profile` that is exactly the grid of `target_profile`, if there is one."""
+    offsets = _aligned_pixel_offsets([profile, target_profile])
+    if offsets is None:
+        return None
+    row_off, col_off = offsets[1]
+    window = Window(col_off, row_off, target_profile['width'], target_profile['height'])
+    within = (
+        (row_off >= 0)
+        and (col_off >= 0)
+        and (row_off + window.height <= profile['height'])
+        and (col_off + window.width <= profile['width'])
+    )
+    return window if within else None
+
+
+def _merge_source(
     datasets: list[rasterio.DatasetReader],
-    bounds: list[float],
-    dem_name: str,
-    dst_ellipsoidal_height: bool = True,
-    dst_area_or_point: str | None = None,
-    dst_resolution: float | tuple[float] | None = None,
-    num_threads_reproj: int = 5,
-    merge_nodata_value: float = np.nan,
-    n_threads_for_reading_tile_data: int = 5,
-    geoid_path: str | Path | None = None,
-    geoid_correction_mode: str = 'native',
+    extent: list[float],
+    n_threads: int,
+    dst_resolution: float | tuple[float] | None,
+    read_resampling: str | None,
+    read_stats: dict | None,
+    progress: Progress = True,
 ) -> tuple[np.ndarray, dict]:
-    if geoid_correction_mode not in ['native', 'aria-legacy']:
-        raise ValueError("geoid_correction_mode must be 'native' or 'aria-legacy'")
+    """Merge the tiles of one DEM within the extent into a float32 array with nodata np.nan in epsg:4326."""
     dem_arr, dem_profile = merge_tile_datasets_within_extent(
-        datasets, bounds, nodata=merge_nodata_value, dtype=np.float32, n_threads=n_threads_for_reading_tile_data
+        datasets,
+        extent,
+        nodata=np.nan,
+        dtype=np.float32,
+        n_threads=n_threads,
+        dst_resolution=dst_resolution if read_resampling is not None else None,
+        read_resampling=read_resampling or 'average',
+        read_stats=read_stats,
+        progress=progress,
     )
     if dem_profile['crs'] not in (EPSG_4269, EPSG_4326):
         raise ValueError('CRS must be epsg 4269 or 4326')
 
-    # We could have merge_nodata_value that is zero and we want the final metadata
-    # to be np.nan.
-    dem_profile['nodata'] = np.nan
-    src_area_or_point = datasets[0].tags().get('AREA_OR_POINT', 'Area')
-    dst_area_or_point = dst_area_or_point or src_area_or_point
-
     # Reproject to 4326 for USGS DEMs over North America
     # Note 4269 is almost identical to 4326 and often no changes are made
     if dem_profile['crs'] == EPSG_4269:
@@ -239,6 +369,180 @@ def merge_and_transform_dem_tiles(
 
     if dem_profile['crs'] != EPSG_4326:
         raise ValueError('CRS must be epsg 4269 or 4326')
+    return dem_arr, dem_profile
+
+
+def _get_geoid_name(dem_name: str) -> str | None:
+    """Short name of the geoid the heights of the DEM are referenced to (None for ellipsoidal heights)."""
+    return None if dem_name in ELLIPSOIDAL_HEIGHT_DEMS else DEM2GEOID[dem_name]
+
+
+def _convert_vertical_datum(
+    dem_arr: np.ndarray,
+    dem_profile: dict,
+    src_dem_name: str,
+    dst_dem_name: str,
+    geoid_cache: GeoidCache | None = None,
+) -> np.ndarray:
+    """Convert heights of `src_dem_name` to the vertical datum of `dst_dem_name` (e.g. egm_96 to egm_08)."""
+    src_geoid, dst_geoid = _get_geoid_name(src_dem_name), _get_geoid_name(dst_dem_name)
+    if src_geoid == dst_geoid:
+        return dem_arr
+    if src_geoid is not None:
+        dem_arr = dem_arr + sample_geoid(dem_profile, get_geoid_path(src_geoid), geoid_cache=geoid_cache)
+    if dst_geoid is not None:
+        dem_arr = dem_arr - sample_geoid(dem_profile, get_geoid_path(dst_geoid), geoid_cache=geoid_cache)
+    return dem_arr
+
+
+def _fill_nan_in_place(arr: np.ndarray, value: float, max_memory_bytes: int) -> None:
+    """Replace nan in a (count, height, width) array with `value`, in blocks of rows whose masks fit in memory."""
+    block_rows = max(max_memory_bytes // (arr.shape[0] * arr.shape[2]), 1)
+    for row_start in range(0, arr.shape[1], block_rows):
+        block = arr[:, row_start : row_start + block_rows]
+        np.copyto(block, value, where=np.isnan(block))
+
+
+def _resample_in_blocks(
+    dem_arr: np.ndarray, dem_profile: dict, target_profile: dict, num_threads: int, max_memory_bytes: int
+) -> tuple[np.ndarray, dict]:
+    """Resample (bilinear) the DEM to `target_profile` by blocks of rows read from windows of rows of the DEM.
+
+    `rasterio.warp.reproject` copies its source, so an array larger than `max_memory_bytes` is resampled into
+    blocks of output rows from the window of DEM rows each needs (plus the kernel, widened when downsampling as
+    gdal does) rather than at once. Blocks agree with resampling the whole array within float32 rounding.
+    """
+    warp_mem_limit = max(max_memory_bytes // 2**20, 1)
+    t_src, t_dst = dem_profile['transform'], target_profile['transform']
+    north_up = all(t.b == 0 and t.d == 0 and t.a > 0 and t.e < 0 for t in [t_src, t_dst])
+    if (dem_arr.nbytes <= max_memory_bytes) or (dem_profile['crs'] != target_profile['crs']) or not north_up:
+        return reproject_arr_to_match_profile(
+            dem_arr,
+            dem_profile,
+            target_profile,
+            num_threads=num_threads,
+            resampling='bilinear',
+            warp_mem_limit=warp_mem_limit,
+        )
+
+    count, src_height, src_width = dem_arr.shape
+    height, width = target_profile['height'], target_profile['width']
+    # Source rows per output row and the rows of the (widened) bilinear kernel
+    ratio = t_dst.e / t_src.e
+    margin = math.ceil(max(ratio, 1)) + 2
+    block_rows = max(int(max_memory_bytes / (dem_arr.itemsize * count * (src_width * ratio + width))), 1)
+    dst_arr = np.full((count, height, width), np.nan, dtype=dem_arr.dtype)
+    for row_start in range(0, height, block_rows):
+        window = Window(0, row_start, width, min(block_rows, height - row_start))
+        block_profile = target_profile.copy()
+        block_profile.update(height=window.height, transform=window_transform(window, t_dst))
+        (top, bottom), _ = window.toranges()
+        src_start = max(math.floor((t_dst.f + top * t_dst.e - t_src.f) / t_src.e) - margin, 0)
+        src_stop = min(math.ceil((t_dst.f + bottom * t_dst.e - t_src.f) / t_src.e) + margin, src_height)
+        if src_start >= src_stop:
+            continue
+        src_window = Window(0, src_start, src_width, src_stop - src_start)
+        src_profile = dem_profile.copy()
+        src_profile.update(height=src_window.height, transform=window_transform(src_window, t_src))
+        dst_arr[:, row_start : row_start + window.height], _ = reproject_arr_to_match_profile(
+            dem_arr[:, src_start:src_stop],
+            src_profile,
+            block_profile,
+            num_threads=num_threads,
+            resampling='bilinear',
+            warp_mem_limit=warp_mem_limit,
+        )
+    dst_profile = target_profile.copy()
+    dst_profile.update(dtype=dem_profile['dtype'], nodata=dem_profile['nodata'], count=count)
+    return dst_arr, dst_profile
+
+
+def _stitch_sources(
+    sources: list[tuple[str, list[rasterio.DatasetReader], list[float]]],
+    dst_ellipsoidal_height: bool = True,
+    dst_area_or_point: str | None = None,
+    dst_resolution: float | tuple[float] | None = None,
+    num_threads_reproj: int = 5,
+    merge_nodata_value: float = np.nan,
+    n_threads_for_reading_tile_data: int = 5,
+    geoid_path: str | Path | None = None,
+    geoid_correction_mode: str = 'native',
+    read_resampling: str | None = None,
+    read_stats: dict | None = None,
+    target_profile: dict | None = None,
+    datum_dem_name: str | None = None,
+    geoid_cache: GeoidCache | None = None,
+    max_memory_bytes: int = MAX_MEMORY_BYTES,
+    geoid_window_future: Future | None = None,
+    on_stage: Callable[[StageEvent], None] | None = None,
+    progress: Progress = True,
+) -> tuple[np.ndarray, dict]:
+    """Merge the tiles of each (dem_name, datasets, extent) source, fill the first with the others and transform.
+
+    The sources are merged concurrently on their native grids. The others are relabeled to the Area/Point
+    registration of the first, converted to the vertical datum of `datum_dem_name` (by default the first) if
+    their geoid differs, and fill its nodata on the union of their grids at the resolution of the first. The
+    geoid is then removed once from the mosaic before it is relabeled and resampled to `dst_resolution` (or
+    cropped or resampled to `target_profile`, a window of a larger output).
+
+    The mosaic is a float32 array the geoid is removed from (and nodata filled) in place, in blocks of at most
+    `max_memory_bytes`, and gdal resamples it in chunks of at most `max_memory_bytes` into the output array, so
+    only the mosaic and the output (the same array when the grid is unchanged) are held in full.
+
+    `geoid_window_future` is the (geoid path, geoid window) read concurrently with the tiles (see
+    `_prefetch_geoid`), awaited only when the geoid is removed. The stages are emitted to `on_stage` (see
+    `instrumentation.StageEvent`) and the tile windows read to `progress` (see `progress.ProgressEvent`).
+    """
+    if geoid_correction_mode not in ['native', 'aria-legacy']:
+        raise ValueError("geoid_correction_mode must be 'native' or 'aria-legacy'")
+    sources = [source for source in sources if source[1]]
+    datum_dem_name = datum_dem_name or sources[0][0]
+    # Separate counters so the reader threads of each source do not race on the same dict
+    read_stats_sources = [{} for _ in sources]
+
+    def merge_one_source(source: tuple[str, list[rasterio.DatasetReader], list[float]], stats: dict) -> tuple:
+        dem_name, datasets, extent = source
+        with record_stage(on_stage, 'read', dem_name=dem_name, n_tiles=len(datasets)) as fields:
+            dem_arr, dem_profile = _merge_source(
+                datasets,
+                extent,
+                n_threads_for_reading_tile_data,
+                dst_resolution,
+                read_resampling,
+                stats,
+                progress=progress,
+            )
+            fields.update(bytes_read=stats.get('bytes_read', 0), shape=dem_arr.shape)
+        return dem_arr, dem_profile
+
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        merged = list(executor.map(merge_one_source, sources, read_stats_sources))
+    if read_stats is not None:
+        for stats in read_stats_sources:
+            for key, value in stats.items():
+                read_stats[key] = read_stats.get(key, 0) + value
+
+    src_area_or_point = sources[0][1][0].tags().get('AREA_OR_POINT', 'Area')
+    dst_area_or_point = dst_area_or_point or src_area_or_point
+    dem_arr, dem_profile = merged[0]
+    if len(merged) > 1:
+        with record_stage(on_stage, 'merge', dem_name=datum_dem_name) as fields:
+            arrs, profiles = [dem_arr], [dem_profile]
+            for (dem_name, datasets, _), (arr, profile) in zip(sources[1:], merged[1:]):
+                tag = datasets[0].tags().get('AREA_OR_POINT', 'Area')
+                arrs.append(_convert_vertical_datum(arr, profile, dem_name, datum_dem_name, geoid_cache=geoid_cache))
+                profiles.append(shift_profile_for_pixel_loc(profile, tag, src_area_or_point))
+            dem_arr, dem_profile = merge_arrays_with_geometadata(arrs, profiles, nodata=np.nan, dtype='float32')
+            del arrs
+            fields.update(shape=dem_arr.shape)
+    # Only the mosaic is held from here on
+    del merged
+    if datum_dem_name != sources[0][0]:
+        dem_arr = _convert_vertical_datum(dem_arr, dem_profile, sources[0][0], datum_dem_name, geoid_cache=geoid_cache)
+
+    # The final metadata has nodata np.nan even if nodata areas are filled in with merge_nodata_value (i.e. 0)
+    if merge_nodata_value == 0:
+        _fill_nan_in_place(dem_arr, 0, max_memory_bytes)
 
     # 'aria-legacy' reproduces the pre-3.0.0 order: relabel first, then sample the geoid on the
     # relabeled grid with the half-geoid-pixel translation of issue #151
@@ -247,37 +551,62 @@ def merge_and_transform_dem_tiles(
 
     # Remove the geoid on the native grid so it is sampled where the DEM samples physically are;
     # the Area/Point relabeling below only shifts the transform, not the data
-    if dst_ellipsoidal_height and (dem_name not in ELLIPSOIDAL_HEIGHT_DEMS):
-        if geoid_path is None:
-            geoid_path = get_default_geoid_path(dem_name)
-        if geoid_correction_mode == 'aria-legacy':
-            dem_arr = remove_geoid(
-                dem_arr,
-                dem_profile,
-                geoid_path,
-                resampling='bilinear',
-                geoid_correction_mode='aria-legacy',
-                dem_area_or_point=dst_area_or_point,
-            )
-        else:
-            dem_arr = remove_geoid(
-                dem_arr,
-                dem_profile,
-                geoid_path,
-            )
+    if dst_ellipsoidal_height and (datum_dem_name not in ELLIPSOIDAL_HEIGHT_DEMS):
+        with record_stage(on_stage, 'geoid', dem_name=datum_dem_name) as fields:
+            if geoid_path is None:
+                geoid_path = get_default_geoid_path(datum_dem_name)
+            geoid_window = None
+            if geoid_window_future is not None:
+                prefetched_geoid_path, geoid_window = geoid_window_future.result()
+                # The geoid of the DEM filling all of `bounds` may differ from that of the DEM requested
+                if str(prefetched_geoid_path) != str(geoid_path):
+                    geoid_window = None
+            if geoid_correction_mode == 'aria-legacy':
+                dem_arr = remove_geoid(
+                    dem_arr,
+                    dem_profile,
+                    geoid_path,
+                    resampling='bilinear',
+                    geoid_correction_mode='aria-legacy',
+                    dem_area_or_point=dst_area_or_point,
+                    geoid_cache=geoid_cache,
+                    in_place=True,
+                    max_memory_bytes=max_memory_bytes,
+                    geoid_window=geoid_window,
+                )
+            else:
+                dem_arr = remove_geoid(
+                    dem_arr,
+                    dem_profile,
+                    geoid_path,
+                    geoid_cache=geoid_cache,
+                    in_place=True,
+                    max_memory_bytes=max_memory_bytes,
+                    geoid_window=geoid_window,
+                )
+            fields.update(shape=dem_arr.shape)
 
     if geoid_correction_mode == 'native':
         dem_profile = shift_profile_for_pixel_loc(dem_profile, src_area_or_point, dst_area_or_point)
-    target_profile = _build_target_profile(dem_profile, dst_resolution)
-
-    if dem_profile != target_profile:
-        dem_arr, dem_profile = reproject_arr_to_match_profile(
-            dem_arr,
-            dem_profile,
-            target_profile,
-            num_threads=num_threads_reproj,
-            resampling='bilinear',
-        )
+    # A target profile is specified for blocks of a larger output (see `stitch_dem_to_file`)
+    window = None
+    if target_profile is not None:
+        window = _get_aligned_window(dem_profile, target_profile)
+    else:
+        target_profile = _build_target_profile(dem_profile, dst_resolution)
+
+    with record_stage(on_stage, 'resample', dem_name=datum_dem_name) as fields:
+        if window is not None:
+            dem_arr = dem_arr[(slice(None), *window.toslices())]
+            dem_profile = dem_profile.copy()
+            dem_profile.update(
+                transform=target_profile['transform'], height=target_profile['height'], width=target_profile['width']
+            )
+        elif dem_profile != target_profile:
+            dem_arr, dem_profile = _resample_in_blocks(
+                dem_arr, dem_profile, target_profile, num_threads_reproj, max_memory_bytes
+            )
+        fields.update(shape=dem_arr.shape)
 
     # Ensure dem_arr has correct shape
     assert len(dem_arr.shape) == 3
@@ -285,42 +614,321 @@ def merge_and_transform_dem_tiles(
     return dem_arr, dem_profile
 
 
-def patch_glo_30_with_glo_90(
-    arr_glo_30: np.ndarray, prof_glo_30: dict, extent: list, stitcher_kwargs: dict
+def merge_and_transform_dem_tiles(
+    datasets: list[rasterio.DatasetReader],
+    bounds: list[float],
+    dem_name: str,
+    dst_ellipsoidal_height: bool = True,
+    dst_area_or_point: str | None = None,
+    dst_resolution: float | tuple[float] | None = None,
+    num_threads_reproj: int = 5,
+    merge_nodata_value: float = np.nan,
+    n_threads_for_reading_tile_data: int = 5,
+    geoid_path: str | Path | None = None,
+    geoid_correction_mode: str = 'native',
+    read_resampling: str | None = None,
+    read_stats: dict | None = None,
+    target_profile: dict | None = None,
+    geoid_cache: GeoidCache | None = None,
+    max_memory_bytes: int = MAX_MEMORY_BYTES,
+    on_stage: Callable[[StageEvent], None] | None = None,
+    progress: Progress = True,
 ) -> tuple[np.ndarray, dict]:
-    if not intersects_missing_glo_30_tiles(extent):
-        return arr_glo_30, prof_glo_30
-
-    stitcher_kwargs['dem_name'] = 'glo_90_missing'
-    arr_glo_90, prof_glo_90 = stitch_dem(**stitcher_kwargs)
+    return _stitch_sources(
+        [(dem_name, datasets, bounds)],
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=dst_area_or_point,
+        dst_resolution=dst_resolution,
+        num_threads_reproj=num_threads_reproj,
+        merge_nodata_value=merge_nodata_value,
+        n_threads_for_reading_tile_data=n_threads_for_reading_tile_data,
+        geoid_path=geoid_path,
+        geoid_correction_mode=geoid_correction_mode,
+        read_resampling=read_resampling,
+        read_stats=read_stats,
+        target_profile=target_profile,
+        geoid_cache=geoid_cache,
+        max_memory_bytes=max_memory_bytes,
+        on_stage=on_stage,
+        progress=progress,
+    )
 
-    # Dems internally are BIP with channel dimension exposed but stitcher api squeezes outputs
-    dem_arr, dem_prof = merge_arrays_with_geometadata([arr_glo_30.squeeze(), arr_glo_90], [prof_glo_30, prof_glo_90])
 
-    return dem_arr, dem_prof
+def _get_dateline_shift(bounds: tuple[float, ...], res_x: float, crossing: int) -> float:
+    """Pixels a tile is translated along x so it is contiguous with the bounds crossing the dateline at `crossing`."""
+    xmin, _, xmax, _ = bounds
+    if crossing == 180 and xmax <= 0:
+        return 360 / res_x
+    if crossing == -180 and xmin >= 0:
+        return -360 / res_x
+    return 0
 
 
-def _translate_one_tile_across_dateline(
-    dataset: rasterio.DatasetReader, crossing: int
-) -> tuple[MemoryFile, rasterio.DatasetReader]:
+def _translate_one_tile_across_dateline(dataset: rasterio.DatasetReader, crossing: int) -> rasterio.DatasetReader:
+    """Translate a tile (as a VRT, keeping its tags e.g. AREA_OR_POINT) if it is across the dateline."""
     assert crossing in [180, -180]
-    res_x = dataset.res[0]
-    xmin, _, xmax, _ = dataset.bounds
+    x_shift = _get_dateline_shift(dataset.bounds, dataset.res[0], crossing)
+    if x_shift:
+        return open_translated_dataset(dataset, x_shift, 0)
+    return dataset
 
-    tags = dataset.tags()
-    if crossing == 180 and xmax <= 0:
-        memfile, dataset_new = translate_dataset(dataset, 360 / res_x, 0)
-        # Ensures area or point are correctly stored!
-        dataset_new.update_tags(**tags)
-    elif crossing == -180 and xmin >= 0:
-        memfile, dataset_new = translate_dataset(dataset, -360 / res_x, 0)
-        # Ensures area or point are correctly stored!
-        dataset_new.update_tags(**tags)
-    else:
-        memfile = MemoryFile()
-        dataset_new = dataset
 
-    return memfile, dataset_new
+def _validate_stitch_dem_args(
+    dem_name: str,
+    dst_ellipsoidal_height: bool,
+    dst_area_or_point: str | None,
+    merge_nodata_value: float,
+    geoid_path: str | Path | None,
+    geoid_correction_mode: str,
+    read_resampling: str | None,
+    fill_dem_names: list[str] | None = None,
+) -> None:
+    if dst_area_or_point not in ['Area', 'Point', None]:
+        raise ValueError("dst_area_or_point must be 'Area', 'Point', or None")
+    if geoid_correction_mode not in ['native', 'aria-legacy']:
+        raise ValueError("geoid_correction_mode must be 'native' or 'aria-legacy'")
+    if geoid_correction_mode == 'aria-legacy':
+        if not dst_ellipsoidal_height:
+            raise ValueError("geoid_correction_mode='aria-legacy' requires dst_ellipsoidal_height=True")
+        if dem_name in ELLIPSOIDAL_HEIGHT_DEMS:
+            raise ValueError(f'{dem_name} is referenced to the ellipsoid; no geoid correction is applied')
+        warn(
+            "geoid_correction_mode='aria-legacy' reproduces the pre-3.0.0 geoid correction, including the "
+            'half-geoid-pixel translation of issue #151 that biases ellipsoidal heights by up to several '
+            'centimeters where the geoid has a gradient. Use only for consistency with existing '
+            'ARIA / pre-3.0.0 time series.',
+            category=UserWarning,
+        )
+    # Make sure geoid kwargs are correct
+    if geoid_path is not None:
+        if not dst_ellipsoidal_height:
+            raise ValueError('Cannot bring your own geoid when dst_ellipsoidal_height is False')
+        validate_geoid_path(geoid_path)
+    if dem_name in ELLIPSOIDAL_HEIGHT_DEMS:
+        if not dst_ellipsoidal_height:
+            raise ValueError(f'{dem_name} is referenced to the ellipsoid; geoid heights are not available')
+        if geoid_path is not None:
+            raise ValueError(f'{dem_name} is referenced to the ellipsoid; a geoid cannot be removed')
+    if merge_nodata_value not in [np.nan, 0]:
+        raise ValueError('np.nan and 0 are only acceptable merge_nodata_value')
+    if (read_resampling is not None) and (read_resampling not in Resampling.__members__):
+        raise ValueError(f'read_resampling must be one of {list(Resampling.__members__)}')
+    if fill_dem_names is not None:
+        if any(name not in DATASETS for name in fill_dem_names):
+            raise DEMNotSupported(f'fill_dem_names must be in {DATASETS}')
+        if (dem_name in fill_dem_names) or (len(set(fill_dem_names)) != len(fill_dem_names)):
+            raise ValueError('fill_dem_names must be distinct and not include dem_name')
+
+
+def _get_source_dem_names(
+    bounds: list[float], dem_name: str, fill_in_glo_30: bool, fill_dem_names: list[str] | None
+) -> list[str]:
+    """DEMs stitched in priority order: `dem_name` and then those filling its missing tiles and nodata."""
+    if fill_dem_names is not None:
+        return [dem_name, *fill_dem_names]
+    if (dem_name == 'glo_30') and fill_in_glo_30 and intersects_missing_glo_30_tiles(bounds):
+        return [dem_name, 'glo_90_missing']
+    return [dem_name]
+
+
+def _prefetch_geoid(
+    geoid_path: str | Path | None,
+    dem_name: str,
+    bounds: list[float],
+    geoid_cache: GeoidCache | None,
+    on_stage: Callable[[StageEvent], None] | None = None,
+) -> tuple[str | Path, tuple[np.ndarray, dict]]:
+    """Read the geoid window for `bounds` (see `prefetch_geoid`) along with the geoid it is read from.
+
+    Errors (e.g. a DEM without a default geoid) are raised only if the window is awaited.
+    """
+    with record_stage(on_stage, 'geoid_fetch', dem_name=dem_name) as fields:
+        geoid_path = geoid_path or get_default_geoid_path(dem_name)
+        geoid_window = prefetch_geoid(geoid_path, bounds, geoid_cache=geoid_cache)
+        fields.update(shape=geoid_window[0].shape)
+    return geoid_path, geoid_window
+
+
+def _iter_source_dem_names(dem_name: str, dem_names_future: Future) -> Iterator[str]:
+    """Yield `dem_name` and then the DEMs filling it, so its tiles are looked up while the others are determined."""
+    yield dem_name
+    yield from dem_names_future.result()[1:]
+
+
+@contextmanager
+def _pinned_tiles(tile_cache: TileCache | None) -> Iterator[list[str]]:
+    """Yield a list collecting the tiles pinned in `tile_cache` by `get_dem_tile_paths`, unpinned on exit."""
+    pinned_paths = []
+    try:
+        yield pinned_paths
+    finally:
+        if (tile_cache is not None) and pinned_paths:
+            tile_cache.unpin(pinned_paths)
+
+
+def _open_sources(
+    bounds: list[float],
+    dem_names: Iterable[str],
+    n_threads_downloading: int,
+    tile_dir: Path | None,
+    localize_tiles_to_gtiff: bool,
+    overwrite_existing_tiles: bool,
+    tile_cache: TileCache | None,
+    on_stage: Callable[[StageEvent], None] | None = None,
+    progress: Progress = True,
+    pinned_paths: list[str] | None = None,
+) -> list[tuple[str, list[rasterio.DatasetReader]]]:
+    """Get and open the tiles of all the DEMs at once, translating them across the dateline if needed.
+
+    The tiles of the DEMs are looked up in the order of `dem_names`, which is consumed once. Must be called within
+    the gdal environment the datasets are read in (see `_get_sources_gdal_env`). Cached tiles read in place are
+    pinned in `tile_cache` and appended to `pinned_paths` (see `_pinned_tiles`).
+    """
+    names, paths = [], []
+    for name in dem_names:
+        names.append(name)
+        with record_stage(on_stage, 'lookup', dem_name=name) as fields:
+            tile_paths = get_dem_tile_paths(
+                bounds=bounds,
+                dem_name=name,
+                localize_tiles_to_gtiff=localize_tiles_to_gtiff,
+                n_threads_downloading=n_threads_downloading,
+                tile_dir=tile_dir,
+                overwrite_existing_tiles=overwrite_existing_tiles,
+                tile_cache=tile_cache,
+                progress=progress,
+            )
+            fields.update(n_tiles=len(tile_paths))
+        if (tile_cache is not None) and (tile_dir is None) and (pinned_paths is not None):
+            pinned_paths += tile_paths
+        paths += [(name, path) for path in tile_paths]
+    # Opening is capped at 5 threads because more leads to errors
+    with record_stage(on_stage, 'open', n_tiles=len(paths)), ThreadPoolExecutor(max_workers=5) as executor:
+        datasets = list(
+            track(
+                executor.map(rasterio.open, [path for (_, path) in paths]),
+                progress,
+                'open',
+                total=len(paths),
+                desc=f'Opening {", ".join(names)} Datasets',
+            )
+        )
+    crossing = get_dateline_crossing(bounds)
+    if crossing:
+        datasets = [_translate_one_tile_across_dateline(ds, crossing) for ds in datasets]
+    sources = [(name, [ds for ((n, _), ds) in zip(paths, datasets) if n == name]) for name in names]
+    return sources
+
+
+def _get_sources_gdal_env(dem_names: list[str]) -> rasterio.Env:
+    return get_gdal_env(next((name for name in dem_names if name in GDAL_EARTHDATA_DEMS), dem_names[0]))
+
+
+def _stitch_dem(
+    bounds: list[float],
+    dem_name: str,
+    dst_ellipsoidal_height: bool,
+    dst_area_or_point: str | None,
+    dst_resolution: float | tuple[float] | None,
+    n_threads_reproj: int,
+    n_threads_downloading: int,
+    fill_in_glo_30: bool,
+    merge_nodata_value: float,
+    geoid_path: str | Path | None,
+    dst_tile_dir: Path | str | None,
+    overwrite_existing_tiles: bool,
+    geoid_correction_mode: str,
+    tile_cache: TileCache | None,
+    read_resampling: str | None,
+    read_stats: dict | None,
+    fill_dem_names: list[str] | None,
+    geoid_cache: GeoidCache | None,
+    max_memory_bytes: int,
+    target_profile: dict | None = None,
+    on_stage: Callable[[StageEvent], None] | None = None,
+    progress: Progress = True,
+) -> tuple[np.ndarray, dict]:
+    """Stitch the DEM within `bounds` (see `stitch_dem`), resampled to `target_profile` if specified."""
+    # Filling missing glo_30 tiles only adds glo_90_missing, which needs neither Earthdata nor another environment
+    known_dem_names = [dem_name, *(fill_dem_names or [])]
+
+    # Random unique identifier
+    tmp_id = str(uuid.uuid4())
+    tile_dir = Path(dst_tile_dir) if dst_tile_dir is not None else Path(f'tmp_{tmp_id}')
+    # Cached tiles are used in place
+    if (tile_cache is not None) and (dst_tile_dir is None):
+        tile_dir = None
+
+    if any(name in EARTHDATA_DEMS for name in known_dem_names):
+        ensure_earthdata_credentials()
+
+    # The environment must span opening the datasets through reading them. The DEMs filling glo_30 and the geoid
+    # window are known from the bounds, so they are looked up and read while the tiles are opened, read and merged.
+    with (
+        ThreadPoolExecutor(max_workers=2) as executor,
+        _get_sources_gdal_env(known_dem_names),
+        _pinned_tiles(tile_cache) as pinned_paths,
+    ):
+        dem_names_future = executor.submit(_get_source_dem_names, bounds, dem_name, fill_in_glo_30, fill_dem_names)
+        geoid_window_future = None
+        if dst_ellipsoidal_height and (dem_name not in ELLIPSOIDAL_HEIGHT_DEMS):
+            geoid_window_future = executor.submit(_prefetch_geoid, geoid_path, dem_name, bounds, geoid_cache, on_stage)
+        sources = _open_sources(
+            bounds,
+            _iter_source_dem_names(dem_name, dem_names_future),
+            n_threads_downloading=n_threads_downloading,
+            tile_dir=tile_dir,
+            localize_tiles_to_gtiff=dst_tile_dir is not None,
+            overwrite_existing_tiles=overwrite_existing_tiles,
+            tile_cache=tile_cache,
+            on_stage=on_stage,
+            progress=progress,
+            pinned_paths=pinned_paths,
+        )
+        datasets_all = [ds for (_, datasets) in sources for ds in datasets]
+        if not datasets_all:
+            raise NoDEMCoverage(f'Specified bounds are not within coverage area of {dem_name}')
+        # An extent entirely within the glo_30 tiles missing (and filled with glo_90) is upsampled to 30 meters
+        if (dem_name == 'glo_30') and not sources[0][1] and (target_profile is None):
+            dst_resolution = dst_resolution or GLO_30_RESOLUTION
+
+        # Preserve tile metadata data not used for geo-referencing
+        profile_tile = datasets_all[0].profile.copy()
+        [profile_tile.pop(key) for key in ['transform', 'dtype', 'height', 'width', 'nodata', 'crs']]
+        # Tiles translated across the dateline are VRTs of GeoTIFF tiles
+        if profile_tile['driver'] == 'VRT':
+            profile_tile['driver'] = 'GTiff'
+
+        dem_arr, dem_profile = _stitch_sources(
+            [(name, datasets, bounds) for (name, datasets) in sources],
+            dst_ellipsoidal_height=dst_ellipsoidal_height,
+            dst_area_or_point=dst_area_or_point,
+            dst_resolution=dst_resolution,
+            num_threads_reproj=n_threads_reproj,
+            merge_nodata_value=merge_nodata_value,
+            n_threads_for_reading_tile_data=n_threads_downloading,
+            geoid_path=geoid_path,
+            geoid_correction_mode=geoid_correction_mode,
+            read_resampling=read_resampling,
+            read_stats=read_stats,
+            geoid_cache=geoid_cache,
+            max_memory_bytes=max_memory_bytes,
+            geoid_window_future=geoid_window_future,
+            target_profile=target_profile,
+            on_stage=on_stage,
+            progress=progress,
+        )
+
+        # Close datasets
+        list(map(lambda dataset: dataset.close(), datasets_all))
+
+    # Delete orginal tiles if downloaded
+    if (tile_dir is not None) and tile_dir.exists() and dst_tile_dir is None:
+        shutil.rmtree(str(tile_dir))
+
+    dem_profile.update(**profile_tile)
+    dem_arr = dem_arr[0, ...]
+    return dem_arr, dem_profile
 
 
 def stitch_dem(
@@ -337,6 +945,14 @@ def stitch_dem(
     dst_tile_dir: Path | str | None = None,
     overwrite_existing_tiles: bool = False,
     geoid_correction_mode: str = 'native',
+    tile_cache: TileCache | None = None,
+    read_resampling: str | None = None,
+    read_stats: dict | None = None,
+    fill_dem_names: list[str] | None = None,
+    geoid_cache: GeoidCache | None = None,
+    max_memory_bytes: int = MAX_MEMORY_BYTES,
+    on_stage: Callable[[StageEvent], None] | None = None,
+    progress: Progress = True,
 ) -> tuple[np.ndarray, dict]:
     """Specify extents (xmin, ymin, xmax, ymax) to obtain a continuous DEM raster.
 
@@ -365,7 +981,7 @@ def stitch_dem(
     fill_in_glo_30 : bool, optional
         If `dem_name` is 'glo_30' then fills in missing `glo_30` tiles over Armenia and Azerbaijan with available
         `glo_90` tiles, by default True. If the extent falls inside of the missing `glo_30` tiles, then `glo_90` is
-        upsample to 30 meters unless `dst_resolution` is specified.
+        upsample to 30 meters unless `dst_resolution` is specified. Ignored if `fill_dem_names` is specified.
     merge_nodata_value: float, optional
         When merging tiles, utilize a different nodata value. A value other than 0 or np.nan will raise a ValueError.
         When set to np.nan (default), all areas with nodata in tiles are consistently marked in output as such.
@@ -386,6 +1002,44 @@ def stitch_dem(
         on every call. Use only for consistency with time series built on pre-3.0.0 products (e.g. ARIA).
         Note pre-3.0.0 versions also defaulted `dst_area_or_point` to 'Area', so pass it explicitly
         ('Point' for ARIA products) for full call-for-call parity.
+    tile_cache: TileCache, optional
+        Persistent tile cache (see `dem_stitcher.tile_cache.TileCache`) shared across calls and processes. When
+        specified, tiles are read from the cache, downloading and caching those that are missing, instead of
+        being read remotely or localized to a temporary directory. By default None.
+    read_resampling: str, optional
+        If specified (e.g. 'average') and `dst_resolution` is at least twice as coarse as the tiles, tiles are
+        read decimated with this resampling - from their overviews where available (all `glo` tiles are COGs) -
+        rather than at full resolution, before being resampled to `dst_resolution` as usual. The decimation is the
+        largest integer factor not exceeding the ratio of the resolutions that divides the tile dimensions (e.g. 3
+        for 90 m and 8 for 250 m from `glo_30`); the merged extent is expanded to whole decimated pixels.
+        By default None, i.e. tiles are read at full resolution.
+    read_stats: dict, optional
+        If specified, updated with the 'pixels_read', 'bytes_read' (estimated from the overview level gdal
+        reads) and 'bytes_full_resolution' (the same windows at full resolution) of the tiles.
+    fill_dem_names: list[str], optional
+        DEMs filling the missing tiles and nodata of `dem_name`, in priority order (e.g. `['glo_90', 'nasadem']`
+        for `glo_30`). The tiles of all DEMs are looked up and opened up front and merged concurrently; the fill
+        DEMs are converted to the vertical datum of `dem_name` if their geoid differs and resampled onto its grid
+        (extended to their union), and the geoid is removed once from the mosaic. By default None, i.e.
+        `['glo_90_missing']` for `glo_30` when `fill_in_glo_30` is True, and no fill otherwise.
+    geoid_cache: GeoidCache, optional
+        In-process cache the geoid is read through (see `dem_stitcher.geoid_cache.GeoidCache`), by default None,
+        i.e. the cache shared by all calls of the process (`dem_stitcher.geoid_cache.GEOID_CACHE`).
+    max_memory_bytes: int, optional
+        Bound of the memory used in addition to the merged tiles and the output array, by default 2**26 (64 MB).
+        The geoid is removed from the merged tiles in place (the interpolated geoid is held in blocks of at most
+        this size) and gdal resamples them to `dst_resolution` in chunks of at most this size, so peak memory is
+        about the size of the output when it is on the grid of the tiles and that of the merged tiles plus the
+        output otherwise.
+    on_stage: Callable[[StageEvent], None], optional
+        Called with a `dem_stitcher.instrumentation.StageEvent` (wall time, tiles, bytes read and output shape)
+        as each stage of the stitch completes: tile lookup, opening, geoid fetch, reads, merge, geoid removal and
+        resampling. `dem_stitcher.instrumentation.StageTimings` collects them into a report. By default None.
+    progress: Callable[[ProgressEvent], None] | bool, optional
+        Progress of the tiles downloaded, opened, planned and read. If True (default), tqdm bars are drawn (see
+        `dem_stitcher.progress.TqdmProgress`); if False, nothing is reported and no per-tile bookkeeping is done;
+        a callable is called with a `dem_stitcher.progress.ProgressEvent` (task, items completed and total, and
+        bytes downloaded or read) as each item completes.
 
     Returns
     -------
@@ -395,122 +1049,995 @@ def stitch_dem(
         [notebooks](https://github.com/ACCESS-Cloud-Based-InSAR/dem-stitcher/tree/dev/notebooks)
         for demonstrations.
     """
-    # Used for filling in glo_30 missing tiles if needed
-    stitcher_kwargs = locals()
+    _validate_stitch_dem_args(
+        dem_name,
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=dst_area_or_point,
+        merge_nodata_value=merge_nodata_value,
+        geoid_path=geoid_path,
+        geoid_correction_mode=geoid_correction_mode,
+        read_resampling=read_resampling,
+        fill_dem_names=fill_dem_names,
+    )
+    return _stitch_dem(
+        bounds,
+        dem_name,
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=dst_area_or_point,
+        dst_resolution=dst_resolution,
+        n_threads_reproj=n_threads_reproj,
+        n_threads_downloading=n_threads_downloading,
+        fill_in_glo_30=fill_in_glo_30,
+        merge_nodata_value=merge_nodata_value,
+        geoid_path=geoid_path,
+        dst_tile_dir=dst_tile_dir,
+        overwrite_existing_tiles=overwrite_existing_tiles,
+        geoid_correction_mode=geoid_correction_mode,
+        tile_cache=tile_cache,
+        read_resampling=read_resampling,
+        read_stats=read_stats,
+        fill_dem_names=fill_dem_names,
+        geoid_cache=geoid_cache,
+        max_memory_bytes=max_memory_bytes,
+        on_stage=on_stage,
+        progress=progress,
+    )
 
-    if dst_area_or_point not in ['Area', 'Point', None]:
-        raise ValueError("dst_area_or_point must be 'Area', 'Point', or None")
-    if geoid_correction_mode not in ['native', 'aria-legacy']:
-        raise ValueError("geoid_correction_mode must be 'native' or 'aria-legacy'")
-    if geoid_correction_mode == 'aria-legacy':
-        if not dst_ellipsoidal_height:
-            raise ValueError("geoid_correction_mode='aria-legacy' requires dst_ellipsoidal_height=True")
-        if dem_name in ELLIPSOIDAL_HEIGHT_DEMS:
-            raise ValueError(f'{dem_name} is referenced to the ellipsoid; no geoid correction is applied')
-        warn(
-            "geoid_correction_mode='aria-legacy' reproduces the pre-3.0.0 geoid correction, including the "
-            'half-geoid-pixel translation of issue #151 that biases ellipsoidal heights by up to several '
-            'centimeters where the geoid has a gradient. Use only for consistency with existing '
-            'ARIA / pre-3.0.0 time series.',
-            category=UserWarning,
-        )
-    # Make sure geoid kwargs are correct
-    if geoid_path is not None:
-        if not dst_ellipsoidal_height:
-            raise ValueError('Cannot bring your own geoid when dst_ellipsoidal_height is False')
-        validate_geoid_path(geoid_path)
-    if dem_name in ELLIPSOIDAL_HEIGHT_DEMS:
-        if not dst_ellipsoidal_height:
-            raise ValueError(f'{dem_name} is referenced to the ellipsoid; geoid heights are not available')
-        if geoid_path is not None:
-            raise ValueError(f'{dem_name} is referenced to the ellipsoid; a geoid cannot be removed')
-    # This variable is used later to determine if there is intersection with
-    # Missing glo_30 tiles. We do not want calling stitch_dem (again)
-    # for filling and/or patching glo_30 tiles with glo_90 to raise coverage
-    # exceptions
-    if fill_in_glo_30:
-        glo_90_missing_intersection = intersects_missing_glo_30_tiles(bounds)
-        fill_in_glo_30 = fill_in_glo_30 and glo_90_missing_intersection
 
-    if merge_nodata_value not in [np.nan, 0]:
-        raise ValueError('np.nan and 0 are only acceptable merge_nodata_value')
+def _get_profile_bounds(ref_profile: dict) -> list[float]:
+    """Bounds in epsg:4326 of the tiles needed to resample to the grid of `ref_profile`.
 
-    # Random unique identifier
-    tmp_id = str(uuid.uuid4())
-    tile_dir = Path(dst_tile_dir) if dst_tile_dir is not None else Path(f'tmp_{tmp_id}')
-    memory_files = []
+    The grid is buffered by 2 of its pixels and transformed with densified edges (so the curved edges of e.g. UTM
+    grids are contained), then buffered by `PROFILE_BUFFER_DEGREES` for the kernel of the tiles. Grids crossing
+    the dateline have `xmax` beyond 180 as `stitch_dem` expects.
+    """
+    t = ref_profile['transform']
+    xmin, ymin, xmax, ymax = get_array_bounds(ref_profile)
+    buffer_x, buffer_y = 2 * math.hypot(t.a, t.d), 2 * math.hypot(t.b, t.e)
+    xmin, ymin, xmax, ymax = transform_bounds(
+        ref_profile['crs'], EPSG_4326, xmin - buffer_x, ymin - buffer_y, xmax + buffer_x, ymax + buffer_y
+    )
+    if xmin > xmax:
+        xmax += 360
+    return [
+        xmin - PROFILE_BUFFER_DEGREES,
+        max(ymin - PROFILE_BUFFER_DEGREES, -90),
+        xmax + PROFILE_BUFFER_DEGREES,
+        min(ymax + PROFILE_BUFFER_DEGREES, 90),
+    ]
+
+
+def stitch_dem_to_profile(
+    ref_profile: dict,
+    dem_name: str,
+    dst_ellipsoidal_height: bool = True,
+    n_threads_reproj: int = 5,
+    n_threads_downloading: int = 10,
+    fill_in_glo_30: bool = True,
+    merge_nodata_value: float = np.nan,
+    geoid_path: str | Path | None = None,
+    dst_tile_dir: Path | str | None = None,
+    overwrite_existing_tiles: bool = False,
+    tile_cache: TileCache | None = None,
+    fill_dem_names: list[str] | None = None,
+    geoid_cache: GeoidCache | None = None,
+    max_memory_bytes: int = MAX_MEMORY_BYTES,
+    progress: Progress = True,
+) -> tuple[np.ndarray, dict]:
+    """Stitch a DEM directly onto the grid of `ref_profile` (e.g. a UTM grid or that of a geocoded product).
 
-    if dem_name in EARTHDATA_DEMS:
-        ensure_earthdata_credentials()
-    dem_paths = get_dem_tile_paths(
-        bounds=bounds,
-        dem_name=dem_name,
-        localize_tiles_to_gtiff=dst_tile_dir is not None,
+    The epsg:4326 extent of the grid is computed from its CRS and transform, the tiles within it are merged on
+    their native grid and the geoid is removed there as in `stitch_dem`, and the mosaic is then resampled
+    (bilinear) once into the grid. This replaces `stitch_dem` followed by `reproject_arr_to_match_profile`, which
+    resamples twice when `stitch_dem` changes the resolution. Grids aligned with the tiles (e.g. a window of the
+    native output of `stitch_dem`) are cropped from the mosaic without resampling.
+
+    Parameters
+    ----------
+    ref_profile : dict
+        Profile whose 'crs', 'transform', 'height' and 'width' define the output grid
+    dem_name : str
+        One of the dems supported by the stitcher (use `from dem_stitcher.datasets import DATASETS; DATASETS`)
+    dst_ellipsoidal_height, n_threads_reproj, n_threads_downloading, fill_in_glo_30, merge_nodata_value : optional
+        See `stitch_dem`
+    geoid_path, dst_tile_dir, overwrite_existing_tiles, tile_cache, fill_dem_names, geoid_cache : optional
+        See `stitch_dem`
+    max_memory_bytes : int, optional
+        See `stitch_dem`; the mosaic is resampled into a different CRS at once.
+    progress : Callable[[ProgressEvent], None] | bool, optional
+        See `stitch_dem`
+
+    Returns
+    -------
+    tuple[np.ndarray, dict]
+        (DEM Array, metadata dictionary) with the grid of `ref_profile`, float32 and nodata np.nan
+    """
+    missing_keys = [key for key in ['crs', 'transform', 'height', 'width'] if key not in ref_profile]
+    if missing_keys:
+        raise ValueError(f'ref_profile must specify the output grid; missing {", ".join(missing_keys)}')
+    _validate_stitch_dem_args(
+        dem_name,
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=None,
+        merge_nodata_value=merge_nodata_value,
+        geoid_path=geoid_path,
+        geoid_correction_mode='native',
+        read_resampling=None,
+        fill_dem_names=fill_dem_names,
+    )
+    target_profile = {
+        'crs': CRS.from_user_input(ref_profile['crs']),
+        'transform': ref_profile['transform'],
+        'height': ref_profile['height'],
+        'width': ref_profile['width'],
+        'count': 1,
+        'dtype': 'float32',
+        'nodata': np.nan,
+    }
+    # The tiles keep their registration (there is no relabeling) so they are resampled from where they are sampled
+    return _stitch_dem(
+        _get_profile_bounds(target_profile),
+        dem_name,
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=None,
+        dst_resolution=None,
+        n_threads_reproj=n_threads_reproj,
         n_threads_downloading=n_threads_downloading,
-        tile_dir=tile_dir,
+        fill_in_glo_30=fill_in_glo_30,
+        merge_nodata_value=merge_nodata_value,
+        geoid_path=geoid_path,
+        dst_tile_dir=dst_tile_dir,
         overwrite_existing_tiles=overwrite_existing_tiles,
+        geoid_correction_mode='native',
+        tile_cache=tile_cache,
+        read_resampling=None,
+        read_stats=None,
+        fill_dem_names=fill_dem_names,
+        geoid_cache=geoid_cache,
+        max_memory_bytes=max_memory_bytes,
+        target_profile=target_profile,
+        progress=progress,
     )
 
-    # The environment must span opening the datasets through reading them
-    with get_gdal_env(dem_name):
-        # Opening is capped at 5 threads because more leads to errors
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            datasets = list(
-                tqdm(executor.map(rasterio.open, dem_paths), total=len(dem_paths), desc=f'Opening {dem_name} Datasets')
+
+def _get_stitched_profile(
+    sources: list[tuple[str, list[rasterio.DatasetReader]]],
+    bounds: list[float],
+    dst_area_or_point: str | None,
+    dst_resolution: float | tuple[float] | None,
+    read_resampling: str | None,
+    progress: Progress = True,
+) -> tuple[dict | None, list[tuple[dict, tuple[float, float]] | None]]:
+    """Get the profile `_stitch_sources` returns for the sources from the metadata of the tiles alone.
+
+    Also returns, for each source, the merged profile of its tiles and the (x, y) translation from their grid to
+    the output grid (i.e. the Area/Point relabeling) or None if none of its tiles overlap the bounds.
+    """
+    grids = []
+    src_area_or_point = None
+    for _, datasets in sources:
+        merged_profile = None
+        if datasets:
+            merged_profile = get_merged_profile_within_extent(
+                [ds.profile for ds in datasets],
+                bounds,
+                nodata=np.nan,
+                dtype=np.float32,
+                dst_resolution=dst_resolution if read_resampling is not None else None,
+                progress=progress,
             )
+        if merged_profile is None:
+            grids.append(None)
+            continue
+        dem_profile = merged_profile
+        if dem_profile['crs'] == EPSG_4269:
+            dem_profile = reproject_profile_to_new_crs(dem_profile, EPSG_4326)
+        tag = datasets[0].tags().get('AREA_OR_POINT', 'Area')
+        src_area_or_point = src_area_or_point or tag
+        grids.append((merged_profile, dem_profile, shift_profile_for_pixel_loc(dem_profile, tag, src_area_or_point)))
+
+    present = [grid for grid in grids if grid is not None]
+    if not present:
+        return None, grids
+    dem_profile = present[0][2].copy()
+    if len(present) > 1:
+        transform, height, width, _ = _get_merged_grid([grid[2] for grid in present])
+        dem_profile.update(transform=transform, height=height, width=width)
+    shifted_profile = shift_profile_for_pixel_loc(
+        dem_profile, src_area_or_point, dst_area_or_point or src_area_or_point
+    )
 
-        if not datasets:
-            # This is the case that an extent is entirely contained within glo_90
-            # tiles that are missing from glo_30 (list of datasets is empty)
-            if (dem_name == 'glo_30') and fill_in_glo_30:
-                stitcher_kwargs['dem_name'] = 'glo_90_missing'
-                # if dst_resolution is None, then make sure we upsample to 30 meter resolution
-                dst_resolution = stitcher_kwargs['dst_resolution']
-                stitcher_kwargs['dst_resolution'] = dst_resolution or 0.0002777777777777777775
-
-                dem_arr, dem_profile = stitch_dem(**stitcher_kwargs)
-                return dem_arr, dem_profile
-            else:
-                raise NoDEMCoverage(f'Specified bounds are not within coverage area of {dem_name}')
+    def get_shift(grid: tuple[dict, dict, dict] | None) -> tuple[dict, tuple[float, float]] | None:
+        if grid is None:
+            return None
+        merged_profile, profile, relabeled_profile = grid
+        shift = [
+            (relabeled_profile['transform'][i] - profile['transform'][i])
+            + (shifted_profile['transform'][i] - dem_profile['transform'][i])
+            for i in [2, 5]
+        ]
+        return merged_profile, tuple(shift)
+
+    return _build_target_profile(shifted_profile, dst_resolution), list(map(get_shift, grids))
+
+
+def _get_block_size(
+    dst_profile: dict, src_res: tuple[float, float], max_block_bytes: int, read_resampling: str | None
+) -> int:
+    """Side of the (square) blocks, a multiple of the internal tiles of the GeoTIFF, within `max_block_bytes`."""
+    transform = dst_profile['transform']
+    # Native pixels merged per output pixel; decimated reads are at most twice as fine as the output per axis
+    ratio = max(abs(transform.a * transform.e) / (src_res[0] * src_res[1]), 1)
+    if read_resampling is not None:
+        ratio = min(ratio, 4)
+    # The merged tiles, the geoid resampled to them, the geoid corrected heights, and the output block (float32)
+    bytes_per_pixel = 4 * (3 * ratio + 1)
+    tile_size = max(dst_profile['blockxsize'], dst_profile['blockysize'])
+    n_tiles = int(np.sqrt(max_block_bytes / bytes_per_pixel) // tile_size)
+    return max(n_tiles, 1) * tile_size
+
+
+def _get_block_extent(
+    block_profile: dict, merged_profile: dict, shift: tuple[float, float], buffer: float
+) -> list[float] | None:
+    """Extent of the tiles to merge for a block of the output (None if it is outside the tiles merged).
+
+    The block is moved to the grid of the tiles by undoing the Area/Point `shift`, buffered for resampling and
+    clipped to the tiles merged over the entire output, so the block is computed from the same pixels as the
+    corresponding window of `stitch_dem`'s output.
+    """
+    xmin, ymin, xmax, ymax = get_array_bounds(block_profile)
+    mxmin, mymin, mxmax, mymax = get_array_bounds(merged_profile)
+    # Keeps the extent strictly within the pixels at the edge of the merged tiles
+    eps = 1e-3 * merged_profile['transform'].a
+    extent = [
+        max(xmin - shift[0] - buffer, mxmin + eps),
+        max(ymin - shift[1] - buffer, mymin + eps),
+        min(xmax - shift[0] + buffer, mxmax - eps),
+        min(ymax - shift[1] + buffer, mymax - eps),
+    ]
+    if (extent[0] >= extent[2]) or (extent[1] >= extent[3]):
+        return None
+    return extent
+
+
+def _overlaps_extent(dataset: rasterio.DatasetReader, extent: list[float]) -> bool:
+    left, bottom, right, top = dataset.bounds
+    return (left < extent[2]) and (extent[0] < right) and (bottom < extent[3]) and (extent[1] < top)
+
+
+def _stitch_block(
+    block_profile: dict,
+    sources: list[tuple[str, list[rasterio.DatasetReader]]],
+    grids: list[tuple[dict, tuple[float, float]] | None],
+    src_res: tuple[float, float],
+    dst_resolution: float | tuple[float] | None,
+    datum_dem_name: str,
+    merge_kwargs: dict,
+) -> np.ndarray:
+    """Stitch one block of the output of `stitch_dem_to_file` from the tiles overlapping it."""
+    # Two output pixels for resampling and two tile pixels for the extent of the pixels merged
+    buffer = 2 * abs(block_profile['transform'].a) + 2 * src_res[0]
+    block_sources = []
+    for (name, datasets), grid in zip(sources, grids):
+        extent = _get_block_extent(block_profile, *grid, buffer) if grid is not None else None
+        if extent is not None:
+            block_sources.append((name, [ds for ds in datasets if _overlaps_extent(ds, extent)], extent))
+    if not any(datasets for (_, datasets, _) in block_sources):
+        return np.full((1, block_profile['height'], block_profile['width']), np.nan, dtype=np.float32)
+    dem_arr, _ = _stitch_sources(
+        block_sources,
+        dst_resolution=dst_resolution,
+        target_profile=block_profile,
+        datum_dem_name=datum_dem_name,
+        **merge_kwargs,
+    )
+    return dem_arr
 
-        # Preserve tile metadata data not used for geo-referencing
-        profile_tile = datasets[0].profile.copy()
-        [profile_tile.pop(key) for key in ['transform', 'dtype', 'height', 'width', 'nodata', 'crs']]
 
-        crossing = get_dateline_crossing(bounds)
-        if crossing:
-            zipped_data = list(map(lambda ds: _translate_one_tile_across_dateline(ds, crossing), datasets))
-            memory_files, datasets = map(list, zip(*zipped_data))
+# Tiles and arguments of the blocks stitched by a process of `_stitch_blocks_in_processes`
+_BLOCK_WORKER = {}
+
+
+def _init_block_worker(
+    source_paths: list[tuple[str, list[str]]], block_kwargs: dict, geoid_cache_kwargs: dict | None
+) -> None:
+    """Open the tiles (once) in a process stitching blocks; datasets are reopened by path as they cannot be pickled."""
+    dem_names = [name for (name, _) in source_paths]
+    with _get_sources_gdal_env(dem_names):
+        sources = [(name, [rasterio.open(path) for path in paths]) for (name, paths) in source_paths]
+    block_kwargs = block_kwargs.copy()
+    if geoid_cache_kwargs is not None:
+        block_kwargs['merge_kwargs'] = {**block_kwargs['merge_kwargs'], 'geoid_cache': GeoidCache(**geoid_cache_kwargs)}
+    _BLOCK_WORKER.update(sources=sources, dem_names=dem_names, block_kwargs=block_kwargs)
+
+
+def _stitch_block_in_worker(block_profile: dict) -> np.ndarray:
+    with _get_sources_gdal_env(_BLOCK_WORKER['dem_names']):
+        return _stitch_block(block_profile, _BLOCK_WORKER['sources'], **_BLOCK_WORKER['block_kwargs'])
+
+
+def _stitch_blocks_in_processes(
+    windows: list[Window],
+    block_profiles: list[dict],
+    sources: list[tuple[str, list[rasterio.DatasetReader]]],
+    block_kwargs: dict,
+    n_processes: int,
+    geoid_cache: GeoidCache | None,
+) -> Iterator[tuple[Window, np.ndarray]]:
+    """Stitch blocks in a pool of (spawned) processes, yielding (window, block) as the blocks are stitched.
+
+    Each process opens the tiles once and stitches blocks with `_stitch_block` exactly as `stitch_dem_to_file`
+    does in a single process, so the blocks are identical. At most two blocks per process are stitched ahead of
+    those yielded, so the blocks held by the parent are bounded regardless of the extent.
+    """
+    source_paths = [(name, [ds.name for ds in datasets]) for (name, datasets) in sources]
+    merge_kwargs = {key: value for (key, value) in block_kwargs['merge_kwargs'].items() if key != 'geoid_cache'}
+    # Progress callbacks are not shared with the processes, which report nothing but the blocks they stitch
+    merge_kwargs['progress'] = False
+    block_kwargs = {**block_kwargs, 'merge_kwargs': merge_kwargs}
+    # The settings of the cache, whose blocks (and lock) are not shared with the processes
+    geoid_cache_kwargs = None
+    if geoid_cache is not None:
+        geoid_cache_kwargs = dict(
+            max_bytes=geoid_cache.max_bytes,
+            cache_dir=geoid_cache.cache_dir,
+            block_size=geoid_cache.block_size,
+            full_read_max_bytes=geoid_cache.full_read_max_bytes,
+        )
+    blocks = zip(windows, block_profiles)
+    with ProcessPoolExecutor(
+        max_workers=n_processes,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_block_worker,
+        initargs=(source_paths, block_kwargs, geoid_cache_kwargs),
+    ) as executor:
+        pending = {
+            executor.submit(_stitch_block_in_worker, block_profile): window
+            for (window, block_profile) in islice(blocks, 2 * n_processes)
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                window = pending.pop(future)
+                for window_next, block_profile in islice(blocks, 1):
+                    pending[executor.submit(_stitch_block_in_worker, block_profile)] = window_next
+                yield window, future.result()
+
+
+def stitch_dem_to_file(
+    bounds: list[float],
+    dem_name: str,
+    dest_path: str | Path,
+    dst_ellipsoidal_height: bool = True,
+    dst_area_or_point: str | None = None,
+    dst_resolution: float | tuple[float] | None = None,
+    n_threads_reproj: int = 5,
+    n_threads_downloading: int = 10,
+    fill_in_glo_30: bool = True,
+    merge_nodata_value: float = np.nan,
+    geoid_path: str | Path | None = None,
+    dst_tile_dir: Path | str | None = None,
+    overwrite_existing_tiles: bool = False,
+    geoid_correction_mode: str = 'native',
+    tile_cache: TileCache | None = None,
+    read_resampling: str | None = None,
+    max_block_bytes: int = 2**28,
+    creation_options: dict | None = None,
+    fill_dem_names: list[str] | None = None,
+    geoid_cache: GeoidCache | None = None,
+    n_processes: int | None = None,
+    progress: Progress = True,
+) -> dict:
+    """Stitch a DEM as `stitch_dem` does, block by block, into a tiled GeoTIFF so memory is bounded for any extent.
+
+    The output grid is determined from the tile metadata as in `stitch_dem`. It is then split into square blocks
+    (multiples of the internal tiles of the GeoTIFF) that fit within `max_block_bytes`; each block is merged,
+    corrected for the geoid, resampled and written before the next one is processed. The output is identical to
+    `stitch_dem`'s (up to the geoid, which is interpolated per block, and resampling, which is computed from a
+    buffer around each block), except where `glo_30` is filled with `glo_90`, which is resampled to the output grid
+    within each block.
+
+    Parameters
+    ----------
+    bounds : list
+        [xmin, ymin, xmax, ymax] in epsg:4326 (i.e. x=lon and y=lat)
+    dem_name : str
+        One of the dems supported by the stitcher (use `from dem_stitcher.datasets import DATASETS; DATASETS`)
+    dest_path : str | Path
+        Path of the GeoTIFF written (overwritten if it exists)
+    dst_ellipsoidal_height, dst_area_or_point, dst_resolution, n_threads_reproj, n_threads_downloading : optional
+        See `stitch_dem`
+    fill_in_glo_30, merge_nodata_value, geoid_path, dst_tile_dir, overwrite_existing_tiles : optional
+        See `stitch_dem`
+    geoid_correction_mode, tile_cache, read_resampling : optional
+        See `stitch_dem`
+    max_block_bytes : int, optional
+        Approximate memory used to stitch one block, by default 2**28 (256 MB). Blocks are at least one internal
+        tile of the GeoTIFF.
+    creation_options : dict, optional
+        GeoTIFF creation options updating the defaults (LZW compressed, 256 x 256 tiles, and BIGTIFF='IF_SAFER'),
+        by default None
+    fill_dem_names, geoid_cache : optional
+        See `stitch_dem`
+    n_processes : int, optional
+        Number of processes stitching blocks concurrently (each holding up to `max_block_bytes`), by default None,
+        i.e. blocks are stitched one after another in this process. The blocks written are identical either way.
+        The processes are spawned and open the tiles themselves, and each uses its own geoid cache (with the
+        settings of `geoid_cache`, if specified).
+    progress : Callable[[ProgressEvent], None] | bool, optional
+        See `stitch_dem`; the blocks written are reported as 'blocks'. The tiles read by processes stitching
+        blocks are not reported.
+
+    Returns
+    -------
+    dict
+        Profile of the GeoTIFF written
+    """
+    if (n_processes is not None) and (n_processes < 1):
+        raise ValueError('n_processes must be positive')
+    _validate_stitch_dem_args(
+        dem_name,
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=dst_area_or_point,
+        merge_nodata_value=merge_nodata_value,
+        geoid_path=geoid_path,
+        geoid_correction_mode=geoid_correction_mode,
+        read_resampling=read_resampling,
+        fill_dem_names=fill_dem_names,
+    )
+    dem_names = _get_source_dem_names(bounds, dem_name, fill_in_glo_30, fill_dem_names)
+
+    tmp_id = str(uuid.uuid4())
+    tile_dir = Path(dst_tile_dir) if dst_tile_dir is not None else Path(f'tmp_{tmp_id}')
+    if (tile_cache is not None) and (dst_tile_dir is None):
+        tile_dir = None
+    if any(name in EARTHDATA_DEMS for name in dem_names):
+        ensure_earthdata_credentials()
 
-        dem_arr, dem_profile = merge_and_transform_dem_tiles(
-            datasets,
+    merge_kwargs = dict(
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=dst_area_or_point,
+        num_threads_reproj=n_threads_reproj,
+        merge_nodata_value=merge_nodata_value,
+        n_threads_for_reading_tile_data=n_threads_downloading,
+        geoid_path=geoid_path,
+        geoid_correction_mode=geoid_correction_mode,
+        read_resampling=read_resampling,
+        geoid_cache=geoid_cache,
+        progress=progress,
+    )
+    with _get_sources_gdal_env(dem_names), _pinned_tiles(tile_cache) as pinned_paths:
+        sources = _open_sources(
             bounds,
+            dem_names,
+            n_threads_downloading=n_threads_downloading,
+            tile_dir=tile_dir,
+            localize_tiles_to_gtiff=dst_tile_dir is not None,
+            overwrite_existing_tiles=overwrite_existing_tiles,
+            tile_cache=tile_cache,
+            progress=progress,
+            pinned_paths=pinned_paths,
+        )
+        # As in `stitch_dem`, an extent entirely within the missing glo_30 tiles is upsampled to 30 meters
+        if (dem_name == 'glo_30') and not sources[0][1]:
+            dst_resolution = dst_resolution or GLO_30_RESOLUTION
+        dst_profile, grids = _get_stitched_profile(
+            sources, bounds, dst_area_or_point, dst_resolution, read_resampling, progress=progress
+        )
+        if dst_profile is None:
+            raise NoDEMCoverage(f'Specified bounds are not within coverage area of {dem_name}')
+        # The mosaic is in the vertical datum (and registration) of the first DEM with tiles, as in `stitch_dem`
+        (datum_dem_name, datasets_first), *_ = [source for (source, grid) in zip(sources, grids) if grid is not None]
+
+        dst_profile.update(**DEFAULT_GTIFF_PROFILE)
+        dst_profile.update(count=1, dtype='float32', nodata=np.nan, BIGTIFF='IF_SAFER', **(creation_options or {}))
+        dst_area_or_point = dst_area_or_point or datasets_first[0].tags().get('AREA_OR_POINT', 'Area')
+
+        src_res = datasets_first[0].res
+        block_size = _get_block_size(dst_profile, src_res, max_block_bytes, read_resampling)
+        windows = [
+            Window(
+                col_off,
+                row_off,
+                min(block_size, dst_profile['width'] - col_off),
+                min(block_size, dst_profile['height'] - row_off),
+            )
+            for row_off in range(0, dst_profile['height'], block_size)
+            for col_off in range(0, dst_profile['width'], block_size)
+        ]
+        with rasterio.open(dest_path, 'w', **dst_profile) as dst:
+            dst.update_tags(AREA_OR_POINT=dst_area_or_point)
+            block_profiles = [get_cropped_profile(dst_profile, *window.toslices()[::-1]) for window in windows]
+            block_kwargs = dict(
+                grids=grids,
+                src_res=src_res,
+                dst_resolution=dst_resolution,
+                datum_dem_name=datum_dem_name,
+                merge_kwargs=merge_kwargs,
+            )
+            if n_processes is None:
+                blocks = (
+                    (window, _stitch_block(block_profile, sources, **block_kwargs))
+                    for (window, block_profile) in zip(windows, block_profiles)
+                )
+            else:
+                blocks = _stitch_blocks_in_processes(
+                    windows, block_profiles, sources, block_kwargs, n_processes, geoid_cache
+                )
+            for window, dem_arr in track(
+                blocks, progress, 'blocks', total=len(windows), desc=f'Stitching {dem_name} blocks'
+            ):
+                dst.write(dem_arr, window=window)
+            dst_profile = dst.profile
+
+        for _, datasets in sources:
+            list(map(lambda dataset: dataset.close(), datasets))
+
+    if (tile_dir is not None) and tile_dir.exists() and dst_tile_dir is None:
+        shutil.rmtree(str(tile_dir))
+    return dst_profile
+
+
+def _read_tile_metadata(path: str) -> tuple[dict, str]:
+    """Profile and Area/Point registration of a tile (only its header is read)."""
+    with rasterio.open(path) as ds:
+        return ds.profile, ds.tags().get('AREA_OR_POINT', 'Area')
+
+
+def stitch_dem_to_vrt(
+    bounds: list[float],
+    dem_name: str,
+    dest_path: str | Path,
+    dst_ellipsoidal_height: bool = True,
+    dst_area_or_point: str | None = None,
+    dst_resolution: float | tuple[float] | None = None,
+    n_threads_downloading: int = 10,
+    fill_in_glo_30: bool = True,
+    merge_nodata_value: float = np.nan,
+    geoid_path: str | Path | None = None,
+    dst_tile_dir: Path | str | None = None,
+    overwrite_existing_tiles: bool = False,
+    tile_cache: TileCache | None = None,
+    fill_dem_names: list[str] | None = None,
+    progress: Progress = True,
+) -> dict:
+    """Write a VRT of the DEM `stitch_dem` returns, so readers decode only the windows they read.
+
+    Nothing but the tile headers is read. The VRT mosaics the tiles (urls are referenced through `/vsicurl/`) on the
+    grid `stitch_dem` merges them into, translating those across the dateline; fill DEMs are resampled (bilinear)
+    onto it below the tiles of `dem_name`. With `dst_ellipsoidal_height`, the geoid is resampled (cubic) onto the
+    same grid and summed with the heights by gdal's `sum` pixel function. The transform is then relabeled to
+    `dst_area_or_point` and, if `dst_resolution` is specified (or the tiles are in epsg:4269), the VRT is warped
+    (bilinear) onto the grid of `stitch_dem`'s output by gdal when read. The nested VRTs are inlined, so `dest_path`
+    is self-contained.
+
+    Reads agree with `stitch_dem` within float32 rounding (the geoid within 1e-4 m), except when warping to a
+    coarser `dst_resolution`: gdal's warped VRTs weigh source pixels per block, differently from the in-memory warp
+    of `stitch_dem`.
+
+    Parameters
+    ----------
+    bounds : list
+        [xmin, ymin, xmax, ymax] in epsg:4326 (i.e. x=lon and y=lat)
+    dem_name : str
+        One of the dems supported by the stitcher (use `from dem_stitcher.datasets import DATASETS; DATASETS`)
+    dest_path : str | Path
+        Path of the VRT written (overwritten if it exists)
+    dst_ellipsoidal_height, dst_area_or_point, dst_resolution, n_threads_downloading, fill_in_glo_30 : optional
+        See `stitch_dem`
+    merge_nodata_value, geoid_path, overwrite_existing_tiles, tile_cache, fill_dem_names : optional
+        See `stitch_dem`
+    dst_tile_dir : Path | str, optional
+        Directory the tiles are localized to (and kept in, since the VRT references them). Required for DEMs that
+        cannot be read remotely (`srtm_v3` and `nasadem`) unless `tile_cache` is specified; the VRT then references
+        the cached tiles, which are not pinned once it is written and may later be evicted from a bounded cache.
+        By default None.
+    progress : Callable[[ProgressEvent], None] | bool, optional
+        See `stitch_dem`; only the tiles localized and planned are reported, as no pixels are read.
+
+    Returns
+    -------
+    dict
+        Profile of the VRT written. `nisar_dem` tiles are read within `dem_stitcher.credentials.earthdata_gdal_env()`.
+
+    Raises
+    ------
+    ValueError
+        If tiles would have to be localized to a temporary directory, or a fill DEM is referenced to another geoid
+        than `dem_name` (the conversion is not expressed in a VRT)
+    """
+    _validate_stitch_dem_args(
+        dem_name,
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=dst_area_or_point,
+        merge_nodata_value=merge_nodata_value,
+        geoid_path=geoid_path,
+        geoid_correction_mode='native',
+        read_resampling=None,
+        fill_dem_names=fill_dem_names,
+    )
+    dem_names = _get_source_dem_names(bounds, dem_name, fill_in_glo_30, fill_dem_names)
+    if (dst_tile_dir is None) and (tile_cache is None) and any(name not in DIRECT_READ_DEMS for name in dem_names):
+        raise ValueError('Tiles that are not read remotely must be localized to dst_tile_dir or a tile_cache')
+    if any(_get_geoid_name(name) != _get_geoid_name(dem_name) for name in dem_names):
+        raise ValueError('Fill DEMs must be referenced to the same geoid as dem_name')
+    if any(name in EARTHDATA_DEMS for name in dem_names):
+        ensure_earthdata_credentials()
+
+    crossing = get_dateline_crossing(bounds)
+    sources = []
+    with _get_sources_gdal_env(dem_names), _pinned_tiles(tile_cache) as pinned_paths:
+        for name in dem_names:
+            tile_paths = get_dem_tile_paths(
+                bounds=bounds,
+                dem_name=name,
+                localize_tiles_to_gtiff=dst_tile_dir is not None,
+                n_threads_downloading=n_threads_downloading,
+                tile_dir=dst_tile_dir,
+                overwrite_existing_tiles=overwrite_existing_tiles,
+                tile_cache=tile_cache,
+                progress=progress,
+            )
+            if (tile_cache is not None) and (dst_tile_dir is None):
+                pinned_paths += tile_paths
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                metadata = list(executor.map(_read_tile_metadata, tile_paths))
+            if crossing:
+                metadata = [
+                    (translate_profile(p, _get_dateline_shift(get_array_bounds(p), p['transform'].a, crossing), 0), tag)
+                    for (p, tag) in metadata
+                ]
+            profiles = [p for (p, _) in metadata]
+            merged_profile = get_merged_profile_within_extent(
+                profiles, bounds, nodata=np.nan, dtype='float32', progress=progress
+            )
+            if merged_profile is not None:
+                sources.append((name, list(map(to_gdal_path, tile_paths)), profiles, metadata[0][1], merged_profile))
+    if not sources:
+        raise NoDEMCoverage(f'Specified bounds are not within coverage area of {dem_name}')
+    # As in `stitch_dem`, an extent entirely within the missing glo_30 tiles is upsampled to 30 meters
+    if (dem_name == 'glo_30') and (sources[0][0] != dem_name):
+        dst_resolution = dst_resolution or GLO_30_RESOLUTION
+
+    # The mosaic is on the grid of the first DEM with tiles, extended to the fills as `merge_arrays_with_geometadata`
+    _, _, _, src_area_or_point, mosaic_profile = sources[0]
+    dst_area_or_point = dst_area_or_point or src_area_or_point
+    vrt_sources = []
+    grid_profiles = []
+    for i, (_, paths, profiles, area_or_point, merged_profile) in enumerate(sources):
+        profiles = [shift_profile_for_pixel_loc(p, area_or_point, src_area_or_point) for p in profiles]
+        grid_profiles.append(shift_profile_for_pixel_loc(merged_profile, area_or_point, src_area_or_point))
+        vrt_sources += [(path, p, 'nearest' if i == 0 else 'bilinear') for (path, p) in zip(paths, profiles)]
+    transform, height, width, _ = _get_merged_grid(grid_profiles)
+    mosaic_profile = mosaic_profile.copy()
+    mosaic_profile.update(transform=transform, height=height, width=width, count=1)
+    vrt = build_mosaic_vrt(mosaic_profile, vrt_sources, nodata=None if merge_nodata_value == 0 else np.nan)
+
+    if dst_ellipsoidal_height and (dem_name not in ELLIPSOIDAL_HEIGHT_DEMS):
+        geoid_path = geoid_path or get_default_geoid_path(dem_name)
+        with gdal_read_env():
+            geoid_profile, _ = _read_tile_metadata(str(geoid_path))
+        geoid_gdal_path = to_gdal_path(geoid_path)
+        if geoid_profile['crs'] == mosaic_profile['crs']:
+            # The geoid (and its copies across the dateline) is resampled onto the mosaic where it is read
+            shifts = [0, 360, -360] if crossing else [0]
+            geoid_sources = [
+                (geoid_gdal_path, translate_profile(geoid_profile, shift / geoid_profile['transform'].a, 0), 'cubic')
+                for shift in shifts
+            ]
+            geoid_vrt = build_mosaic_vrt(mosaic_profile, geoid_sources)
+        else:
+            geoid_vrt = build_warped_vrt(
+                build_mosaic_vrt(geoid_profile, [(geoid_gdal_path, geoid_profile, 'nearest')]),
+                geoid_profile,
+                mosaic_profile,
+                resampling='cubic',
+            )
+        vrt = build_sum_vrt(mosaic_profile, [vrt, geoid_vrt])
+
+    dst_profile = shift_profile_for_pixel_loc(mosaic_profile, src_area_or_point, dst_area_or_point)
+    vrt = relabel_vrt(vrt, dst_profile['transform'])
+    target_profile = _build_target_profile(dst_profile, dst_resolution)
+    if any(target_profile[key] != dst_profile[key] for key in ['crs', 'transform', 'height', 'width']):
+        vrt = build_warped_vrt(vrt, dst_profile, target_profile, resampling='bilinear')
+        dst_profile = target_profile
+    write_vrt(vrt, dest_path, tags={'AREA_OR_POINT': dst_area_or_point})
+    return {
+        'driver': 'VRT',
+        'dtype': 'float32',
+        'nodata': np.nan,
+        'width': dst_profile['width'],
+        'height': dst_profile['height'],
+        'count': 1,
+        'crs': dst_profile['crs'],
+        'transform': dst_profile['transform'],
+    }
+
+
+def _get_batch_tile_paths(
+    list_of_bounds: list[list[float]],
+    dem_name: str,
+    fill_in_glo_30: bool,
+    fill_dem_names: list[str] | None,
+    n_threads_downloading: int,
+    tile_dir: Path | None,
+    localize_tiles_to_gtiff: bool,
+    tile_cache: TileCache | None,
+    progress: Progress = True,
+    pinned_paths: list[str] | None = None,
+) -> list[list[tuple[str, list[str]]]]:
+    """Get the (dem_name, tile paths) of the DEMs stitched for each of the bounds, in priority order.
+
+    The tiles are looked up (and localized) bounds by bounds in order; tiles localized for earlier bounds are in
+    `tile_dir` (or `tile_cache`) and are not downloaded again. Cached tiles read in place are pinned in `tile_cache`
+    (once per bounds) and appended to `pinned_paths`.
+    """
+    plans = []
+    for bounds in list_of_bounds:
+        plan = []
+        for name in _get_source_dem_names(bounds, dem_name, fill_in_glo_30, fill_dem_names):
+            tile_paths = get_dem_tile_paths(
+                bounds=bounds,
+                dem_name=name,
+                localize_tiles_to_gtiff=localize_tiles_to_gtiff,
+                n_threads_downloading=n_threads_downloading,
+                tile_dir=tile_dir,
+                overwrite_existing_tiles=False,
+                tile_cache=tile_cache,
+                progress=progress,
+            )
+            if (tile_cache is not None) and (tile_dir is None) and (pinned_paths is not None):
+                pinned_paths += tile_paths
+            plan.append((name, tile_paths))
+        if not any(tile_paths for (_, tile_paths) in plan):
+            raise NoDEMCoverage(f'Specified bounds {bounds} are not within coverage area of {dem_name}')
+        plans.append(plan)
+    return plans
+
+
+def _open_tile_for_bounds(
+    datasets: dict[str, rasterio.DatasetReader], path: str, bounds: list[float]
+) -> tuple[rasterio.DatasetReader, bool]:
+    """Get the tile opened once for all bounds, or a VRT of it translated across the dateline for `bounds`.
+
+    Returns the dataset and whether it is a translated dataset (opened for `bounds` only).
+    """
+    dataset = datasets[path]
+    crossing = get_dateline_crossing(bounds)
+    if crossing and _get_dateline_shift(dataset.bounds, dataset.res[0], crossing):
+        return _translate_one_tile_across_dateline(rasterio.open(path), crossing), True
+    return dataset, False
+
+
+def _iter_stitch_dems(
+    list_of_bounds: list[list[float]],
+    dem_name: str,
+    fill_in_glo_30: bool,
+    fill_dem_names: list[str] | None,
+    n_threads_downloading: int,
+    dst_resolution: float | tuple[float] | None,
+    dst_tile_dir: Path | str | None,
+    tile_cache: TileCache | None,
+    stitch_kwargs: dict,
+) -> Iterator[tuple[np.ndarray, dict]]:
+    progress = stitch_kwargs['progress']
+    known_dem_names = [dem_name, *(fill_dem_names or [])]
+    tile_dir = Path(dst_tile_dir) if dst_tile_dir is not None else Path(f'tmp_{uuid.uuid4()}')
+    if (tile_cache is not None) and (dst_tile_dir is None):
+        tile_dir = None
+    if any(name in EARTHDATA_DEMS for name in known_dem_names):
+        ensure_earthdata_credentials()
+
+    datasets = {}
+    pinned_paths = []
+    try:
+        with _get_sources_gdal_env(known_dem_names):
+            plans = _get_batch_tile_paths(
+                list_of_bounds,
+                dem_name,
+                fill_in_glo_30,
+                fill_dem_names,
+                n_threads_downloading=n_threads_downloading,
+                tile_dir=tile_dir,
+                localize_tiles_to_gtiff=dst_tile_dir is not None,
+                tile_cache=tile_cache,
+                progress=progress,
+                pinned_paths=pinned_paths,
+            )
+            n_uses = {}
+            for plan in plans:
+                for path in {path for (_, paths) in plan for path in paths}:
+                    n_uses[path] = n_uses.get(path, 0) + 1
+
+        extents = track(
+            zip(list_of_bounds, plans), progress, 'extents', total=len(plans), desc=f'Stitching {dem_name} extents'
+        )
+        for bounds, plan in extents:
+            # The environment must span reading the datasets, which are kept open (with the blocks gdal caches)
+            with ThreadPoolExecutor(max_workers=1) as executor, _get_sources_gdal_env(known_dem_names):
+                geoid_window_future = None
+                if stitch_kwargs['dst_ellipsoidal_height'] and (dem_name not in ELLIPSOIDAL_HEIGHT_DEMS):
+                    geoid_window_future = executor.submit(
+                        _prefetch_geoid, stitch_kwargs['geoid_path'], dem_name, bounds, stitch_kwargs['geoid_cache']
+                    )
+                # Tiles are opened when the first bounds overlapping them are stitched (capped at 5 threads because
+                # more leads to errors), so only the tiles of neighboring bounds are open at a time
+                new_paths = [
+                    path for path in dict.fromkeys(p for (_, paths) in plan for p in paths) if path not in datasets
+                ]
+                with ThreadPoolExecutor(max_workers=5) as open_executor:
+                    datasets.update(zip(new_paths, open_executor.map(rasterio.open, new_paths)))
+                sources = [
+                    (name, [_open_tile_for_bounds(datasets, path, bounds) for path in paths], bounds)
+                    for (name, paths) in plan
+                ]
+                dst_resolution_bounds = dst_resolution
+                # As in `stitch_dem`, an extent entirely within the missing glo_30 tiles is upsampled to 30 meters
+                if (dem_name == 'glo_30') and not plan[0][1]:
+                    dst_resolution_bounds = dst_resolution or GLO_30_RESOLUTION
+                dem_arr, dem_profile = _stitch_sources(
+                    [(name, [ds for (ds, _) in opened], extent) for (name, opened, extent) in sources],
+                    dst_resolution=dst_resolution_bounds,
+                    n_threads_for_reading_tile_data=n_threads_downloading,
+                    geoid_window_future=geoid_window_future,
+                    **stitch_kwargs,
+                )
+            for _, opened, _ in sources:
+                [ds.close() for (ds, translated) in opened if translated]
+
+            # Preserve tile metadata data not used for geo-referencing (of the first tile, as in `stitch_dem`)
+            first_path = next(path for (_, paths) in plan for path in paths)
+            profile_tile = datasets[first_path].profile.copy()
+            [profile_tile.pop(key) for key in ['transform', 'dtype', 'height', 'width', 'nodata', 'crs']]
+            dem_profile.update(**profile_tile)
+
+            # Tiles are closed (releasing their cached blocks) once the last bounds overlapping them are stitched
+            for path in {path for (_, paths) in plan for path in paths}:
+                n_uses[path] -= 1
+                if not n_uses[path]:
+                    datasets.pop(path).close()
+            yield dem_arr[0, ...], dem_profile
+    finally:
+        list(map(lambda dataset: dataset.close(), datasets.values()))
+        # Cached tiles are evicted (if the cache exceeds its size) only once all the bounds are stitched
+        if pinned_paths:
+            tile_cache.unpin(pinned_paths)
+        if (tile_dir is not None) and tile_dir.exists() and dst_tile_dir is None:
+            shutil.rmtree(str(tile_dir))
+
+
+def iter_stitch_dems(
+    list_of_bounds: list[list[float]],
+    dem_name: str,
+    dst_ellipsoidal_height: bool = True,
+    dst_area_or_point: str | None = None,
+    dst_resolution: float | tuple[float] | None = None,
+    n_threads_reproj: int = 5,
+    n_threads_downloading: int = 10,
+    fill_in_glo_30: bool = True,
+    merge_nodata_value: float = np.nan,
+    geoid_path: str | Path | None = None,
+    dst_tile_dir: Path | str | None = None,
+    geoid_correction_mode: str = 'native',
+    tile_cache: TileCache | None = None,
+    fill_dem_names: list[str] | None = None,
+    geoid_cache: GeoidCache | None = None,
+    max_memory_bytes: int = MAX_MEMORY_BYTES,
+    progress: Progress = True,
+) -> Iterator[tuple[np.ndarray, dict]]:
+    """Stitch the DEM within each of `list_of_bounds` as `stitch_dem` does, yielding them in order.
+
+    The tiles of all bounds are looked up (and localized) up front, once rather than for each bounds. Each tile is
+    opened once, when the first bounds overlapping it are stitched, and kept open until the last bounds overlapping
+    it are stitched. The blocks of a tile decoded for some bounds are then in gdal's block cache (`GDAL_CACHEMAX`)
+    when the next bounds overlapping them are stitched, so blocks shared by bounds ordered along a track (e.g.
+    Sentinel-1 frames) are read once, and only the tiles of neighboring bounds are open at a time. The geoid is read
+    through `geoid_cache` (e.g. the bundled geoids are read once). Tiles translated across the dateline are opened
+    again for each bounds crossing it.
+
+    The DEMs are those of `stitch_dem` with the same arguments.
+
+    Parameters
+    ----------
+    list_of_bounds : list[list[float]]
+        Bounds [xmin, ymin, xmax, ymax] in epsg:4326 (i.e. x=lon and y=lat)
+    dem_name : str
+        One of the dems supported by the stitcher (use `from dem_stitcher.datasets import DATASETS; DATASETS`)
+    dst_ellipsoidal_height, dst_area_or_point, dst_resolution, n_threads_reproj, n_threads_downloading : optional
+        See `stitch_dem`
+    fill_in_glo_30, merge_nodata_value, geoid_path, dst_tile_dir, geoid_correction_mode, tile_cache : optional
+        See `stitch_dem`
+    fill_dem_names, geoid_cache, max_memory_bytes : optional
+        See `stitch_dem`
+    progress : Callable[[ProgressEvent], None] | bool, optional
+        See `stitch_dem`; the bounds stitched are reported as 'extents'.
+
+    Returns
+    -------
+    Iterator[tuple[np.ndarray, dict]]
+        (DEM Array, metadata dictionary) of each of the bounds, in order. Tiles are looked up when the first DEM is
+        requested; all the bounds must be within the coverage area of `dem_name` (see `NoDEMCoverage`).
+    """
+    _validate_stitch_dem_args(
+        dem_name,
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=dst_area_or_point,
+        merge_nodata_value=merge_nodata_value,
+        geoid_path=geoid_path,
+        geoid_correction_mode=geoid_correction_mode,
+        read_resampling=None,
+        fill_dem_names=fill_dem_names,
+    )
+    stitch_kwargs = dict(
+        dst_ellipsoidal_height=dst_ellipsoidal_height,
+        dst_area_or_point=dst_area_or_point,
+        num_threads_reproj=n_threads_reproj,
+        merge_nodata_value=merge_nodata_value,
+        geoid_path=geoid_path,
+        geoid_correction_mode=geoid_correction_mode,
+        geoid_cache=geoid_cache,
+        max_memory_bytes=max_memory_bytes,
+        progress=progress,
+    )
+    return _iter_stitch_dems(
+        [list(bounds) for bounds in list_of_bounds],
+        dem_name,
+        fill_in_glo_30,
+        fill_dem_names,
+        n_threads_downloading=n_threads_downloading,
+        dst_resolution=dst_resolution,
+        dst_tile_dir=dst_tile_dir,
+        tile_cache=tile_cache,
+        stitch_kwargs=stitch_kwargs,
+    )
+
+
+def stitch_dems(
+    list_of_bounds: list[list[float]],
+    dem_name: str,
+    dst_ellipsoidal_height: bool = True,
+    dst_area_or_point: str | None = None,
+    dst_resolution: float | tuple[float] | None = None,
+    n_threads_reproj: int = 5,
+    n_threads_downloading: int = 10,
+    fill_in_glo_30: bool = True,
+    merge_nodata_value: float = np.nan,
+    geoid_path: str | Path | None = None,
+    dst_tile_dir: Path | str | None = None,
+    geoid_correction_mode: str = 'native',
+    tile_cache: TileCache | None = None,
+    fill_dem_names: list[str] | None = None,
+    geoid_cache: GeoidCache | None = None,
+    max_memory_bytes: int = MAX_MEMORY_BYTES,
+    progress: Progress = True,
+) -> list[tuple[np.ndarray, dict]]:
+    """Stitch the DEM within each of `list_of_bounds`, reading the tiles they share once (see `iter_stitch_dems`).
+
+    Returns
+    -------
+    list[tuple[np.ndarray, dict]]
+        (DEM Array, metadata dictionary) of each of the bounds, in order. Use `iter_stitch_dems` to hold one DEM
+        at a time.
+    """
+    return list(
+        iter_stitch_dems(
+            list_of_bounds,
             dem_name,
             dst_ellipsoidal_height=dst_ellipsoidal_height,
             dst_area_or_point=dst_area_or_point,
             dst_resolution=dst_resolution,
-            num_threads_reproj=n_threads_reproj,
+            n_threads_reproj=n_threads_reproj,
+            n_threads_downloading=n_threads_downloading,
+            fill_in_glo_30=fill_in_glo_30,
             merge_nodata_value=merge_nodata_value,
-            n_threads_for_reading_tile_data=n_threads_downloading,
             geoid_path=geoid_path,
+            dst_tile_dir=dst_tile_dir,
             geoid_correction_mode=geoid_correction_mode,
+            tile_cache=tile_cache,
+            fill_dem_names=fill_dem_names,
+            geoid_cache=geoid_cache,
+            max_memory_bytes=max_memory_bytes,
+            progress=progress,
         )
-
-        # Close datasets
-        list(map(lambda dataset: dataset.close(), datasets))
-
-    # Delete orginal tiles if downloaded
-    if tile_dir.exists() and dst_tile_dir is None:
-        shutil.rmtree(str(tile_dir))
-
-    # Created in memory file containers if there is a dateline crossing for translation
-    list(map(lambda mf: mf.close(), memory_files))
-
-    # This is the case when we have overlap of the requested extent and glo_30
-    # and glo_90 tiles that are missing from glo_30.
-    if (dem_name == 'glo_30') and fill_in_glo_30:
-        dem_arr, dem_profile = patch_glo_30_with_glo_90(dem_arr, dem_profile, bounds, stitcher_kwargs)
-
-    dem_profile.update(**profile_tile)
-    dem_arr = dem_arr[0, ...]
-    return dem_arr, dem_profile
+    )
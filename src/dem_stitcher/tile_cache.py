@@ -0,0 +1,538 @@
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+    import msvcrt
+
+
+EVICTION_POLICIES = ['lru', 'lfu']
+INDEX_NAME = 'index.json'
+LOCK_NAME = '.lock'
+LOGS_DIR_NAME = '.logs'
+# Pins whose holder cannot be checked (see `_is_pin_holder_running`) expire after a day by default
+PIN_TTL = 24 * 3600.0
+# An instance merges its access log into the index once the log exceeds this size
+MAX_LOG_BYTES = 2**20
+
+
+@dataclass
+class TileCacheStats:
+    """Counters of a `TileCache`.
+
+    `bytes_saved` is the size of the cached tiles served on hits, i.e. what was not downloaded and rewritten.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+    bytes_written: int = 0
+    evictions: int = 0
+    bytes_evicted: int = 0
+
+    def __add__(self, other: 'TileCacheStats') -> 'TileCacheStats':
+        return TileCacheStats(**{key: value + getattr(other, key) for key, value in asdict(self).items()})
+
+
+@contextmanager
+def _locked(lock_path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on `lock_path` across processes (and across threads, as each call opens the file)."""
+    with lock_path.open('a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            # LK_LOCK gives up (raising) after retrying for 10 seconds; keep waiting
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _get_pin_holder() -> str:
+    """Get the identifier of this process in the pins of the index."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _is_pin_holder_running(holder: str) -> bool | None:
+    """Whether the process holding a pin is running, or None if it cannot be checked (other hosts, windows)."""
+    host, pid = holder.rsplit(':', 1)
+    if (host != socket.gethostname()) or (os.name == 'nt'):
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class TileCache:
+    """On-disk cache of localized DEM tiles shared across calls and processes.
+
+    Entries are addressed by the sha256 of the tile url and stored as `<root>/<hash[:2]>/<hash>/<filename>`.
+    Files are written to a temporary file in the cache root and moved into place with `os.replace`, so readers
+    never see partial tiles. The index (`<root>/index.json`), which tracks sizes, access times, access counts and
+    pins of the entries as well as the cumulative counters of all processes, is only written while holding an
+    exclusive lock on `<root>/.lock`, and is replaced atomically. Downloads happen outside of the lock; if two
+    processes miss the same tile concurrently, both download it and the last one to finish replaces the (identical)
+    file.
+
+    Lookups (`get`) neither take the lock nor write the index: they read the last index written and append their
+    hits and pins to a log of the instance (`<root>/.logs/`); misses are only counted in memory. The logs of all
+    processes are merged into the index whenever it is written (on insertions, on eviction, or once the log of an
+    instance exceeds `MAX_LOG_BYTES`), so the access times used for eviction and the cumulative counters are
+    up to date when they are needed.
+
+    Tiles handed out with `pin=True` (as `download_tiles_to_gtiff` does for the tiles the stitcher reads in place)
+    are pinned by the process until it calls `unpin` with their paths: pinned entries are not evicted, by this or
+    any other process sharing the cache, and eviction is deferred until they are unpinned. Pins are recorded per
+    process with the time they were taken. Those of processes that have exited on the same host are ignored; those
+    of other hosts (and all pins on windows), whose processes cannot be checked, expire after `pin_ttl` seconds
+    so that the pins of crashed workers do not hold entries forever (see also `release_stale_pins`).
+
+    Parameters
+    ----------
+    root : str | Path
+        Directory of the cache; created if it does not exist.
+    max_bytes : int | None, optional
+        Evict entries after an insertion (or after entries are unpinned) until the cache is at most this size.
+        The most recently inserted entry and pinned entries are never evicted, so the cache exceeds `max_bytes`
+        while more than it holds is in use. By default None, i.e. the cache is unbounded.
+    policy : str, optional
+        'lru' evicts the least recently used entry first, 'lfu' the least frequently used one (ties broken by
+        the least recently used), by default 'lru'.
+    pin_ttl : float, optional
+        Seconds after which the pins of processes that cannot be checked expire, by default `PIN_TTL` (a day).
+        It should exceed the time tiles stay pinned, i.e. the longest stitch (or batch of `iter_stitch_dems`).
+    """
+
+    def __init__(
+        self, root: str | Path, max_bytes: int | None = None, policy: str = 'lru', pin_ttl: float = PIN_TTL
+    ) -> None:
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f'policy must be one of {EVICTION_POLICIES}')
+        if (max_bytes is not None) and (max_bytes < 0):
+            raise ValueError('max_bytes must be non-negative')
+        if pin_ttl <= 0:
+            raise ValueError('pin_ttl must be positive')
+        self.root = Path(root).expanduser()
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.pin_ttl = pin_ttl
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._stats = TileCacheStats()
+        # Counters not yet in the index (misses are written with the next update of the index)
+        self._pending_stats = TileCacheStats()
+        self._stats_lock = threading.Lock()
+        # Appends to the log and merges of the log are serialized within the process
+        self._log_lock = threading.RLock()
+        self._log_path = None
+        self._log_pid = None
+        self._snapshot = (None, None)
+
+    def __repr__(self) -> str:
+        return (
+            f'TileCache(root={str(self.root)!r}, max_bytes={self.max_bytes}, policy={self.policy!r}, '
+            f'pin_ttl={self.pin_ttl})'
+        )
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _entry_path(self, key: str, filename: str) -> Path:
+        return self.root / key[:2] / key / filename
+
+    def _load_index(self) -> dict:
+        index_path = self.root / INDEX_NAME
+        index = json.loads(index_path.read_text()) if index_path.exists() else {}
+        index.setdefault('entries', {})
+        index.setdefault('stats', asdict(TileCacheStats()))
+        index.setdefault('logs', {})
+        return index
+
+    @contextmanager
+    def _index(self) -> Iterator[dict]:
+        """Lock the cache and yield its index, with the logs and pending counters merged into it.
+
+        Changes to the index are written atomically on exit.
+        """
+        with _locked(self.root / LOCK_NAME), self._log_lock:
+            index = self._load_index()
+            self._merge_logs(index)
+            with self._stats_lock:
+                pending_stats, self._pending_stats = asdict(self._pending_stats), TileCacheStats()
+            for name, count in pending_stats.items():
+                index['stats'][name] += count
+            yield index
+            self._prune_logs(index)
+            self._write_atomically(self.root / INDEX_NAME, lambda tmp_path: tmp_path.write_text(json.dumps(index)))
+
+    def _read_index(self) -> dict:
+        """Read the index under the lock, with the logs merged into it, without writing it."""
+        with _locked(self.root / LOCK_NAME):
+            index = self._load_index()
+            self._merge_logs(index)
+            return index
+
+    def _read_snapshot(self) -> dict:
+        """Read the last index written without locking the cache (the index is replaced atomically)."""
+        # Files open for reading cannot be replaced on windows, so the index is read under the lock there
+        if fcntl is None:
+            with _locked(self.root / LOCK_NAME):
+                return self._load_index()
+        index_path = self.root / INDEX_NAME
+        try:
+            stat = index_path.stat()
+        except FileNotFoundError:
+            return self._load_index()
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached_signature, index = self._snapshot
+        if cached_signature != signature:
+            index = self._load_index()
+            self._snapshot = (signature, index)
+        return index
+
+    def _write_atomically(self, dest_path: Path, write: Callable[[Path], object]) -> None:
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix='.tmp_', suffix=dest_path.suffix)
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            write(tmp_path)
+            tmp_path.replace(dest_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _count(self, **counts: int) -> None:
+        with self._stats_lock:
+            for name, count in counts.items():
+                setattr(self._stats, name, getattr(self._stats, name) + count)
+
+    def _record(self, index: dict, **counts: int) -> None:
+        self._count(**counts)
+        for name, count in counts.items():
+            index['stats'][name] += count
+
+    def _get_log_path(self) -> Path:
+        # Each process using the instance (e.g. after a fork) appends to its own log
+        if self._log_pid != os.getpid():
+            self._log_path = self.root / LOGS_DIR_NAME / f'{uuid.uuid4().hex}.jsonl'
+            self._log_pid = os.getpid()
+        return self._log_path
+
+    def _log(self, key: str, events: list[dict]) -> None:
+        """Append `events` on the entry `key` to the log of this instance, merging the log if it grew too large."""
+        holder, now = _get_pin_holder(), time.time()
+        lines = ''.join(json.dumps({'key': key, 'holder': holder, 'time': now, **event}) + '\n' for event in events)
+        with self._log_lock:
+            log_path = self._get_log_path()
+            log_path.parent.mkdir(exist_ok=True)
+            with log_path.open('a') as log_file:
+                log_file.write(lines)
+                log_size = log_file.tell()
+        if log_size > MAX_LOG_BYTES:
+            with self._index():
+                pass
+
+    def _merge_logs(self, index: dict) -> None:
+        """Apply the complete lines of the logs not yet merged into `index`, recording how far each log was read."""
+        logs_dir = self.root / LOGS_DIR_NAME
+        logs = index['logs']
+        for log_path in sorted(logs_dir.glob('*.jsonl')) if logs_dir.exists() else []:
+            log = logs.setdefault(log_path.name, {'offset': 0, 'holder': None})
+            try:
+                with log_path.open('rb') as log_file:
+                    log_file.seek(log['offset'])
+                    data = log_file.read()
+            except FileNotFoundError:
+                continue
+            # A line may be being appended
+            data = data[: data.rfind(b'\n') + 1]
+            for line in data.splitlines():
+                event = json.loads(line)
+                log['holder'] = event['holder']
+                self._apply(index, event)
+            log['offset'] += len(data)
+        for name in [name for name in logs if not (logs_dir / name).exists()]:
+            del logs[name]
+
+    def _apply(self, index: dict, event: dict) -> None:
+        entry = index['entries'].get(event['key'])
+        if event['type'] == 'hit':
+            index['stats']['hits'] += 1
+            index['stats']['bytes_saved'] += event['size']
+        # Events on entries evicted since they were logged are dropped
+        if entry is None:
+            return
+        if event['type'] == 'hit':
+            entry['last_access'] = max(entry['last_access'], event['time'])
+            entry['n_accesses'] += 1
+        elif event['type'] == 'pin':
+            pin = entry.setdefault('pins', {}).setdefault(event['holder'], {'count': 0, 'time': event['time']})
+            pin['count'] += 1
+            pin['time'] = max(pin['time'], event['time'])
+        elif event['type'] == 'unpin':
+            self._release_pin(entry, event['holder'])
+
+    @staticmethod
+    def _release_pin(entry: dict, holder: str) -> None:
+        pins = entry.get('pins', {})
+        if holder in pins:
+            pins[holder]['count'] -= 1
+            if pins[holder]['count'] <= 0:
+                del pins[holder]
+        if not pins:
+            entry.pop('pins', None)
+
+    def _prune_logs(self, index: dict) -> None:
+        """Remove the merged log of this instance and the merged logs of processes that are gone."""
+        logs_dir = self.root / LOGS_DIR_NAME
+        own_log_name = self._log_path.name if self._log_pid == os.getpid() else None
+        for name, log in list(index['logs'].items()):
+            log_path = logs_dir / name
+            try:
+                stale = (name == own_log_name) or (
+                    (log['holder'] is not None)
+                    and self._is_stale(log['holder'], log_path.stat().st_mtime)
+                    and (log['offset'] == log_path.stat().st_size)
+                )
+            except FileNotFoundError:
+                stale = True
+            if stale:
+                log_path.unlink(missing_ok=True)
+                del index['logs'][name]
+
+    def get(self, url: str, pin: bool = False) -> Path | None:
+        """Get the path of the cached tile for `url` (recording a hit) or None (recording a miss).
+
+        With `pin`, the tile is not evicted until this process unpins it (see `unpin`).
+        """
+        key = self.key(url)
+        entry = self._read_snapshot()['entries'].get(key)
+        if entry is None:
+            self._count(misses=1)
+            with self._stats_lock:
+                self._pending_stats.misses += 1
+            return None
+        path = self._entry_path(key, entry['filename'])
+        # The pin is logged before checking the tile, so a process evicting it concurrently sees the pin (see _evict)
+        if pin:
+            self._log(key, [{'type': 'pin'}])
+        if not path.exists():
+            # The entry may have been removed by hand or evicted since the index was written
+            with self._index() as index:
+                entry = index['entries'].get(key)
+                if (entry is not None) and not self._entry_path(key, entry['filename']).exists():
+                    del index['entries'][key]
+                # The tile may be back if it was moved aside for eviction; the pin logged above is released
+                elif (entry is not None) and pin:
+                    self._release_pin(entry, _get_pin_holder())
+                self._record(index, misses=1)
+            return None
+        self._log(key, [{'type': 'hit', 'size': entry['size']}])
+        self._count(hits=1, bytes_saved=entry['size'])
+        return path
+
+    def put(self, url: str, filename: str, write: Callable[[Path], object], pin: bool = False) -> Path:
+        """Write the tile for `url` into the cache and evict entries if the cache exceeds `max_bytes`.
+
+        Parameters
+        ----------
+        url : str
+            Url of the tile (the cache key)
+        filename : str
+            Filename of the cached tile; its suffix is preserved so gdal can identify the format.
+        write : Callable[[Path], object]
+            Function writing the tile to the (temporary) path it is passed.
+        pin : bool, optional
+            If True, the tile is not evicted until this process unpins it (see `unpin`), by default False
+
+        Returns
+        -------
+        Path
+            Path of the cached tile
+        """
+        key = self.key(url)
+        path = self._entry_path(key, filename)
+        self._write_atomically(path, write)
+        with self._index() as index:
+            # A process evicting a previous entry of the tile may have removed the file just written
+            if not path.exists():
+                self._write_atomically(path, write)
+            size = path.stat().st_size
+            entries = index['entries']
+            now = time.time()
+            # Another process may have written (and pinned) the same tile concurrently
+            pins = entries.get(key, {}).get('pins', {})
+            entries[key] = {'filename': filename, 'size': size, 'last_access': now, 'n_accesses': 1}
+            if pin:
+                pin = pins.setdefault(_get_pin_holder(), {'count': 0, 'time': now})
+                pin['count'] += 1
+                pin['time'] = now
+            if pins:
+                entries[key]['pins'] = pins
+            self._record(index, bytes_written=size)
+            self._evict(index, keep=key)
+        return path
+
+    def get_or_put(self, url: str, filename: str, write: Callable[[Path], object], pin: bool = False) -> Path:
+        """Get the cached tile for `url`, writing it with `write` on a miss (see `put`)."""
+        path = self.get(url, pin=pin)
+        if path is None:
+            path = self.put(url, filename, write, pin=pin)
+        return path
+
+    def unpin(self, paths: Iterable[str | Path]) -> None:
+        """Release a pin of this process on each of the cached tiles at `paths` (given once per pin taken).
+
+        Entries are then evicted if the cache exceeds `max_bytes`. Paths that are not cached tiles are ignored.
+        """
+        for path in paths:
+            # Cached tiles are at <root>/<hash[:2]>/<hash>/<filename>
+            self._log(Path(path).parent.name, [{'type': 'unpin'}])
+        # The index is only written when entries are to be evicted
+        if (self.max_bytes is not None) and (self._get_size(self._read_snapshot()) > self.max_bytes):
+            with self._index() as index:
+                self._evict(index)
+
+    def release_stale_pins(self) -> int:
+        """Drop the pins of processes that have exited or expired (see `pin_ttl`) and evict entries if needed.
+
+        Returns
+        -------
+        int
+            Number of pins dropped (one per process and entry)
+        """
+        with self._index() as index:
+            n_released = sum(self._drop_stale_pins(entry) for entry in index['entries'].values())
+            self._evict(index)
+        return n_released
+
+    def _is_stale(self, holder: str, last_seen: float) -> bool:
+        """Whether the process `holder` has exited or, if that cannot be checked, was last seen over `pin_ttl` ago."""
+        running = _is_pin_holder_running(holder)
+        if running is None:
+            return (time.time() - last_seen) > self.pin_ttl
+        return not running
+
+    def _drop_stale_pins(self, entry: dict) -> int:
+        pins = entry.get('pins', {})
+        stale_holders = [holder for (holder, pin) in pins.items() if self._is_stale(holder, pin['time'])]
+        for holder in stale_holders:
+            del pins[holder]
+        if not pins:
+            entry.pop('pins', None)
+        return len(stale_holders)
+
+    def _is_pinned(self, entry: dict) -> bool:
+        """Whether a running process pins the entry; stale pins are dropped."""
+        self._drop_stale_pins(entry)
+        return 'pins' in entry
+
+    def _evict(self, index: dict, keep: str | None = None) -> None:
+        if self.max_bytes is None:
+            return
+        entries = index['entries']
+        total = self._get_size(index)
+        if total <= self.max_bytes:
+            return
+
+        def priority(key: str) -> tuple:
+            entry = entries[key]
+            if self.policy == 'lfu':
+                return (entry['n_accesses'], entry['last_access'])
+            return (entry['last_access'],)
+
+        candidates = [key for key in entries if (key != keep) and not self._is_pinned(entries[key])]
+        for key in sorted(candidates, key=priority):
+            if total <= self.max_bytes:
+                break
+            entry = entries[key]
+            path = self._entry_path(key, entry['filename'])
+            evicted_path = path.with_name(f'.evicted_{path.name}')
+            # Lookups log their pins before checking the tile exists; pins logged since the logs were merged are
+            # seen once the tile is moved aside, which then makes lookups miss, and the tile is restored
+            try:
+                path.replace(evicted_path)
+            except FileNotFoundError:
+                pass
+            # Open files cannot be moved or removed on windows; they are dropped from the index and overwritten later
+            except OSError:
+                evicted_path = None
+            self._merge_logs(index)
+            if (evicted_path is not None) and self._is_pinned(entry):
+                evicted_path.replace(path)
+                continue
+            del entries[key]
+            if evicted_path is not None:
+                evicted_path.unlink(missing_ok=True)
+                try:
+                    path.parent.rmdir()
+                except OSError:
+                    pass
+            total -= entry['size']
+            self._record(index, evictions=1, bytes_evicted=entry['size'])
+
+    @property
+    def stats(self) -> TileCacheStats:
+        """Counters of this `TileCache` instance."""
+        with self._stats_lock:
+            return TileCacheStats(**asdict(self._stats))
+
+    def cumulative_stats(self) -> TileCacheStats:
+        """Counters of all processes that have used the cache at `root` since it was created (or cleared).
+
+        Misses of lookups are counted with the next write of the index by their instance (e.g. the `put` of
+        `get_or_put`).
+        """
+        return TileCacheStats(**self._read_index()['stats'])
+
+    @staticmethod
+    def _get_size(index: dict) -> int:
+        return sum(entry['size'] for entry in index['entries'].values())
+
+    def size(self) -> int:
+        """Total size of the cached tiles in bytes."""
+        return self._get_size(self._read_index())
+
+    def __len__(self) -> int:
+        return len(self._read_index()['entries'])
+
+    def clear(self) -> None:
+        """Remove all cached tiles and reset the cumulative counters."""
+        with self._index() as index:
+            for key, entry in index['entries'].items():
+                path = self._entry_path(key, entry['filename'])
+                path.unlink(missing_ok=True)
+                try:
+                    path.parent.rmdir()
+                except OSError:
+                    pass
+            index['entries'] = {}
+            index['stats'] = asdict(TileCacheStats())
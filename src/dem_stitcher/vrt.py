@@ -0,0 +1,236 @@
+import math
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from affine import Affine
+from rasterio.io import DatasetReader
+
+from .rio_tools import translate_profile
+from .rio_window import get_array_bounds
+
+
+# Names of gdal's resampling algorithms in VRT sources and warp options
+VRT_RESAMPLING = {'nearest': 'nearest', 'bilinear': 'bilinear', 'cubic': 'cubic'}
+WARP_RESAMPLING = {'nearest': 'NearestNeighbour', 'bilinear': 'Bilinear', 'cubic': 'Cubic'}
+# Names of gdal's data types of the (numpy) dtypes of rasters
+GDAL_DATA_TYPES = {
+    'uint8': 'Byte',
+    'int8': 'Int8',
+    'uint16': 'UInt16',
+    'int16': 'Int16',
+    'uint32': 'UInt32',
+    'int32': 'Int32',
+    'float32': 'Float32',
+    'float64': 'Float64',
+}
+
+
+def to_gdal_path(path: str | Path) -> str:
+    """Get the path gdal opens a url (through `/vsicurl/` or `/vsis3/`) or local file (absolute) with."""
+    path = str(path)
+    if path.startswith(('http://', 'https://')):
+        return f'/vsicurl/{path}'
+    if path.startswith('s3://'):
+        return f'/vsis3/{path[len("s3://") :]}'
+    if path.startswith('/vsi'):
+        return path
+    return str(Path(path).resolve())
+
+
+def _format_value(value: float) -> str:
+    return 'nan' if math.isnan(value) else repr(float(value))
+
+
+def _format_geo_transform(transform: Affine) -> str:
+    return ','.join(_format_value(value) for value in transform.to_gdal())
+
+
+def _dataset_element(profile: dict, sub_class: str | None = None) -> ET.Element:
+    attributes = {'rasterXSize': str(profile['width']), 'rasterYSize': str(profile['height'])}
+    if sub_class is not None:
+        attributes['subClass'] = sub_class
+    dataset = ET.Element('VRTDataset', attributes)
+    if profile.get('crs') is not None:
+        ET.SubElement(dataset, 'SRS', {'dataAxisToSRSAxisMapping': '2,1'}).text = profile['crs'].to_wkt()
+    ET.SubElement(dataset, 'GeoTransform').text = _format_geo_transform(profile['transform'])
+    return dataset
+
+
+def _band_element(
+    dataset: ET.Element, nodata: float | None, sub_class: str | None = None, data_type: str = 'Float32', band: int = 1
+) -> ET.Element:
+    attributes = {'dataType': data_type, 'band': str(band)}
+    if sub_class is not None:
+        attributes['subClass'] = sub_class
+    band_element = ET.SubElement(dataset, 'VRTRasterBand', attributes)
+    if nodata is not None:
+        ET.SubElement(band_element, 'NoDataValue').text = _format_value(nodata)
+    return band_element
+
+
+def _add_metadata(vrt: ET.Element, tags: dict | None) -> None:
+    if tags:
+        metadata = ET.Element('Metadata')
+        for key, value in tags.items():
+            ET.SubElement(metadata, 'MDI', {'key': key}).text = str(value)
+        vrt.insert(0, metadata)
+
+
+def _rect_element(parent: ET.Element, tag: str, x_off: float, y_off: float, x_size: float, y_size: float) -> None:
+    values = {'xOff': x_off, 'yOff': y_off, 'xSize': x_size, 'ySize': y_size}
+    ET.SubElement(parent, tag, {key: repr(float(value)) for key, value in values.items()})
+
+
+def _add_source(
+    band: ET.Element, source_path: str, source_profile: dict, dst_profile: dict, resampling: str = 'nearest'
+) -> None:
+    """Add the entire raster of `source_profile` to `band` (on the grid of `dst_profile`) where it georeferences.
+
+    The source is placed by its bounds in pixels of the destination grid, which gdal clips to the grid, so sources
+    translated across the dateline or only partially within the grid are read only where needed. Pixel-aligned
+    sources of the same resolution are copied; others are resampled.
+    """
+    t = dst_profile['transform']
+    xmin, ymin, xmax, ymax = get_array_bounds(source_profile)
+    source = ET.SubElement(band, 'ComplexSource', {'resampling': VRT_RESAMPLING[resampling]})
+    ET.SubElement(source, 'SourceFilename', {'relativeToVRT': '0'}).text = source_path
+    ET.SubElement(source, 'SourceBand').text = '1'
+    _rect_element(source, 'SrcRect', 0, 0, source_profile['width'], source_profile['height'])
+    _rect_element(source, 'DstRect', (xmin - t.c) / t.a, (ymax - t.f) / t.e, (xmax - xmin) / t.a, (ymin - ymax) / t.e)
+    if source_profile.get('nodata') is not None:
+        ET.SubElement(source, 'NODATA').text = _format_value(source_profile['nodata'])
+
+
+def build_mosaic_vrt(
+    profile: dict, sources: list[tuple[str, dict, str]], nodata: float | None = float('nan')
+) -> ET.Element:
+    """Get a float32 VRT on the grid of `profile` mosaicking (gdal path, profile, resampling) sources.
+
+    Sources are in priority order: the first one is drawn last so its data is on top, and its nodata pixels
+    leave the data of the others. Pixels without data from any source are `nodata`, or 0 if `nodata` is None.
+    """
+    dataset = _dataset_element(profile)
+    band = _band_element(dataset, nodata)
+    for source_path, source_profile, resampling in sources[::-1]:
+        _add_source(band, source_path, source_profile, profile, resampling=resampling)
+    return dataset
+
+
+def build_sum_vrt(profile: dict, vrts: list[ET.Element], nodata: float = float('nan')) -> ET.Element:
+    """Get a VRT summing VRTs on the same grid (e.g. heights and a geoid) pixel by pixel when read.
+
+    The VRTs are inlined, so the sum is one self-contained file. Nodata of any VRT is nodata of the sum.
+    """
+    dataset = _dataset_element(profile)
+    band = _band_element(dataset, nodata, sub_class='VRTDerivedRasterBand')
+    ET.SubElement(band, 'PixelFunctionType').text = 'sum'
+    ET.SubElement(band, 'PixelFunctionArguments', {'propagateNoData': 'true'})
+    ET.SubElement(band, 'SourceTransferType').text = 'Float32'
+    for vrt in vrts:
+        source = ET.SubElement(band, 'SimpleSource')
+        ET.SubElement(source, 'SourceFilename', {'relativeToVRT': '0'}).text = ET.tostring(vrt, encoding='unicode')
+        ET.SubElement(source, 'SourceBand').text = '1'
+    return dataset
+
+
+def build_warped_vrt(
+    vrt: ET.Element,
+    src_profile: dict,
+    dst_profile: dict,
+    resampling: str = 'bilinear',
+    warp_mem_limit: int = 64,
+    nodata: float = float('nan'),
+) -> ET.Element:
+    """Get a VRT warping (inlined) `vrt` on the grid of `src_profile` to the grid and CRS of `dst_profile`.
+
+    The warp is computed by gdal's warper (with the same options as `rio_tools.reproject_arr_to_match_profile`)
+    for the windows read, in chunks of at most `warp_mem_limit` MB.
+    """
+    dataset = _dataset_element(dst_profile, sub_class='VRTWarpedDataset')
+    band = _band_element(dataset, nodata, sub_class='VRTWarpedRasterBand')
+    band.set('band', '1')
+    ET.SubElement(dataset, 'BlockXSize').text = str(min(dst_profile['width'], 512))
+    ET.SubElement(dataset, 'BlockYSize').text = str(min(dst_profile['height'], 128))
+
+    options = ET.SubElement(dataset, 'GDALWarpOptions')
+    ET.SubElement(options, 'WarpMemoryLimit').text = str(warp_mem_limit * 2**20)
+    ET.SubElement(options, 'ResampleAlg').text = WARP_RESAMPLING[resampling]
+    ET.SubElement(options, 'WorkingDataType').text = 'Float32'
+    ET.SubElement(options, 'Option', {'name': 'INIT_DEST'}).text = 'NO_DATA'
+    ET.SubElement(options, 'SourceDataset', {'relativeToVRT': '0'}).text = ET.tostring(vrt, encoding='unicode')
+
+    transformer = ET.SubElement(ET.SubElement(options, 'Transformer'), 'GenImgProjTransformer')
+    t_src, t_dst = src_profile['transform'], dst_profile['transform']
+    ET.SubElement(transformer, 'SrcGeoTransform').text = _format_geo_transform(t_src)
+    ET.SubElement(transformer, 'SrcInvGeoTransform').text = _format_geo_transform(~t_src)
+    ET.SubElement(transformer, 'DstGeoTransform').text = _format_geo_transform(t_dst)
+    ET.SubElement(transformer, 'DstInvGeoTransform').text = _format_geo_transform(~t_dst)
+    if src_profile['crs'] != dst_profile['crs']:
+        reprojection = ET.SubElement(ET.SubElement(transformer, 'ReprojectTransformer'), 'ReprojectionTransformer')
+        ET.SubElement(reprojection, 'SourceSRS').text = src_profile['crs'].to_wkt()
+        ET.SubElement(reprojection, 'TargetSRS').text = dst_profile['crs'].to_wkt()
+
+    mapping = ET.SubElement(ET.SubElement(options, 'BandList'), 'BandMapping', {'src': '1', 'dst': '1'})
+    ET.SubElement(mapping, 'SrcNoDataReal').text = _format_value(nodata)
+    ET.SubElement(mapping, 'SrcNoDataImag').text = '0'
+    ET.SubElement(mapping, 'DstNoDataReal').text = _format_value(nodata)
+    ET.SubElement(mapping, 'DstNoDataImag').text = '0'
+    return dataset
+
+
+def build_translated_vrt(
+    source_path: str, profile: dict, x_shift: float, y_shift: float, tags: dict | None = None
+) -> ET.Element:
+    """Get a VRT of all the bands of a raster (with `profile`) with its transform translated by pixels.
+
+    The pixels (and data type) are those of the raster, read from `source_path` only where the VRT is read.
+    """
+    vrt = _dataset_element(translate_profile(profile, x_shift=x_shift, y_shift=y_shift))
+    _add_metadata(vrt, tags)
+    data_type = GDAL_DATA_TYPES[np.dtype(profile['dtype']).name]
+    for band in range(1, profile['count'] + 1):
+        band_element = _band_element(vrt, profile.get('nodata'), data_type=data_type, band=band)
+        source = ET.SubElement(band_element, 'SimpleSource')
+        ET.SubElement(source, 'SourceFilename', {'relativeToVRT': '0'}).text = source_path
+        ET.SubElement(source, 'SourceBand').text = str(band)
+    return vrt
+
+
+def open_translated_dataset(dataset: DatasetReader, x_shift: float, y_shift: float) -> DatasetReader:
+    """Open a dataset with its transform translated by pixels (e.g. across the dateline). Closes the input dataset.
+
+    Unlike `rio_tools.translate_dataset`, nothing is read or copied: the translated dataset is a VRT of the raster
+    of the input one, so reads of windows of it read only the same windows of the raster.
+
+    Parameters
+    ----------
+    dataset : DatasetReader
+        Input dataset in read mode. Will be closed after function is run.
+    x_shift : float
+        Number of *pixels* to be translated
+    y_shift : float
+        Number of *pixels* to be translated
+
+    Returns
+    -------
+    DatasetReader
+        Translated dataset (with the tags of the input dataset, e.g. AREA_OR_POINT)
+    """
+    vrt = build_translated_vrt(to_gdal_path(dataset.name), dataset.profile, x_shift, y_shift, tags=dataset.tags())
+    dataset.close()
+    return rasterio.open(ET.tostring(vrt, encoding='unicode'))
+
+
+def relabel_vrt(vrt: ET.Element, transform: Affine) -> ET.Element:
+    """Set the transform of a VRT (e.g. relabeled from Area to Point) without changing its pixels."""
+    vrt.find('GeoTransform').text = _format_geo_transform(transform)
+    return vrt
+
+
+def write_vrt(vrt: ET.Element, dest_path: str | Path, tags: dict | None = None) -> None:
+    """Write a VRT with dataset metadata `tags` (e.g. AREA_OR_POINT)."""
+    _add_metadata(vrt, tags)
+    ET.indent(vrt)
+    Path(dest_path).write_text(ET.tostring(vrt, encoding='unicode'))
@@ -8,6 +8,8 @@ from affine import Affine
 from rasterio import default_gtiff_profile
 from rasterio.crs import CRS
 
+from dem_stitcher.datasets import get_overlapping_dem_tile_urls
+
 
 @pytest.fixture(scope='session')
 def test_dir() -> Path:
@@ -76,6 +78,29 @@ def get_tile_paths_for_comparison_with_golden_dataset() -> Callable[[str], list[
     return _get_tile_dataset
 
 
+@pytest.fixture(scope='session')
+def get_glo_30_urls_of_golden_tiles(
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+) -> Callable[[list[float]], dict[str, str]]:
+    """Golden tiles of Los Angeles keyed by the urls of the glo_30 tiles (overlapping `bounds`) containing them."""
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+
+    def _get_urls_of_golden_tiles(bounds: list[float]) -> dict[str, str]:
+        tiles = {}
+        for url in get_overlapping_dem_tile_urls(bounds, 'glo_30'):
+            # e.g. Copernicus_DSM_COG_10_N33_00_W119_00_DEM.tif is the 1 degree tile with lower left corner (-119, 33)
+            lat, _, lon, _, _ = url.split('/')[-1].split('_10_')[1].split('_')
+            lat, lon = int(lat[1:]) * (1 if lat[0] == 'N' else -1), int(lon[1:]) * (1 if lon[0] == 'E' else -1)
+            for path in tile_paths:
+                with rasterio.open(path) as ds:
+                    x, y = (ds.bounds.left + ds.bounds.right) / 2, (ds.bounds.bottom + ds.bounds.top) / 2
+                if (lon <= x < lon + 1) and (lat <= y < lat + 1):
+                    tiles[url] = path
+        return tiles
+
+    return _get_urls_of_golden_tiles
+
+
 @pytest.fixture(scope='session')
 def get_golden_dataset_path() -> Callable[[str, str], str]:
     golden_dataset_dir = Path(__file__).resolve().parent / 'data' / 'golden_datasets'
@@ -0,0 +1,163 @@
+import json
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+import rasterio
+from numpy.testing import assert_array_equal
+
+from dem_stitcher import TileCache, stitch_dem_to_file
+from dem_stitcher.cli import main, read_manifest
+
+
+# Overlapping extents within the tiles of the golden dataset of Los Angeles
+FRAMES_LA = [[-118.04, 33.96, -117.99, 34.02], [-118.02, 33.98, -117.97, 34.04]]
+
+
+def _write_geojson_manifest(path: Path, frames: list[list[float]], names: list[str | None]) -> None:
+    features = []
+    for (xmin, ymin, xmax, ymax), name in zip(frames, names):
+        ring = [[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax], [xmin, ymin]]
+        features.append(
+            {'type': 'Feature', 'properties': {'name': name}, 'geometry': {'type': 'Polygon', 'coordinates': [ring]}}
+        )
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': features}))
+
+
+def test_read_manifest(tmp_path: Path) -> None:
+    csv_path = tmp_path / 'aois.csv'
+    csv_path.write_text('name,xmin,ymin,xmax,ymax\nframe_a,-118.04,33.96,-117.99,34.02\n,-118.02,33.98,-117.97,34.04\n')
+    assert read_manifest(csv_path) == [('frame_a', FRAMES_LA[0]), ('aoi_1', FRAMES_LA[1])]
+
+    geojson_path = tmp_path / 'aois.geojson'
+    _write_geojson_manifest(geojson_path, FRAMES_LA, ['frame_a', None])
+    assert read_manifest(geojson_path) == [('frame_a', FRAMES_LA[0]), ('aoi_1', FRAMES_LA[1])]
+
+    csv_path.write_text('name,xmin,ymin,xmax\nframe_a,-118.04,33.96,-117.99\n')
+    with pytest.raises(ValueError, match='columns'):
+        read_manifest(csv_path)
+    _write_geojson_manifest(geojson_path, FRAMES_LA, ['frame_a', 'frame_a'])
+    with pytest.raises(ValueError, match='unique'):
+        read_manifest(geojson_path)
+    with pytest.raises(ValueError, match='GeoJSON'):
+        read_manifest(tmp_path / 'aois.txt')
+
+    # Names are file names within the output directory
+    for name in ['../frame_a', 'frames/frame_a', 'frames\\frame_a']:
+        _write_geojson_manifest(geojson_path, FRAMES_LA, [name, 'frame_b'])
+        with pytest.raises(ValueError, match='file names'):
+            read_manifest(geojson_path)
+    csv_path.write_text('name,xmin,ymin,xmax,ymax\nframe_a,-118.04,33.96\n')
+    with pytest.raises(ValueError, match='Row 0 .* missing bounds'):
+        read_manifest(csv_path)
+
+
+@pytest.mark.parametrize('manifest_format', ['csv', 'geojson'])
+def test_cli_manifest_matches_stitch_dem_to_file(
+    manifest_format: str,
+    tmp_path: Path,
+    test_data_dir: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', return_value=tile_paths)
+    geoid_path = str(test_data_dir / 'golden_datasets' / 'egm_08_los_angeles.tif')
+    names = ['frame_a', 'frame_b']
+    manifest_path = tmp_path / f'aois.{manifest_format}'
+    if manifest_format == 'csv':
+        rows = [','.join([name, *map(str, bounds)]) for (name, bounds) in zip(names, FRAMES_LA)]
+        manifest_path.write_text('\n'.join(['name,xmin,ymin,xmax,ymax', *rows]))
+    else:
+        _write_geojson_manifest(manifest_path, FRAMES_LA, names)
+
+    argv = ['--manifest', str(manifest_path), '--output-dir', str(tmp_path / 'dems'), '--geoid-path', geoid_path]
+    assert main([*argv, '--n-jobs', '2', '--compress', 'deflate']) == 0
+    summary = capsys.readouterr().out
+    assert all(name in summary for name in names)
+    assert '2 jobs (0 failed)' in summary
+
+    for name, bounds in zip(names, FRAMES_LA):
+        stitch_dem_to_file(bounds, 'glo_30', tmp_path / 'expected.tif', geoid_path=geoid_path)
+        with rasterio.open(tmp_path / 'dems' / f'{name}.tif') as ds, rasterio.open(tmp_path / 'expected.tif') as ds_e:
+            assert ds.profile['compress'] == 'deflate'
+            assert ds.profile['tiled']
+            assert ds.transform == ds_e.transform
+            assert_array_equal(ds.read(), ds_e.read())
+
+
+def _seed_tile_cache(cache_dir: Path, golden_tiles: dict[str, str]) -> None:
+    """Put the golden tiles of Los Angeles in a tile cache under the urls of the glo_30 tiles containing them."""
+    tile_cache = TileCache(cache_dir)
+    for url, path in golden_tiles.items():
+        tile_cache.put(url, url.split('/')[-1], lambda dest_path, path=path: shutil.copyfile(path, dest_path))
+
+
+def test_cli_processes_with_tile_cache(
+    tmp_path: Path,
+    test_data_dir: Path,
+    get_glo_30_urls_of_golden_tiles: Callable[[list[float]], dict[str, str]],
+    capsys: pytest.CaptureFixture,
+) -> None:
+    # Mocks do not reach the spawned processes, so the tiles are read from the cache as in a run of the command
+    _seed_tile_cache(tmp_path / 'cache', get_glo_30_urls_of_golden_tiles([-118.05, 33.95, -117.95, 34.05]))
+    geoid_path = str(test_data_dir / 'golden_datasets' / 'egm_08_los_angeles.tif')
+    manifest_path = tmp_path / 'aois.csv'
+    rows = [','.join([name, *map(str, bounds)]) for (name, bounds) in zip(['frame_a', 'frame_b'], FRAMES_LA)]
+    manifest_path.write_text('\n'.join(['name,xmin,ymin,xmax,ymax', *rows]))
+
+    argv = ['--manifest', str(manifest_path), '--output-dir', str(tmp_path / 'dems'), '--geoid-path', geoid_path]
+    argv += ['--tile-cache', str(tmp_path / 'cache'), '--n-jobs', '2', '--processes', '--quiet']
+    assert main(argv) == 0
+    assert '2 jobs (0 failed)' in capsys.readouterr().out
+    # The tiles were found in the cache
+    assert TileCache(tmp_path / 'cache').cumulative_stats().misses == 0
+
+    for name, bounds in zip(['frame_a', 'frame_b'], FRAMES_LA):
+        expected_path = tmp_path / f'{name}_expected.tif'
+        stitch_dem_to_file(
+            bounds, 'glo_30', expected_path, geoid_path=geoid_path, tile_cache=TileCache(tmp_path / 'cache')
+        )
+        with rasterio.open(tmp_path / 'dems' / f'{name}.tif') as ds, rasterio.open(expected_path) as ds_e:
+            assert ds.transform == ds_e.transform
+            assert_array_equal(ds.read(), ds_e.read())
+
+
+def test_cli_reports_failed_jobs(
+    tmp_path: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    # The tiles of the first AOI are found, those of the second are not
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=[tile_paths, []])
+    manifest_path = tmp_path / 'aois.csv'
+    manifest_path.write_text('\n'.join(['xmin,ymin,xmax,ymax', *[','.join(map(str, bounds)) for bounds in FRAMES_LA]]))
+
+    argv = ['--manifest', str(manifest_path), '--output-dir', str(tmp_path), '--no-ellipsoidal-height']
+    argv += ['--no-fill-in-glo-30', '--quiet']
+    assert main(argv) == 1
+    summary, err = capsys.readouterr()
+    assert 'failed (NoDEMCoverage' in summary
+    assert '2 jobs (1 failed)' in summary
+    assert (tmp_path / 'aoi_0.tif').exists()
+    # No progress bars are drawn
+    assert 'Stitching glo_30 blocks' not in err
+
+
+def test_cli_arguments(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit):
+        main(['--bounds', '-118.04', '33.96', '-117.99'])
+    with pytest.raises(SystemExit):
+        main(['--bounds', '-118.04', '33.96', '-117.99', '34.02', '--manifest', 'aois.csv'])
+    with pytest.raises(SystemExit):
+        main(['--manifest', str(tmp_path / 'aois.csv'), '--output', 'dem.tif'])
+    with pytest.raises(SystemExit):
+        main(['--manifest', str(tmp_path / 'missing.csv')])
+    # A short row of a CSV manifest is reported as an argument error
+    (tmp_path / 'short.csv').write_text('xmin,ymin,xmax,ymax\n-118.04,33.96\n')
+    with pytest.raises(SystemExit):
+        main(['--manifest', str(tmp_path / 'short.csv')])
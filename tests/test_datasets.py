@@ -1,8 +1,20 @@
 import warnings
 
+import numpy as np
 import pytest
+from numpy.testing import assert_array_equal
+from shapely.geometry import box
 
-from dem_stitcher.datasets import get_overlapping_dem_tiles
+from dem_stitcher.datasets import (
+    DATASETS,
+    _get_tile_grid,
+    _query_tile_grid,
+    _query_tile_tree,
+    get_global_dem_tile_extents,
+    get_overlapping_dem_tile_urls,
+    get_overlapping_dem_tiles,
+)
+from dem_stitcher.dateline import get_dateline_crossing
 
 
 extents = [
@@ -30,3 +42,71 @@ def test_dateline_warning() -> None:
     extent_with_dateline = [-181, 51.25, -179, 51.75]
     with pytest.warns(UserWarning):
         get_overlapping_dem_tiles(extent_with_dateline, 'glo_30')
+
+
+def _get_overlapping_tile_ids_brute_force(bounds: list[float], dem_name: str) -> list[str]:
+    """Intersect every tile in the catalog with the bounds and keep overlaps that are Polygons."""
+    df_tiles_all = get_global_dem_tile_extents(dem_name)
+    box_geo = box(*bounds)
+    crossing = get_dateline_crossing(bounds)
+    geometries = [df_tiles_all.geometry]
+    if crossing:
+        geometries.append(df_tiles_all.geometry.translate(xoff=2 * crossing))
+    tile_ids = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        for geometry in geometries:
+            intersections = geometry.intersection(box_geo)
+            is_polygon = (intersections.geom_type == 'Polygon') & ~intersections.is_empty
+            tile_ids += df_tiles_all.tile_id[is_polygon].tolist()
+    return sorted(tile_ids)
+
+
+rng = np.random.default_rng(1)
+random_bounds = [
+    [x, y, x + w, y + h]
+    for (x, y, w, h) in zip(
+        rng.uniform(-180.5, 179.5, 10).round(1),
+        rng.uniform(-89, 87, 10).round(1),
+        rng.choice([0.1, 1.0, 2.5], 10),
+        rng.choice([0.1, 1.0, 2.0], 10),
+    )
+]
+# Bounds along tile edges overlap neighboring tiles only in LineStrings or Points
+edge_bounds = [[44.0, 38.0, 46.0, 40.0], [-119.0, 34.0, -118.0, 35.0], [179.0, 51.0, 181.0, 52.0]]
+
+
+@pytest.mark.parametrize('bounds', random_bounds + edge_bounds)
+@pytest.mark.parametrize('dem_name', DATASETS)
+def test_overlapping_tiles_match_brute_force_intersection(bounds: list[float], dem_name: str) -> None:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=UserWarning)
+        df_tiles = get_overlapping_dem_tiles(bounds, dem_name)
+    assert df_tiles.tile_id.tolist() == _get_overlapping_tile_ids_brute_force(bounds, dem_name)
+    assert df_tiles.index.tolist() == list(range(df_tiles.shape[0]))
+    if not df_tiles.empty:
+        assert df_tiles.intersection(box(*bounds)).area.min() > 0
+
+
+@pytest.mark.parametrize('dem_name', DATASETS)
+def test_closed_form_lookup_matches_spatial_index(dem_name: str) -> None:
+    """All bundled catalogs are regular 1 x 1 degree grids and resolve tiles without geometry predicates."""
+    grid = _get_tile_grid(dem_name)
+    assert grid is not None
+
+    rng = np.random.default_rng(2)
+    xs, ys = rng.uniform(-181, 180, 200), rng.uniform(-90, 88, 200)
+    ws, hs = rng.choice([0.0, 0.25, 1.0, 3.0], 200), rng.choice([0.0, 0.5, 1.0, 2.0], 200)
+    # Snap half of the corners to tile edges
+    xs[::2], ys[::2] = np.round(xs[::2]), np.round(ys[::2])
+    for bounds in zip(xs, ys, xs + ws, ys + hs):
+        assert_array_equal(_query_tile_grid(grid, list(bounds)), _query_tile_tree(dem_name, list(bounds)))
+
+
+@pytest.mark.parametrize('bounds', edge_bounds + [[-181, 51.25, -179, 51.75], [-46, 22, -45, 23]])
+def test_overlapping_tile_urls(bounds: list[float]) -> None:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=UserWarning)
+        df_tiles = get_overlapping_dem_tiles(bounds, 'glo_30')
+        urls = get_overlapping_dem_tile_urls(bounds, 'glo_30')
+    assert urls == df_tiles.url.tolist()
@@ -0,0 +1,84 @@
+import tracemalloc
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.io import MemoryFile
+
+from dem_stitcher.dem_readers import read_dem_bytes, read_nasadem, read_srtm
+
+
+HGT_SIZE = 1201
+
+
+@pytest.fixture
+def hgt_zips(tmp_path: Path) -> tuple[np.ndarray, Path, Path]:
+    """Synthetic SRTM v3 and NASADEM zips of the same 3 arcsecond tile (big endian int16 with -32768 voids)."""
+    rng = np.random.default_rng(0)
+    heights = rng.integers(-100, 4_000, size=(HGT_SIZE, HGT_SIZE), dtype=np.int16)
+    heights[:10, :10] = -32768
+    srtm_zip = tmp_path / 'N34W119.SRTMGL3.hgt.zip'
+    with zipfile.ZipFile(srtm_zip, 'w', compression=zipfile.ZIP_DEFLATED) as zip_ob:
+        zip_ob.writestr('N34W119.hgt', heights.astype('>i2').tobytes())
+    nasadem_zip = tmp_path / 'NASADEM_HGT_n34w119.zip'
+    with zipfile.ZipFile(nasadem_zip, 'w', compression=zipfile.ZIP_DEFLATED) as zip_ob:
+        zip_ob.writestr('n34w119.num', b'')
+        zip_ob.writestr('n34w119.hgt', heights.astype('>i2').tobytes())
+    return heights, srtm_zip, nasadem_zip
+
+
+def _read_srtm_in_memory(zip_path: Path, filename: str) -> tuple[np.ndarray, dict]:
+    """Read the tile as `read_srtm` did previously, decoding the `.hgt` from bytes held in memory."""
+    img_bytes = read_dem_bytes(str(zip_path), suffix='.hgt')
+    with MemoryFile(img_bytes, filename=filename) as memfile:
+        with memfile.open() as dataset:
+            return dataset.read().astype(np.float32), dataset.profile
+
+
+def test_read_zipped_hgt(hgt_zips: tuple[np.ndarray, Path, Path]) -> None:
+    heights, srtm_zip, nasadem_zip = hgt_zips
+    for reader, zip_path, filename in [
+        (read_srtm, srtm_zip, 'N34W119.SRTMGL3.hgt'),
+        (read_nasadem, nasadem_zip, 'n34w119.hgt'),
+    ]:
+        dem_arr, dem_profile = reader(str(zip_path))
+        assert dem_arr.dtype == np.float32
+        assert dem_arr.shape == (1, HGT_SIZE, HGT_SIZE)
+        np.testing.assert_array_equal(dem_arr[0], heights.astype(np.float32))
+        assert dem_profile['nodata'] == -32768
+        assert dem_profile['transform'] == rasterio.Affine(1 / 1200, 0, -119 - 1 / 2400, 0, -1 / 1200, 35 + 1 / 2400)
+
+        dem_arr_expected, dem_profile_expected = _read_srtm_in_memory(zip_path, filename)
+        np.testing.assert_array_equal(dem_arr, dem_arr_expected)
+        assert dem_profile == dem_profile_expected
+
+
+def test_remote_zip_is_streamed(mocker: MagicMock, hgt_zips: tuple[np.ndarray, Path, Path]) -> None:
+    heights, srtm_zip, _ = hgt_zips
+
+    def iter_content(chunk_size: int) -> Iterator[bytes]:
+        with srtm_zip.open('rb') as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
+    resp = MagicMock()
+    resp.__enter__.return_value = resp
+    resp.iter_content.side_effect = iter_content
+    session = mocker.patch('dem_stitcher.dem_readers.get_session')
+    session.return_value.get.return_value = resp
+
+    url = f'https://e4ftl01.cr.usgs.gov/MEASURES/SRTMGL3.003/2000.02.11/{srtm_zip.name}'
+    tracemalloc.start()
+    dem_arr, _ = read_srtm(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    session.return_value.get.assert_called_once_with(url, stream=True)
+    np.testing.assert_array_equal(dem_arr[0], heights.astype(np.float32))
+    # Neither the zip nor the int16 heights (2.9 MB) are held in memory alongside the float32 array, only a couple
+    # of download chunks (1 MB)
+    assert peak < dem_arr.nbytes + 2 * 2**20
@@ -7,9 +7,9 @@ import pytest
 import rasterio
 from numpy.testing import assert_allclose, assert_array_equal
 from rasterio.crs import CRS
-from rasterio.transform import array_bounds
+from rasterio.transform import array_bounds, from_origin
 
-from dem_stitcher.geoid import get_geoid_path, read_geoid, remove_geoid
+from dem_stitcher.geoid import _add_separable_geoid_offset, get_geoid_path, read_geoid, remove_geoid, sample_geoid
 from dem_stitcher.rio_tools import reproject_arr_to_match_profile, translate_profile
 
 
@@ -183,3 +183,90 @@ def test_warning_with_geoid_not_covering_dateline() -> None:
 
         for warning in caught_warnings:
             assert 'Geoid file does not cover the dateline. May have np.nan' not in str(warning.message)
+
+
+def _get_dem_profile(res: float, lon: float = -118.0013, lat: float = 35.0021, size: int = 40) -> dict:
+    return {
+        'driver': 'GTiff',
+        'dtype': 'float32',
+        'nodata': np.nan,
+        'count': 1,
+        'width': size,
+        'height': size,
+        'crs': CRS.from_epsg(4326),
+        'transform': from_origin(lon, lat, res, res),
+    }
+
+
+@pytest.mark.parametrize('resampling', ['bilinear', 'cubic'])
+@pytest.mark.parametrize('dem_res', [1 / 3600, 0.01, 0.25])
+def test_separable_geoid_interpolation_matches_gdal(
+    resampling: str, dem_res: float, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """egm_96 (0.25 degrees in EPSG:4326) is interpolated with numpy and matches gdal within float32 rounding."""
+    geoid_path = get_geoid_path('egm_96')
+    p_dem = _get_dem_profile(dem_res)
+    extent = array_bounds(p_dem['height'], p_dem['width'], p_dem['transform'])
+    X_geoid, p_geoid = read_geoid(geoid_path, extent=list(extent), res_buffer=2)
+    X_expected, _ = reproject_arr_to_match_profile(X_geoid, p_geoid, p_dem, resampling=resampling)
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError('The geoid should not be warped with gdal')
+
+    monkeypatch.setattr('dem_stitcher.geoid.reproject_arr_to_match_profile', fail)
+    Y = np.linspace(-10, 10, 40 * 40, dtype=np.float32).reshape(40, 40)
+    X = remove_geoid(Y, p_dem, geoid_path, resampling=resampling)
+    assert X.shape == (1, 40, 40)
+    assert_allclose(X, Y + X_expected, atol=1e-5, rtol=0)
+    assert_allclose(sample_geoid(p_dem, geoid_path, resampling=resampling), X_expected, atol=1e-5, rtol=0)
+
+
+def test_separable_geoid_interpolation_declines() -> None:
+    """The grids the separable interpolation does not support are left to gdal."""
+    geoid_path = get_geoid_path('egm_96')
+    p_dem = _get_dem_profile(0.01)
+    extent = array_bounds(p_dem['height'], p_dem['width'], p_dem['transform'])
+    X_geoid, p_geoid = read_geoid(geoid_path, extent=list(extent), res_buffer=2)
+    Y = np.zeros((1, 40, 40), dtype=np.float32)
+
+    assert _add_separable_geoid_offset(Y, p_dem, X_geoid, p_geoid, 'cubic')
+    # DEM coarser than the geoid (gdal widens the kernel)
+    p_coarse = _get_dem_profile(0.5, size=4)
+    X_geoid_coarse, p_geoid_coarse = read_geoid(geoid_path, extent=[-118.1, 33, -115.9, 35.1], res_buffer=4)
+    assert not _add_separable_geoid_offset(np.zeros((1, 4, 4)), p_coarse, X_geoid_coarse, p_geoid_coarse, 'cubic')
+    # Unsupported resampling, other CRS, geoid not covering the kernels of the edges or nodata within the kernels
+    assert not _add_separable_geoid_offset(Y, p_dem, X_geoid, p_geoid, 'lanczos')
+    assert not _add_separable_geoid_offset(Y, {**p_dem, 'crs': CRS.from_epsg(6318)}, X_geoid, p_geoid, 'cubic')
+    assert not _add_separable_geoid_offset(Y, p_dem, X_geoid[:, :3, :3], p_geoid, 'cubic')
+    X_geoid_nodata = X_geoid.copy()
+    X_geoid_nodata[0, 2, 2] = np.nan
+    Y_nodata = np.ones((1, 40, 40), dtype=np.float32)
+    assert not _add_separable_geoid_offset(Y_nodata, p_dem, X_geoid_nodata, p_geoid, 'cubic')
+    assert_array_equal(Y_nodata, 1)
+
+
+def test_remove_geoid_in_place() -> None:
+    geoid_path = get_geoid_path('egm_96')
+    p_dem = _get_dem_profile(0.01)
+    Y = np.ones((1, 40, 40), dtype=np.float32)
+
+    X = remove_geoid(Y, p_dem, geoid_path)
+    assert_array_equal(Y, 1)
+    X_in_place = remove_geoid(Y, p_dem, geoid_path, in_place=True)
+    assert X_in_place is Y
+    assert_array_equal(X_in_place, X)
+
+    with pytest.raises(ValueError, match='floating point'):
+        remove_geoid(np.ones((1, 40, 40), dtype=np.int16), p_dem, geoid_path, in_place=True)
+
+
+@pytest.mark.parametrize('dem_res', [0.01, 0.5])
+def test_remove_geoid_in_blocks(dem_res: float) -> None:
+    """The geoid interpolated separably (0.01) or warped with gdal (0.5) in small blocks is the same as at once."""
+    geoid_path = get_geoid_path('egm_96')
+    p_dem = _get_dem_profile(dem_res, size=40)
+    Y = np.zeros((1, 40, 40), dtype=np.float32)
+
+    X = remove_geoid(Y, p_dem, geoid_path, res_buffer=4)
+    X_blocks = remove_geoid(Y, p_dem, geoid_path, res_buffer=4, max_memory_bytes=4 * 40 * 3)
+    assert_array_equal(X_blocks, X)
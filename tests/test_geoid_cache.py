@@ -0,0 +1,161 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import rasterio
+from numpy.testing import assert_array_equal
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+
+from dem_stitcher.dateline import split_extent_across_dateline
+from dem_stitcher.geoid import get_geoid_path, read_geoid
+from dem_stitcher.geoid_cache import GeoidCache, GeoidCacheStats
+from dem_stitcher.merge import merge_arrays_with_geometadata
+from dem_stitcher.rio_tools import translate_profile
+from dem_stitcher.rio_window import read_raster_from_window
+
+
+@pytest.fixture
+def global_geoid_path(tmp_path: Path) -> Path:
+    """Global 0.25 degree geoid (tiled like a COG) with a pixel of buffer across the dateline and some nodata."""
+    rng = np.random.default_rng(0)
+    arr = rng.normal(size=(722, 1442)).cumsum(axis=1).astype(np.float32)
+    arr[300:305, 600:610] = -9999
+    profile = {
+        'driver': 'GTiff',
+        'dtype': 'float32',
+        'nodata': -9999,
+        'count': 1,
+        'width': 1442,
+        'height': 722,
+        'crs': CRS.from_epsg(4326),
+        'transform': from_origin(-180.25, 90.25, 0.25, 0.25),
+        'tiled': True,
+        'blockxsize': 128,
+        'blockysize': 128,
+    }
+    path = tmp_path / 'geoid.tif'
+    with rasterio.open(path, 'w', **profile) as ds:
+        ds.write(arr, 1)
+    return path
+
+
+def _read_geoid_directly(geoid_path: str | Path, extent: list[float], res_buffer: int = 1) -> tuple:
+    """Read the geoid window as `read_geoid` did before the cache (for extents not crossing the dateline)."""
+    arr, profile = read_raster_from_window(str(geoid_path), extent, res_buffer=res_buffer)
+    arr = arr.astype('float32')
+    arr[profile['nodata'] == arr] = np.nan
+    profile['nodata'] = np.nan
+    return arr, profile
+
+
+extents = [
+    [-118.8, 34.6, -118.5, 34.8],
+    [-118.6, 34.7, -117.0, 36.1],
+    [-30.3, -14.4, 12.1, 22.0],
+    [-180, -30, -179, -29],
+]
+
+
+def test_bundled_geoid_is_read_once() -> None:
+    cache = GeoidCache()
+    geoid_path = get_geoid_path('egm_96')
+    for extent in extents:
+        arr, profile = read_geoid(geoid_path, extent=extent, geoid_cache=cache)
+        arr_direct, profile_direct = _read_geoid_directly(geoid_path, extent)
+        assert_array_equal(arr, arr_direct)
+        assert profile['transform'] == profile_direct['transform']
+        assert (profile['height'], profile['width']) == (profile_direct['height'], profile_direct['width'])
+
+    # The bundled gtx (721 x 1440 float32) is held entirely after the first read
+    assert cache.stats == GeoidCacheStats(hits=3, misses=1, bytes_fetched=721 * 1440 * 4)
+    assert cache.stats.hit_rate == 0.75
+    assert len(cache) == 1
+
+
+def test_blocks_match_direct_reads(global_geoid_path: Path) -> None:
+    cache = GeoidCache(block_size=100, full_read_max_bytes=0)
+    for extent in extents:
+        arr, profile = read_geoid(global_geoid_path, extent=extent, res_buffer=2, geoid_cache=cache)
+        arr_direct, profile_direct = _read_geoid_directly(global_geoid_path, extent, res_buffer=2)
+        assert_array_equal(arr, arr_direct)
+        assert profile == profile_direct
+
+    stats = cache.stats
+    assert stats.misses == len(cache)
+    assert stats.bytes_fetched == cache.size()
+    # The first two extents are within the same block
+    assert stats.hits >= 1
+
+    misses = stats.misses
+    for extent in extents:
+        read_geoid(global_geoid_path, extent=extent, res_buffer=2, geoid_cache=cache)
+    assert cache.stats.misses == misses
+
+
+def test_dateline_reads_share_blocks(global_geoid_path: Path) -> None:
+    cache = GeoidCache(block_size=100, full_read_max_bytes=0)
+    extent = [179.5, 50.1, 180.5, 51.1]
+    arr, profile = read_geoid(global_geoid_path, extent=extent, geoid_cache=cache)
+
+    (arr_l, p_l), (arr_r, p_r) = [
+        _read_geoid_directly(global_geoid_path, extent_half) for extent_half in split_extent_across_dateline(extent)
+    ]
+    # The extent crosses the dateline at 180, so the left (west of -180) half is translated
+    p_l = translate_profile(p_l, 360 / p_l['transform'].a, 0)
+    arr_expected, profile_expected = merge_arrays_with_geometadata([arr_l, arr_r], [p_l, p_r])
+    assert_array_equal(arr, arr_expected)
+    assert profile['transform'] == profile_expected['transform']
+
+    # Both halves of the extent (on either side of the dateline) are served from the cache
+    misses = cache.stats.misses
+    read_geoid(global_geoid_path, extent=[-180.5, 50.1, -179.5, 51.1], geoid_cache=cache)
+    assert cache.stats.misses == misses
+
+
+def test_lru_eviction(global_geoid_path: Path) -> None:
+    block_bytes = 100 * 100 * 4
+    cache = GeoidCache(max_bytes=2 * block_bytes, block_size=100, full_read_max_bytes=0)
+    # Each extent is within one block
+    extent_a, extent_b, extent_c = [[x + 1, 1, x + 3, 3] for x in [0, 25, 50]]
+    for extent in [extent_a, extent_b, extent_a, extent_c]:
+        read_geoid(global_geoid_path, extent=extent, res_buffer=0, geoid_cache=cache)
+
+    assert cache.stats == GeoidCacheStats(hits=1, misses=3, bytes_fetched=3 * block_bytes, evictions=1)
+    assert cache.size() == 2 * block_bytes
+    # b was the least recently used
+    read_geoid(global_geoid_path, extent=extent_a, res_buffer=0, geoid_cache=cache)
+    assert cache.stats.misses == 3
+    read_geoid(global_geoid_path, extent=extent_b, res_buffer=0, geoid_cache=cache)
+    assert cache.stats.misses == 4
+
+
+def test_blocks_persisted_to_cache_dir(global_geoid_path: Path, tmp_path: Path) -> None:
+    extent = extents[2]
+    cache = GeoidCache(cache_dir=tmp_path / 'geoid_cache', block_size=100, full_read_max_bytes=0)
+    arr, _ = read_geoid(global_geoid_path, extent=extent, geoid_cache=cache)
+    n_blocks = cache.stats.misses
+    assert len(list((tmp_path / 'geoid_cache').glob('**/*.npy'))) == n_blocks
+
+    # Another process (i.e. cache) loads the blocks from disk instead of reading the geoid
+    cache_2 = GeoidCache(cache_dir=tmp_path / 'geoid_cache', block_size=100, full_read_max_bytes=0)
+    arr_2, _ = read_geoid(global_geoid_path, extent=extent, geoid_cache=cache_2)
+    assert_array_equal(arr_2, arr)
+    assert cache_2.stats == GeoidCacheStats(disk_hits=n_blocks)
+    assert cache_2.stats.hit_rate == 1
+
+
+def test_cached_arrays_are_not_modified_by_callers() -> None:
+    cache = GeoidCache()
+    geoid_path = get_geoid_path('egm_96')
+    arr, _ = cache.read_window(geoid_path)
+    arr[:] = 0
+    arr_2, _ = cache.read_window(geoid_path)
+    assert np.any(arr_2 != 0)
+
+
+def test_bad_geoid_cache_arguments() -> None:
+    with pytest.raises(ValueError):
+        GeoidCache(max_bytes=-1)
+    with pytest.raises(ValueError):
+        GeoidCache(block_size=0)
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _get_import_times(statement: str) -> dict[str, int]:
+    """Run `statement` in a fresh interpreter with `-X importtime`; returns cumulative import time (us) per module."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True, check=True
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line.split('|')
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+@pytest.mark.parametrize(
+    'statement, deferred_modules',
+    [
+        ('import dem_stitcher', ['geopandas', 'pandas', 'pyarrow', 'requests', 'rasterio', 'shapely', 'pyproj']),
+        ('from dem_stitcher import stitch_dem', ['geopandas', 'pandas', 'pyarrow', 'requests', 'tqdm']),
+        ('import dem_stitcher.geojson_io', ['geopandas', 'pandas', 'rasterio']),
+        ('import dem_stitcher.cli', ['geopandas', 'pandas', 'rasterio', 'shapely']),
+        ('import dem_stitcher.progress', ['rasterio', 'tqdm']),
+    ],
+)
+def test_heavy_dependencies_are_deferred(statement: str, deferred_modules: list[str]) -> None:
+    import_times = _get_import_times(statement)
+    assert 'dem_stitcher' in import_times
+    imported = [module for module in deferred_modules if module in import_times]
+    assert not imported, f'`{statement}` imported {imported}; package import took {import_times["dem_stitcher"]} us'
+
+
+def test_lazy_public_api() -> None:
+    import dem_stitcher
+    from dem_stitcher.stitcher import stitch_dem
+
+    assert dem_stitcher.stitch_dem is stitch_dem
+    assert set(dem_stitcher.__all__) <= set(dir(dem_stitcher))
+    with pytest.raises(AttributeError):
+        dem_stitcher.foo
@@ -0,0 +1,80 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+import rasterio
+from numpy.testing import assert_array_equal
+
+from dem_stitcher import StageTimings, stitch_dem
+from dem_stitcher.instrumentation import StageEvent, record_stage
+from dem_stitcher.stitcher import merge_and_transform_dem_tiles
+
+
+BOUNDS_LA = [-118.05, 33.95, -117.95, 34.05]
+
+
+def test_stitch_dem_stages(
+    test_data_dir: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', return_value=tile_paths)
+    # The same tiles fill glo_30 as glo_90, so the DEMs are merged
+    stitch_kwargs = {
+        'geoid_path': str(test_data_dir / 'golden_datasets' / 'egm_08_los_angeles.tif'),
+        'dst_resolution': 0.0005,
+        'fill_dem_names': ['glo_90'],
+    }
+    timings = StageTimings()
+    X, p = stitch_dem(BOUNDS_LA, 'glo_30', on_stage=timings, **stitch_kwargs)
+    X_expected, _ = stitch_dem(BOUNDS_LA, 'glo_30', **stitch_kwargs)
+    assert_array_equal(X, X_expected)
+
+    report = timings.report()
+    assert list(report) == ['lookup', 'open', 'geoid_fetch', 'read', 'merge', 'geoid', 'resample']
+    assert report['lookup']['count'] == report['read']['count'] == 2
+    assert report['lookup']['n_tiles'] == report['open']['n_tiles'] == report['read']['n_tiles'] == 8
+    assert report['read']['bytes_read'] > 0
+    assert all(totals['seconds'] >= 0 for totals in report.values())
+
+    events = {event.stage: event for event in timings.events}
+    assert {event.dem_name for event in timings.events if event.stage == 'read'} == {'glo_30', 'glo_90'}
+    assert events['geoid'].shape == events['merge'].shape
+    assert events['resample'].shape == (1, p['height'], p['width'])
+    assert all(stage in timings.summary() for stage in report)
+
+
+def test_merge_and_transform_dem_tiles_stages(
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    datasets = [rasterio.open(path) for path in tile_paths]
+    events = []
+    X, _ = merge_and_transform_dem_tiles(
+        datasets, BOUNDS_LA, 'glo_30', dst_ellipsoidal_height=False, on_stage=events.append
+    )
+    list(map(lambda dataset: dataset.close(), datasets))
+    assert [event.stage for event in events] == ['read', 'resample']
+    assert events[0].n_tiles == 4
+    assert events[1].shape == (1, *X.shape[-2:])
+
+
+def test_stage_timings_report() -> None:
+    timings = StageTimings()
+    timings(StageEvent('read', 1.0, dem_name='glo_30', n_tiles=2, bytes_read=10))
+    timings(StageEvent('custom', 0.5))
+    timings(StageEvent('read', 2.0, dem_name='glo_90', n_tiles=1, bytes_read=5))
+    timings(StageEvent('lookup', 0.25, n_tiles=3))
+    assert timings.report() == {
+        'lookup': {'count': 1, 'seconds': 0.25, 'n_tiles': 3, 'bytes_read': 0},
+        'read': {'count': 2, 'seconds': 3.0, 'n_tiles': 3, 'bytes_read': 15},
+        'custom': {'count': 1, 'seconds': 0.5, 'n_tiles': 0, 'bytes_read': 0},
+    }
+
+    # Nothing is recorded without a callback or when the stage raises
+    with record_stage(None, 'read', n_tiles=1) as fields:
+        fields.update(shape=(1, 2, 2))
+    with pytest.raises(ValueError), record_stage(timings, 'geoid'):
+        raise ValueError
+    assert len(timings.events) == 4
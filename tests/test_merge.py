@@ -1,16 +1,26 @@
+import math
+import tracemalloc
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import numpy as np
 import pytest
 import rasterio
 from affine import Affine
-from numpy.testing import assert_array_equal
+from numpy.testing import assert_allclose, assert_array_equal
 from rasterio.crs import CRS
+from rasterio.enums import Resampling
 from rasterio.io import MemoryFile
+from rasterio.merge import merge
 from rasterio.transform import from_origin
 
-from dem_stitcher.merge import merge_arrays_with_geometadata, merge_tile_datasets_within_extent
-from dem_stitcher.rio_tools import GEOMETADATA_KEYS
+from dem_stitcher.merge import (
+    _plan_tile_windows,
+    get_merged_profile_within_extent,
+    merge_arrays_with_geometadata,
+    merge_tile_datasets_within_extent,
+)
+from dem_stitcher.rio_tools import GEOMETADATA_KEYS, in_memory_profile
 
 
 # from dem_stitcher.datasets import DATASETS
@@ -177,19 +187,20 @@ def test_merge_in_memory_datasets_drop_creation_options(monkeypatch: pytest.Monk
     """Creation options from a source COG must not reach the in-memory datasets that `merge` reads back.
 
     `compress` puts GDAL into multi-threaded compression, which returns nodata to those read backs when
-    `GDAL_NUM_THREADS` is large. Aligned grids normally take the numpy fast path and never open a
-    MemoryFile, so the fallback is forced here to keep the guard covered.
+    `GDAL_NUM_THREADS` is large. Aligned grids normally take the numpy fast paths and never open an in-memory
+    dataset, so the fallback is forced here to keep the guard covered.
     See: https://github.com/ACCESS-Cloud-Based-InSAR/dem-stitcher/issues/157
     """
     monkeypatch.setattr('dem_stitcher.merge._merge_aligned_arrays', lambda *args: None)
+    monkeypatch.setattr('dem_stitcher.merge._merge_row_aligned_arrays', lambda *args: None)
     open_kwargs = []
-    memory_file_open = MemoryFile.open
+    rasterio_open = rasterio.open
 
-    def record_open(self: MemoryFile, **kwargs: dict) -> rasterio.DatasetReader:
+    def record_open(*args: object, **kwargs: dict) -> rasterio.io.DatasetWriter:
         open_kwargs.append(kwargs)
-        return memory_file_open(self, **kwargs)
+        return rasterio_open(*args, **kwargs)
 
-    monkeypatch.setattr(MemoryFile, 'open', record_open)
+    monkeypatch.setattr('dem_stitcher.merge.rasterio.open', record_open)
 
     size = 8
     cog_profile = {
@@ -214,6 +225,8 @@ def test_merge_in_memory_datasets_drop_creation_options(monkeypatch: pytest.Monk
 
     assert len(open_kwargs) == 2
     assert all(set(kwargs) <= set(GEOMETADATA_KEYS) for kwargs in open_kwargs)
+    # The arrays are held by gdal's MEM driver rather than encoded into in-memory GTiffs
+    assert all(kwargs['driver'] == 'MEM' for kwargs in open_kwargs)
     assert_array_equal(merged_array[0, :, :size], arrays[0])
     assert_array_equal(merged_array[0, :, size:], arrays[1])
     # The returned profile still describes how the merged array should be written
@@ -250,12 +263,13 @@ def _random_aligned_inputs(nodata: float, seed: int = 42) -> tuple[list[np.ndarr
 def test_aligned_numpy_merge_matches_rasterio_merge(
     method: str, nodata: float, monkeypatch: pytest.MonkeyPatch
 ) -> None:
-    """The numpy fast path for pixel-aligned grids must be bit-identical to the MemoryFile + rasterio.merge path."""
+    """The numpy fast path for pixel-aligned grids must be bit-identical to the rasterio.merge fallback."""
     arrays, profiles = _random_aligned_inputs(nodata)
 
     arr_fast, prof_fast = merge_arrays_with_geometadata(arrays, profiles, method=method)
 
     monkeypatch.setattr('dem_stitcher.merge._merge_aligned_arrays', lambda *args: None)
+    monkeypatch.setattr('dem_stitcher.merge._merge_row_aligned_arrays', lambda *args: None)
     arr_slow, prof_slow = merge_arrays_with_geometadata(arrays, profiles, method=method)
 
     assert_array_equal(arr_fast, arr_slow)
@@ -264,6 +278,35 @@ def test_aligned_numpy_merge_matches_rasterio_merge(
     assert np.isnan(nodata) and np.isnan(prof_fast['nodata']) or prof_fast['nodata'] == prof_slow['nodata']
 
 
+def _merge_with_gtiff_memory_files(arrays: list[np.ndarray], profiles: list[dict], **merge_kwargs: object) -> tuple:
+    """Merge as `merge_arrays_with_geometadata` did previously, through in-memory GTiffs."""
+    memfiles = [MemoryFile() for _ in profiles]
+    datasets = [mfile.open(**in_memory_profile(p)) for (mfile, p) in zip(memfiles, profiles)]
+    [ds.write(arr) for (ds, arr) in zip(datasets, arrays)]
+    merged = merge(datasets, **merge_kwargs)
+    [ds.close() for ds in datasets]
+    [mfile.close() for mfile in memfiles]
+    return merged
+
+
+@pytest.mark.parametrize('resampling', ['nearest', 'bilinear'])
+def test_mem_datasets_merge_matches_gtiff_memory_files(test_data_dir: Path, resampling: str) -> None:
+    """The fallback for unaligned grids (e.g. `glo_30` and `glo_90`) gives the same result as in-memory GTiffs."""
+    arrays, profiles = [], []
+    for name in ['glo_30_left', 'glo_90_right']:
+        with rasterio.open(test_data_dir / 'missing' / f'{name}.tif') as ds:
+            arrays.append(ds.read())
+            profiles.append(ds.profile)
+
+    arr, prof = merge_arrays_with_geometadata(arrays, profiles, resampling=resampling)
+    arr_gtiff, transform_gtiff = _merge_with_gtiff_memory_files(
+        arrays, profiles, resampling=Resampling[resampling], nodata=np.nan, dtype='float32'
+    )
+
+    assert_array_equal(arr, arr_gtiff)
+    assert prof['transform'] == transform_gtiff
+
+
 def test_numpy_merge_declines_unaligned_grids() -> None:
     from dem_stitcher.merge import _merge_aligned_arrays
 
@@ -281,3 +324,284 @@ def test_numpy_merge_declines_unaligned_grids() -> None:
 
     profiles_other_crs = [profiles[0], {**profiles[1], 'crs': CRS.from_epsg(4269)}]
     assert _merge_aligned_arrays(arrays[:2], profiles_other_crs, np.nan, np.float32, 'first') is None
+
+
+def _copernicus_band_inputs() -> tuple[list[np.ndarray], list[dict], Affine]:
+    """Tiles on either side of a latitude band boundary with 24 and 16 pixels per degree in longitude.
+
+    Like Copernicus tiles, the origins are half a pixel west of the integer longitudes, so columns are not aligned
+    across bands. Heights are linear in longitude. Returns the arrays, profiles and transform of the merged grid.
+    """
+    y_res = 1 / 40
+    arrays, profiles = [], []
+    for lat, x_res in [(59, 1 / 24), (60, 1 / 16)]:
+        for lon in [10, 11]:
+            width = round(1 / x_res)
+            x = lon - x_res / 2 + (np.arange(width) + 0.5) * x_res
+            array = np.broadcast_to(100 * x + 3, (40, width)).astype(np.float32)
+            arrays.append(array)
+            profiles.append(
+                {
+                    'driver': 'GTiff',
+                    'dtype': np.float32,
+                    'count': 1,
+                    'height': 40,
+                    'width': width,
+                    'crs': CRS.from_epsg(4326),
+                    'transform': Affine(x_res, 0, lon - x_res / 2, 0, -y_res, lat + 1 + y_res / 2),
+                    'nodata': np.nan,
+                }
+            )
+    arrays[0][5:9, 3:7] = np.nan
+    # The union of the tiles at the resolution of the first
+    transform = Affine(1 / 24, 0, 10 - 1 / 32, 0, -y_res, 61 + y_res / 2)
+    return arrays, profiles, transform
+
+
+def _sample_first_tile(arrays: list[np.ndarray], profiles: list[dict], profile: dict) -> np.ndarray:
+    """Sample the pixel of the first tile containing each pixel center of the grid in `profile`."""
+    sampled = np.full((profile['height'], profile['width']), np.nan, dtype=np.float32)
+    for row in range(profile['height']):
+        for col in range(profile['width']):
+            x, y = profile['transform'] * (col + 0.5, row + 0.5)
+            for array, p in zip(arrays, profiles):
+                tile_col, tile_row = map(math.floor, ~p['transform'] * (x, y))
+                if (0 <= tile_row < p['height']) and (0 <= tile_col < p['width']):
+                    if not np.isnan(array[tile_row, tile_col]):
+                        sampled[row, col] = array[tile_row, tile_col]
+                        break
+    return sampled
+
+
+def test_row_aligned_numpy_merge(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tiles sharing rows but not column spacing are resampled along x with numpy instead of `rasterio.merge`."""
+    arrays, profiles, transform = _copernicus_band_inputs()
+    monkeypatch.setattr(
+        'dem_stitcher.merge._merge_in_memory_datasets', MagicMock(side_effect=AssertionError('rasterio.merge used'))
+    )
+    arr_nearest, prof_nearest = merge_arrays_with_geometadata(arrays, profiles, resampling='nearest')
+    arr_bilinear, _ = merge_arrays_with_geometadata(arrays, profiles, resampling='bilinear')
+    arr_max, _ = merge_arrays_with_geometadata(arrays, profiles, resampling='nearest', method='max')
+    monkeypatch.undo()
+
+    # Same grid as `rasterio.merge`
+    monkeypatch.setattr('dem_stitcher.merge._merge_row_aligned_arrays', lambda *args: None)
+    _, prof_slow = merge_arrays_with_geometadata(arrays, profiles, resampling='nearest')
+    assert prof_nearest['transform'] == prof_slow['transform'] == transform
+    assert (prof_nearest['height'], prof_nearest['width']) == (prof_slow['height'], prof_slow['width']) == (80, 48)
+
+    # `rasterio.merge` snaps each tile to whole pixels of the grid; numpy samples the tiles at the pixel centers
+    assert_array_equal(arr_nearest[0], _sample_first_tile(arrays, profiles, prof_nearest))
+    # The tiles do not overlap
+    assert_array_equal(arr_max, arr_nearest)
+
+    # Bilinear interpolation along x is exact for heights linear in longitude away from nodata and the edges
+    x = transform.c + (np.arange(prof_nearest['width']) + 0.5) * transform.a
+    expected = np.broadcast_to(100 * x + 3, (80, prof_nearest['width']))
+    interior = np.ones(expected.shape, dtype=bool)
+    interior[:, [0, 1, 23, 24, 25, -2, -1]] = False
+    interior[44:50, :] = False
+    assert_allclose(arr_bilinear[0][interior], expected[interior], atol=1e-3)
+
+
+def test_row_aligned_merge_declines_other_grids() -> None:
+    from dem_stitcher.merge import _merge_row_aligned_arrays
+
+    arrays, profiles, _ = _copernicus_band_inputs()
+    arrays = [arr[np.newaxis, ...] for arr in arrays]
+    assert _merge_row_aligned_arrays(arrays, profiles, np.nan, np.float32, 'first', 'nearest') is not None
+    assert _merge_row_aligned_arrays(arrays, profiles, np.nan, np.float32, 'first', 'cubic') is None
+
+    t = profiles[1]['transform']
+    for transform in [
+        Affine(t.a, 0, t.c, 0, t.e, t.f + 0.5 * t.e),  # sub-pixel row offset
+        Affine(t.a, 0, t.c, 0, t.e / 2, t.f),  # different y resolution
+    ]:
+        profiles_unaligned = [profiles[0], {**profiles[1], 'transform': transform}]
+        assert _merge_row_aligned_arrays(arrays[:2], profiles_unaligned, np.nan, np.float32, 'first', 'nearest') is None
+
+
+def test_merge_tiles_across_latitude_bands(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    arrays, profiles, _ = _copernicus_band_inputs()
+    paths = []
+    for i, (array, profile) in enumerate(zip(arrays, profiles)):
+        paths.append(str(tmp_path / f'tile_{i}.tif'))
+        with rasterio.open(paths[-1], 'w', **profile) as ds:
+            ds.write(array, 1)
+
+    extent = [10.2, 59.3, 11.7, 60.8]
+    monkeypatch.setattr(
+        'dem_stitcher.merge._merge_in_memory_datasets', MagicMock(side_effect=AssertionError('rasterio.merge used'))
+    )
+    X, p = merge_tile_datasets_within_extent(paths, extent)
+    assert p['transform'].a == profiles[0]['transform'].a
+
+    # Only the windows of the tiles containing the extent are merged
+    _, windows, _, _, profiles_window = _plan_tile_windows(profiles, extent)
+    arrays_window = [array[window.toslices()] for (array, window) in zip(arrays, windows)]
+    assert_array_equal(X[0], _sample_first_tile(arrays_window, profiles_window, p))
+
+
+def _write_one_degree_tiles(tile_dir: Path, size: int, overview_factors: list[int]) -> tuple[list[Path], np.ndarray]:
+    """Write a 2 x 2 grid of 1 degree tiles (rows of tiles from north to south) with pixel-center registration."""
+    rng = np.random.default_rng(0)
+    mosaic = rng.normal(size=(2 * size, 2 * size)).cumsum(axis=0).cumsum(axis=1).astype(np.float32)
+    paths = []
+    for i, lat in enumerate([1, 0]):
+        for j, lon in enumerate([10, 11]):
+            path = tile_dir / f'tile_{lat}_{lon}.tif'
+            profile = {
+                'driver': 'GTiff',
+                'dtype': 'float32',
+                'nodata': np.nan,
+                'count': 1,
+                'width': size,
+                'height': size,
+                'crs': CRS.from_epsg(4326),
+                'transform': from_origin(lon, lat + 1, 1 / size, 1 / size),
+                'tiled': True,
+                'blockxsize': 64,
+                'blockysize': 64,
+            }
+            with rasterio.open(path, 'w', **profile) as ds:
+                ds.write(mosaic[i * size : (i + 1) * size, j * size : (j + 1) * size], 1)
+                if overview_factors:
+                    ds.build_overviews(overview_factors, rasterio.enums.Resampling.average)
+            paths.append(path)
+    return paths, mosaic
+
+
+def test_decimated_reads_average_whole_blocks(tmp_path: Path) -> None:
+    size = 360
+    paths, mosaic = _write_one_degree_tiles(tmp_path, size, [])
+    extent = [10.3, 0.6, 11.4, 1.55]
+    _, p_full = merge_tile_datasets_within_extent(list(map(str, paths)), extent)
+    t_full = p_full['transform']
+    row_start_full, col_start_full = round((2 - t_full.f) * size), round((t_full.c - 10) * size)
+    row_stop_full, col_stop_full = row_start_full + p_full['height'], col_start_full + p_full['width']
+
+    # 3 x coarser divides the tiles (and 2.9 x is rounded down to 2)
+    for res, decimation in [(3 / size, 3), (2.9 / size, 2)]:
+        read_stats = {}
+        X, p = merge_tile_datasets_within_extent(
+            list(map(str, paths)), extent, dtype=np.float32, dst_resolution=res, read_stats=read_stats
+        )
+        # The windows are expanded to whole blocks counted from the tile (and mosaic) origin
+        row_start, col_start = (row_start_full // decimation) * decimation, (col_start_full // decimation) * decimation
+        row_stop = math.ceil(row_stop_full / decimation) * decimation
+        col_stop = math.ceil(col_stop_full / decimation) * decimation
+        assert X.shape == (1, (row_stop - row_start) // decimation, (col_stop - col_start) // decimation)
+        assert p['transform'] == from_origin(
+            10 + col_start / size, 2 - row_start / size, decimation / size, decimation / size
+        )
+        blocks = mosaic[row_start:row_stop, col_start:col_stop]
+        blocks = blocks.reshape(X.shape[1], decimation, X.shape[2], decimation)
+        np.testing.assert_allclose(X[0], blocks.mean(axis=(1, 3)), atol=1e-4)
+
+        assert read_stats['pixels_read'] == X.size
+        # No overviews, so all of the (expanded) windows are decoded
+        assert read_stats['bytes_read'] == 4 * X.size * decimation**2
+        assert read_stats['bytes_full_resolution'] == 4 * p_full['height'] * p_full['width']
+
+
+@pytest.mark.parametrize('extent', [[10.3, 0.6, 11.4, 1.55], [10.5, 0.2, 10.7, 0.4], [9.5, -0.5, 12.5, 2.5]])
+@pytest.mark.parametrize('dst_resolution', [None, 3 / 360, 2.9 / 360])
+def test_merged_profile_from_metadata(tmp_path: Path, extent: list[float], dst_resolution: float | None) -> None:
+    paths, _ = _write_one_degree_tiles(tmp_path, 360, [])
+    profiles = []
+    for path in paths:
+        with rasterio.open(path) as ds:
+            profiles.append(ds.profile)
+
+    X, p = merge_tile_datasets_within_extent(
+        list(map(str, paths)), extent, nodata=0, dtype=np.float32, dst_resolution=dst_resolution
+    )
+    p_metadata = get_merged_profile_within_extent(
+        profiles, extent, nodata=0, dtype=np.float32, dst_resolution=dst_resolution
+    )
+    assert p_metadata == p
+    assert X.shape == (1, p_metadata['height'], p_metadata['width'])
+
+    assert get_merged_profile_within_extent(profiles, [20, 20, 21, 21]) is None
+
+
+def test_decimated_reads_use_overviews(tmp_path: Path) -> None:
+    size = 720
+    paths, _ = _write_one_degree_tiles(tmp_path, size, [2, 4, 8])
+    # Windows of 1152 x 1152 pixels, i.e. 144 x 144 pixels 8 x coarser
+    extent = [10.2001, 0.2001, 11.7999, 1.7999]
+    datasets = [rasterio.open(path) for path in paths]
+
+    read_stats_full, read_stats = {}, {}
+    X_full, _ = merge_tile_datasets_within_extent(datasets, extent, read_stats=read_stats_full)
+    X, p = merge_tile_datasets_within_extent(datasets, extent, dst_resolution=8 / size, read_stats=read_stats)
+    [ds.close() for ds in datasets]
+
+    assert read_stats_full['bytes_read'] == read_stats_full['bytes_full_resolution'] == X_full.nbytes
+    assert read_stats['bytes_full_resolution'] == X_full.nbytes
+    # The 8x overviews are read
+    assert read_stats['bytes_read'] == X.nbytes == X_full.nbytes // 64
+    assert p['transform'].a == 8 / size
+
+
+def _write_buffered_int16_tiles(tile_dir: Path, size: int, buffer: int) -> list[Path]:
+    """Write a 2 x 2 grid of int16 tiles (nodata -32768) overlapping their neighbors by `buffer` pixels (as 3dep)."""
+    rng = np.random.default_rng(1)
+    paths = []
+    for lat in [1, 0]:
+        for lon in [10, 11]:
+            arr = rng.integers(-500, 500, size=(size + 2 * buffer, size + 2 * buffer), dtype=np.int16)
+            arr[rng.random(arr.shape) < 0.1] = -32768
+            path = tile_dir / f'tile_{lat}_{lon}.tif'
+            profile = {
+                'driver': 'GTiff',
+                'dtype': 'int16',
+                'nodata': -32768,
+                'count': 1,
+                'width': arr.shape[1],
+                'height': arr.shape[0],
+                'crs': CRS.from_epsg(4269),
+                'transform': from_origin(lon - buffer / size, lat + 1 + buffer / size, 1 / size, 1 / size),
+            }
+            with rasterio.open(path, 'w', **profile) as ds:
+                ds.write(arr, 1)
+            paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize('buffer', [0, 3])
+@pytest.mark.parametrize('nodata', [np.nan, 0])
+def test_mosaic_read_in_place_matches_merge(tmp_path: Path, buffer: int, nodata: float) -> None:
+    paths = _write_buffered_int16_tiles(tmp_path, 100, buffer)
+    extent = [10.5, 0.5, 11.5, 1.5]
+    X, p = merge_tile_datasets_within_extent(list(map(str, paths)), extent, nodata=nodata, dtype=np.float32)
+
+    # Reference: the whole tiles composited by merge_arrays_with_geometadata, then cropped to the merged grid
+    arrs, profiles = [], []
+    for path in paths:
+        with rasterio.open(path) as ds:
+            arrs.append(ds.read().astype(np.float32))
+            profiles.append(ds.profile)
+    X_ref, p_ref = merge_arrays_with_geometadata(arrs, profiles, nodata=nodata, dtype=np.float32)
+    row_off = round((p_ref['transform'].f - p['transform'].f) / p_ref['transform'].a)
+    col_off = round((p['transform'].c - p_ref['transform'].c) / p_ref['transform'].a)
+    X_ref = X_ref[:, row_off : row_off + p['height'], col_off : col_off + p['width']]
+
+    assert X.dtype == np.float32
+    assert np.isnan(nodata) == np.isnan(p['nodata'])
+    assert_array_equal(X, X_ref)
+    assert (X == -32768).sum() == 0
+
+
+def test_mosaic_is_the_only_copy_of_tile_data(tmp_path: Path) -> None:
+    paths, _ = _write_one_degree_tiles(tmp_path, 720, [])
+    datasets = [rasterio.open(path) for path in paths]
+    extent = [10.1, 0.1, 11.9, 1.9]
+
+    tracemalloc.start()
+    X, _ = merge_tile_datasets_within_extent(datasets, extent, dtype=np.float32)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    [ds.close() for ds in datasets]
+
+    assert peak < 1.1 * X.nbytes
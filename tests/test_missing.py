@@ -1,11 +1,13 @@
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import numpy as np
 import pytest
 import rasterio
 from numpy.testing import assert_almost_equal
 
-from dem_stitcher import stitch_dem
+from dem_stitcher import stitch_dem, stitch_dem_to_file
+from dem_stitcher.exceptions import DEMNotSupported
 from dem_stitcher.merge import merge_arrays_with_geometadata
 from dem_stitcher.stitcher import intersects_missing_glo_30_tiles
 
@@ -50,6 +52,45 @@ def test_merge_glo30_and_glo_90(test_data_dir: Path) -> None:
     assert p_merged_out['transform'] == p_merged['transform']
 
 
+@pytest.mark.parametrize('fill_dem_names', [['glo_90'], ['glo_90_missing'], None])
+def test_fill_dem_names_single_pass(
+    test_data_dir: Path, tmp_path: Path, fill_dem_names: list[str] | None, mocker: MagicMock
+) -> None:
+    data_dir = test_data_dir / 'missing'
+    tile_paths = [[str(data_dir / 'glo_30_left.tif')], [str(data_dir / 'glo_90_right.tif')]]
+    get_dem_tile_paths = mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=tile_paths * 2)
+    # The test tiles are Area tagged copies of the tiles (the real glo tiles are Point tagged)
+    stitch_kwargs = dict(dst_ellipsoidal_height=False, dst_area_or_point='Area', fill_dem_names=fill_dem_names)
+    bounds = [42.95, 40.45, 43.05, 40.55]
+
+    X_filled, p_filled = stitch_dem(bounds, 'glo_30', **stitch_kwargs)
+    p_file = stitch_dem_to_file(bounds, 'glo_30', tmp_path / 'dem.tif', max_block_bytes=2**14, **stitch_kwargs)
+    with rasterio.open(tmp_path / 'dem.tif') as ds:
+        X_file = ds.read(1)
+
+    # The tiles of each DEM are looked up once per call
+    assert [call.kwargs['dem_name'] for call in get_dem_tile_paths.call_args_list] == 2 * [
+        'glo_30',
+        (fill_dem_names or ['glo_90_missing'])[0],
+    ]
+    X_merged, p_merged = _open_one(data_dir / 'glo_merged.tif')
+    assert_almost_equal(X_merged, X_filled, decimal=6)
+    assert p_filled['transform'] == p_merged['transform']
+    assert p_file['transform'] == p_merged['transform']
+    # glo_90 is resampled to the grid of each block rather than to the grid of the mosaic
+    assert_almost_equal(X_merged, X_file, decimal=3)
+
+
+def test_bad_fill_dem_names() -> None:
+    bounds = [42.95, 40.45, 43.05, 40.55]
+    with pytest.raises(DEMNotSupported):
+        stitch_dem(bounds, 'glo_30', fill_dem_names=['glo_100'])
+    with pytest.raises(ValueError, match='fill_dem_names'):
+        stitch_dem(bounds, 'glo_30', fill_dem_names=['glo_30'])
+    with pytest.raises(ValueError, match='fill_dem_names'):
+        stitch_dem_to_file(bounds, 'glo_30', 'dem.tif', fill_dem_names=['glo_90', 'glo_90'])
+
+
 @pytest.mark.integration
 def test_glo_90_filling(test_data_dir: Path) -> None:
     data_dir = test_data_dir / 'missing'
@@ -0,0 +1,111 @@
+import io
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+import rasterio
+from numpy.testing import assert_array_equal
+
+from dem_stitcher import TqdmProgress, stitch_dem, stitch_dem_to_file
+from dem_stitcher.progress import ProgressEvent, track
+from dem_stitcher.stitcher import download_tiles_to_gtiff
+
+
+BOUNDS_LA = [-118.05, 33.95, -117.95, 34.05]
+
+
+def _get_runs(events: list[ProgressEvent]) -> dict[str, list[ProgressEvent]]:
+    """Events of each run of a task, keyed by task (each task is run once here)."""
+    runs = {}
+    for event in events:
+        runs.setdefault(event.task, []).append(event)
+    assert all(len({event.task_id for event in run}) == 1 for run in runs.values())
+    return runs
+
+
+def test_stitch_dem_progress(
+    test_data_dir: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', return_value=tile_paths)
+    geoid_path = str(test_data_dir / 'golden_datasets' / 'egm_08_los_angeles.tif')
+
+    events = []
+    read_stats = {}
+    X, _ = stitch_dem(BOUNDS_LA, 'glo_30', geoid_path=geoid_path, progress=events.append, read_stats=read_stats)
+    runs = _get_runs(events)
+    assert list(runs) == ['open', 'metadata', 'read']
+    for run in runs.values():
+        assert [event.completed for event in run] == list(range(run[0].total + 1))
+    assert runs['open'][0].total == runs['metadata'][0].total == len(tile_paths)
+    assert runs['read'][-1].nbytes == read_stats['bytes_full_resolution']
+    assert capsys.readouterr().err == ''
+
+    # Quiet stitches report nothing and are identical
+    X_quiet, _ = stitch_dem(BOUNDS_LA, 'glo_30', geoid_path=geoid_path, progress=False)
+    assert capsys.readouterr().err == ''
+    assert_array_equal(X, X_quiet)
+
+    # tqdm bars are drawn by default
+    stitch_dem(BOUNDS_LA, 'glo_30', geoid_path=geoid_path)
+    assert 'Reading tile imagery' in capsys.readouterr().err
+
+
+def test_stitch_dem_to_file_progress(
+    tmp_path: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', return_value=tile_paths)
+    events = []
+    profile = stitch_dem_to_file(
+        BOUNDS_LA,
+        'glo_30',
+        tmp_path / 'dem.tif',
+        dst_ellipsoidal_height=False,
+        max_block_bytes=2**20,
+        progress=events.append,
+    )
+    blocks = [event for event in events if event.task == 'blocks']
+    n_blocks = -(-profile['height'] // 256) * -(-profile['width'] // 256)
+    assert n_blocks > 1
+    assert [event.completed for event in blocks] == list(range(n_blocks + 1))
+    # The tiles of each block are planned and read
+    assert len({event.task_id for event in events if event.task == 'read'}) == n_blocks
+
+    stitch_dem_to_file(
+        BOUNDS_LA,
+        'glo_30',
+        tmp_path / 'dem_quiet.tif',
+        dst_ellipsoidal_height=False,
+        max_block_bytes=2**20,
+        progress=False,
+    )
+    with rasterio.open(tmp_path / 'dem.tif') as ds, rasterio.open(tmp_path / 'dem_quiet.tif') as ds_quiet:
+        assert_array_equal(ds.read(), ds_quiet.read())
+
+
+def test_download_tiles_to_gtiff_progress(test_data_dir: Path, tmp_path: Path) -> None:
+    urls = sorted(map(str, (test_data_dir / 'stitcher' / 'merge_tiles').glob('u*.tif')))
+    events = []
+    dest_paths = download_tiles_to_gtiff(urls, 'glo_30', tmp_path, progress=events.append)
+    assert [(event.task, event.completed, event.total) for event in events] == [('download', k, 2) for k in range(3)]
+    assert events[-1].nbytes == sum(Path(path).stat().st_size for path in dest_paths)
+
+
+def test_tqdm_progress() -> None:
+    file = io.StringIO()
+    progress = TqdmProgress(file=file)
+    assert list(track(range(3), progress, 'read', total=3, desc='Reading tile imagery')) == [0, 1, 2]
+    assert 'Reading tile imagery' in file.getvalue()
+    assert '3/3' in file.getvalue()
+    # Bars are closed when their run completes
+    assert not progress._bars
+
+    # Quiet progress returns the iterable itself
+    items = iter(range(3))
+    assert track(items, False, 'read', total=3, desc='Reading tile imagery') is items
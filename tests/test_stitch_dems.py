@@ -0,0 +1,137 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pytest
+import rasterio
+from numpy.testing import assert_array_equal
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+
+from dem_stitcher import iter_stitch_dems, stitch_dem, stitch_dems
+from dem_stitcher.exceptions import NoDEMCoverage
+
+
+# Overlapping extents within the tiles of the golden dataset of Los Angeles
+FRAMES_LA = [[-118.04, 33.96, -117.99, 34.02], [-118.02, 33.98, -117.97, 34.04], [-118.0, 34.0, -117.96, 34.04]]
+
+
+def _spy_opened_tiles(mocker: pytest.MonkeyPatch, tile_paths: list[str]) -> dict[str, list[rasterio.DatasetReader]]:
+    """Record the datasets opened for each tile."""
+    opened = {path: [] for path in tile_paths}
+    rasterio_open = rasterio.open
+
+    def open_and_record(path: str, *args: object, **kwargs: object) -> rasterio.DatasetReader:
+        dataset = rasterio_open(path, *args, **kwargs)
+        if path in opened:
+            opened[path].append(dataset)
+        return dataset
+
+    mocker.patch('dem_stitcher.stitcher.rasterio.open', side_effect=open_and_record)
+    return opened
+
+
+@pytest.mark.parametrize(
+    'stitch_kwargs',
+    [
+        {},
+        {'dst_ellipsoidal_height': False},
+        {'dst_resolution': 0.0005},
+        {'dst_area_or_point': 'Area', 'merge_nodata_value': 0},
+    ],
+)
+def test_stitch_dems_match_stitch_dem(
+    stitch_kwargs: dict,
+    test_data_dir: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', return_value=tile_paths)
+    if stitch_kwargs.get('dst_ellipsoidal_height', True):
+        stitch_kwargs['geoid_path'] = str(test_data_dir / 'golden_datasets' / 'egm_08_los_angeles.tif')
+    opened = _spy_opened_tiles(mocker, tile_paths)
+
+    dems = stitch_dems(FRAMES_LA, 'glo_30', **stitch_kwargs)
+    # Each tile is opened once for all the frames
+    assert all(len(datasets) == 1 for datasets in opened.values())
+
+    assert len(dems) == len(FRAMES_LA)
+    for bounds, (X, p) in zip(FRAMES_LA, dems):
+        X_expected, p_expected = stitch_dem(bounds, 'glo_30', **stitch_kwargs)
+        assert_array_equal(X, X_expected)
+        assert p == p_expected
+
+
+def test_tiles_are_released_after_last_frame(
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    # The first frame is within the south west tile and the second within the north east one
+    frames = [[-118.045, 33.955, -118.005, 33.995], [-117.995, 34.005, -117.955, 34.045]]
+    tile_sw, tile_ne = tile_paths[1], tile_paths[2]
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=[[tile_sw], [tile_ne]])
+    opened = _spy_opened_tiles(mocker, tile_paths)
+
+    dems = iter_stitch_dems(frames, 'glo_30', dst_ellipsoidal_height=False)
+    assert not opened[tile_sw]
+    next(dems)
+    assert opened[tile_sw][0].closed
+    # Tiles are opened when the first frame overlapping them is stitched
+    assert not opened[tile_ne]
+    next(dems)
+    assert opened[tile_ne][0].closed
+    with pytest.raises(StopIteration):
+        next(dems)
+
+
+def test_stitch_dems_across_dateline(tmp_path: Path, mocker: pytest.MonkeyPatch) -> None:
+    rng = np.random.default_rng(0)
+    n = 120
+    tile_paths = []
+    for lon in [179, -180]:
+        profile = {
+            'driver': 'GTiff',
+            'dtype': 'float32',
+            'nodata': None,
+            'count': 1,
+            'width': n,
+            'height': n,
+            'crs': CRS.from_epsg(4326),
+            'transform': from_origin(lon - 0.5 / n, 1 + 0.5 / n, 1 / n, 1 / n),
+        }
+        tile_path = tmp_path / f'tile_{lon}.tif'
+        with rasterio.open(tile_path, 'w', **profile) as ds:
+            ds.write(rng.uniform(0, 100, size=(1, n, n)).astype(np.float32))
+            ds.update_tags(AREA_OR_POINT='Point')
+        tile_paths.append(str(tile_path))
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', return_value=tile_paths)
+    opened = _spy_opened_tiles(mocker, tile_paths)
+
+    # Frames east of, across (at 180 and -180) and west of the dateline
+    frames = [
+        [179.3, 0.2, 179.9, 0.8],
+        [179.5, 0.2, 180.5, 0.8],
+        [-180.5, 0.2, -179.5, 0.8],
+        [-179.9, 0.2, -179.3, 0.8],
+    ]
+    kwargs = {'dst_ellipsoidal_height': False, 'fill_in_glo_30': False}
+    dems = stitch_dems(frames, 'glo_30', **kwargs)
+    # Tiles are opened once, and again for each frame they are translated across the dateline for
+    assert [len(opened[path]) for path in tile_paths] == [2, 2]
+
+    for bounds, (X, p) in zip(frames, dems):
+        X_expected, p_expected = stitch_dem(bounds, 'glo_30', **kwargs)
+        assert_array_equal(X, X_expected)
+        assert p['transform'] == p_expected['transform']
+
+
+def test_stitch_dems_arguments(mocker: pytest.MonkeyPatch) -> None:
+    # Arguments are validated when called rather than when the first DEM is requested
+    with pytest.raises(ValueError):
+        iter_stitch_dems(FRAMES_LA, 'glo_30', dst_area_or_point='Center')
+
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', return_value=[])
+    with pytest.raises(NoDEMCoverage):
+        stitch_dems(FRAMES_LA, 'glo_30', dst_ellipsoidal_height=False, fill_in_glo_30=False)
@@ -1,5 +1,7 @@
 import shutil
 import subprocess
+import threading
+import tracemalloc
 from collections.abc import Callable
 from pathlib import Path
 
@@ -12,13 +14,24 @@ from osgeo import gdal
 from rasterio import default_gtiff_profile
 from rasterio.crs import CRS
 from rasterio.io import MemoryFile
+from rasterio.transform import from_origin
+from rasterio.warp import transform
 from shapely.geometry import box
 
 from dem_stitcher import get_dem_tile_paths, stitch_dem
 from dem_stitcher.datasets import DATASETS, get_global_dem_tile_extents
 from dem_stitcher.geoid import get_geoid_path, read_geoid
+from dem_stitcher.geoid_cache import GeoidCache
+from dem_stitcher.merge import merge_tile_datasets_within_extent
 from dem_stitcher.rio_tools import reproject_arr_to_match_profile, translate_profile
-from dem_stitcher.stitcher import merge_and_transform_dem_tiles, shift_profile_for_pixel_loc
+from dem_stitcher.rio_window import get_cropped_profile
+from dem_stitcher.stitcher import (
+    download_tiles_to_gtiff,
+    merge_and_transform_dem_tiles,
+    shift_profile_for_pixel_loc,
+    stitch_dem_to_file,
+    stitch_dem_to_profile,
+)
 
 
 """
@@ -295,6 +308,89 @@ def test_legacy_mode_point_and_area_samples_differ(
     assert p_area['transform'] == translate_profile(p_point, 0.5, 0.5)['transform']
 
 
+def _make_memory_glo_datasets(size: int = 1200) -> tuple[list[MemoryFile], list[rasterio.DatasetReader]]:
+    """2 x 2 `glo_30`-like (pixel-centered) tiles of `size` x `size` pixels over Los Angeles."""
+    rng = np.random.default_rng(0)
+    memfiles, datasets = [], []
+    for lat in [34, 35]:
+        for lon in [-118, -117]:
+            profile = default_gtiff_profile.copy()
+            profile.update(
+                {
+                    'dtype': np.float32,
+                    'count': 1,
+                    'height': size,
+                    'width': size,
+                    'crs': CRS.from_epsg(4326),
+                    'transform': Affine(1 / size, 0, lon - 0.5 / size, 0, -1 / size, lat + 1 + 0.5 / size),
+                    'nodata': np.nan,
+                }
+            )
+            memfile = MemoryFile()
+            dataset = memfile.open(**profile)
+            dataset.write(rng.uniform(0, 1_000, size=(1, size, size)).astype(np.float32))
+            dataset.update_tags(AREA_OR_POINT='Point')
+            memfiles.append(memfile)
+            datasets.append(dataset)
+    return memfiles, datasets
+
+
+@pytest.mark.parametrize(
+    'kwargs', [{}, {'dst_area_or_point': 'Area'}, {'merge_nodata_value': 0}, {'max_memory_bytes': 2**20}]
+)
+def test_peak_memory_of_merge_and_transform_dem_tiles(kwargs: dict) -> None:
+    """The geoid is removed in place, so on the grid of the tiles the merged tiles are the only large array."""
+    memfiles, datasets = _make_memory_glo_datasets()
+    bounds = [-117.6, 34.4, -116.4, 35.6]
+    geoid_kwargs = {'geoid_path': get_geoid_path('egm_96'), 'geoid_cache': GeoidCache()}
+    # Reads the geoid into the cache (held across calls) beforehand
+    merge_and_transform_dem_tiles(datasets, [-117.1, 34.9, -117.0, 35.0], 'glo_30', **geoid_kwargs)
+
+    tracemalloc.start()
+    try:
+        dem_arr, _ = merge_and_transform_dem_tiles(datasets, bounds, 'glo_30', **geoid_kwargs, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        [ds.close() for ds in datasets]
+        [mf.close() for mf in memfiles]
+
+    assert dem_arr.shape == (1, 1441, 1441)
+    assert peak <= 1.5 * dem_arr.nbytes
+
+
+@pytest.mark.parametrize('dst_resolution', [1 / 600, 1 / 1700, 1 / 2400])
+def test_resampling_in_blocks_within_max_memory_bytes(dst_resolution: float) -> None:
+    """With `max_memory_bytes` smaller than the merged tiles, they are resampled to `dst_resolution` in blocks."""
+    memfiles, datasets = _make_memory_glo_datasets()
+    bounds = [-117.6, 34.4, -116.4, 35.6]
+    geoid_kwargs = {'geoid_path': get_geoid_path('egm_96'), 'geoid_cache': GeoidCache()}
+    max_memory_bytes = 2**20
+    try:
+        X, p = merge_and_transform_dem_tiles(datasets, bounds, 'glo_30', dst_resolution=dst_resolution, **geoid_kwargs)
+        tracemalloc.start()
+        X_blocks, p_blocks = merge_and_transform_dem_tiles(
+            datasets,
+            bounds,
+            'glo_30',
+            dst_resolution=dst_resolution,
+            max_memory_bytes=max_memory_bytes,
+            **geoid_kwargs,
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        [ds.close() for ds in datasets]
+        [mf.close() for mf in memfiles]
+
+    assert p_blocks == p
+    # Equal within float32 rounding of heights up to 1,000 m
+    assert_allclose(X_blocks, X, atol=1e-4, rtol=0, equal_nan=True)
+    # The merged tiles (1441 x 1441), the output and the blocks within max_memory_bytes
+    merged_bytes = 1441 * 1441 * 4
+    assert peak <= merged_bytes + X_blocks.nbytes + 1.5 * max_memory_bytes
+
+
 def test_bad_dst_area_or_point() -> None:
     with pytest.raises(ValueError, match="dst_area_or_point must be 'Area', 'Point', or None"):
         stitch_dem([-118.8, 34.6, -118.5, 34.8], dem_name='glo_30', dst_area_or_point='foo')
@@ -330,6 +426,39 @@ def test_download_dem(dem_name: str) -> None:
     assert np.isnan(p['nodata'])
 
 
+@pytest.mark.parametrize('src_area_or_point', ['Area', 'Point'])
+def test_localized_geotiff_tiles_are_copied(tmp_path: Path, src_area_or_point: str) -> None:
+    src_path = tmp_path / 'src' / 'Copernicus_DSM_COG_10_N34_00_W119_00_DEM.tif'
+    src_path.parent.mkdir()
+    arr = np.arange(256 * 256, dtype=np.float32).reshape((1, 256, 256))
+    profile = {
+        **default_gtiff_profile,
+        'dtype': 'float32',
+        'nodata': np.nan,
+        'count': 1,
+        'width': 256,
+        'height': 256,
+        'crs': CRS.from_epsg(4326),
+        'transform': Affine(1 / 256, 0, -119, 0, -1 / 256, 35),
+        'compress': 'deflate',
+    }
+    with rasterio.open(src_path, 'w', **profile) as ds:
+        ds.write(arr)
+        ds.update_tags(AREA_OR_POINT=src_area_or_point)
+
+    dest_dir = tmp_path / 'dest'
+    dest_dir.mkdir()
+    [dest_path] = download_tiles_to_gtiff([str(src_path)], 'glo_30', dest_dir)
+
+    with rasterio.open(dest_path) as ds:
+        assert_array_equal(ds.read(), arr)
+        assert ds.tags()['AREA_OR_POINT'] == 'Point'
+        assert ds.profile['compress'] == 'deflate'
+    # Tiles that need no metadata update are identical to the source
+    if src_area_or_point == 'Point':
+        assert Path(dest_path).read_bytes() == src_path.read_bytes()
+
+
 def test_boundary_of_missing_glo_30_data() -> None:
     # See https://github.com/ACCESS-Cloud-Based-InSAR/DockerizedTopsApp/issues/89#issuecomment-1399142499
     bounds = [42.0, 37.0, 44.0, 39.0]
@@ -408,6 +537,11 @@ def test_bad_merge_nodata_value() -> None:
         stitch_dem([-118.8, 34.6, -118.5, 34.8], dem_name='glo_30', merge_nodata_value=3)
 
 
+def test_bad_read_resampling() -> None:
+    with pytest.raises(ValueError, match='read_resampling must be one of'):
+        stitch_dem([-118.8, 34.6, -118.5, 34.8], dem_name='glo_30', dst_resolution=0.01, read_resampling='mean')
+
+
 @pytest.mark.integration
 def test_get_dem_tile_paths_and_output_vrt(test_dir: Path) -> None:
     input_bounds = [-121.5, 34.95, -120.2, 36.25]
@@ -516,6 +650,233 @@ def test_against_legacy_golden_datasets(
     assert transform_golden == p['transform']
 
 
+@pytest.mark.parametrize('hgt_type', ['geoid', 'ellipsoid'])
+@pytest.mark.parametrize('location', ['los_angeles', 'fairbanks'])
+def test_stitch_dem_to_file_against_golden_datasets(
+    location: str,
+    hgt_type: str,
+    tmp_path: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    get_golden_dataset_path: Callable[[str, str], str],
+    get_geoid_for_golden_dataset_test: Callable[[str], tuple[np.ndarray, dict]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    """Stitch the golden datasets in 64 x 64 blocks; the geoid is read (and interpolated) once per block."""
+    if location == 'los_angeles':
+        bounds = [-118.05, 33.95, -117.95, 34.05]
+        dst_resolution = None
+    if location == 'fairbanks':
+        bounds = [-147.75, 64.75, -147.65, 64.85]
+        dst_resolution = 0.0002777777
+
+    mocker.patch(
+        'dem_stitcher.stitcher.get_dem_tile_paths',
+        side_effect=[get_tile_paths_for_comparison_with_golden_dataset(location)],
+    )
+    read_geoid = mocker.patch('dem_stitcher.geoid.read_geoid', return_value=get_geoid_for_golden_dataset_test(location))
+
+    with rasterio.open(get_golden_dataset_path(location, hgt_type)) as ds:
+        X_golden = ds.read(1)
+        transform_golden = ds.transform
+
+    p = stitch_dem_to_file(
+        bounds,
+        'glo_30',
+        tmp_path / 'dem.tif',
+        dst_ellipsoidal_height=(hgt_type == 'ellipsoid'),
+        dst_area_or_point='Point',
+        dst_resolution=dst_resolution,
+        max_block_bytes=2**16,
+        creation_options={'blockxsize': 64, 'blockysize': 64},
+    )
+    with rasterio.open(tmp_path / 'dem.tif') as ds:
+        X = ds.read(1)
+        assert ds.tags()['AREA_OR_POINT'] == 'Point'
+    assert_allclose(X_golden, X, rtol=1e-6, atol=1e-4)
+    assert transform_golden == p['transform']
+    assert p['tiled'] and (p['blockxsize'] == 64)
+    n_blocks = int(np.ceil(X.shape[0] / 64) * np.ceil(X.shape[1] / 64))
+    assert read_geoid.call_count == (n_blocks if hgt_type == 'ellipsoid' else 0)
+
+
+@pytest.mark.parametrize(
+    'stitch_kwargs',
+    [
+        {'dst_area_or_point': 'Area'},
+        {'dst_resolution': 0.0005},
+        {'dst_resolution': 0.0001},
+    ],
+)
+def test_stitch_dem_to_file_matches_stitch_dem(
+    stitch_kwargs: dict,
+    tmp_path: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    bounds = [-118.05, 33.95, -117.95, 34.05]
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=[tile_paths, tile_paths])
+
+    X, p = stitch_dem(bounds, 'glo_30', dst_ellipsoidal_height=False, **stitch_kwargs)
+    p_file = stitch_dem_to_file(
+        bounds,
+        'glo_30',
+        tmp_path / 'dem.tif',
+        dst_ellipsoidal_height=False,
+        max_block_bytes=2**14,
+        creation_options={'blockxsize': 32, 'blockysize': 32},
+        **stitch_kwargs,
+    )
+    with rasterio.open(tmp_path / 'dem.tif') as ds:
+        X_file = ds.read(1)
+    assert p_file['transform'] == p['transform']
+    assert_array_equal(np.isnan(X_file), np.isnan(X))
+    assert_allclose(X_file, X, atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    'stitch_kwargs',
+    [
+        {'geoid_cache': GeoidCache()},
+        {'dst_resolution': 0.0005, 'dst_area_or_point': 'Area', 'merge_nodata_value': 0},
+    ],
+)
+def test_stitch_dem_to_file_in_processes(
+    stitch_kwargs: dict,
+    tmp_path: Path,
+    test_data_dir: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    """Blocks stitched by processes (which reopen the tiles and read the geoid themselves) are identical."""
+    bounds = [-118.05, 33.95, -117.95, 34.05]
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', return_value=tile_paths)
+    file_kwargs = {
+        'geoid_path': str(test_data_dir / 'golden_datasets' / 'egm_08_los_angeles.tif'),
+        'max_block_bytes': 2**14,
+        'creation_options': {'blockxsize': 32, 'blockysize': 32},
+        **stitch_kwargs,
+    }
+
+    p = stitch_dem_to_file(bounds, 'glo_30', tmp_path / 'dem.tif', **file_kwargs)
+    p_processes = stitch_dem_to_file(bounds, 'glo_30', tmp_path / 'dem_processes.tif', n_processes=2, **file_kwargs)
+    with rasterio.open(tmp_path / 'dem.tif') as ds, rasterio.open(tmp_path / 'dem_processes.tif') as ds_processes:
+        X, X_processes = ds.read(1), ds_processes.read(1)
+        assert ds_processes.tags() == ds.tags()
+    assert (p_processes['transform'], p_processes['height'], p_processes['width']) == (
+        p['transform'],
+        p['height'],
+        p['width'],
+    )
+    assert_array_equal(X_processes, X)
+
+    with pytest.raises(ValueError, match='n_processes'):
+        stitch_dem_to_file(bounds, 'glo_30', tmp_path / 'dem.tif', n_processes=0)
+
+
+def test_geoid_is_read_while_tiles_are_merged(
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    get_golden_dataset_path: Callable[[str, str], str],
+    get_geoid_for_golden_dataset_test: Callable[[str], tuple[np.ndarray, dict]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    """The geoid window is read (once) concurrently with the tiles rather than after they are merged."""
+    bounds = [-118.05, 33.95, -117.95, 34.05]
+    mocker.patch(
+        'dem_stitcher.stitcher.get_dem_tile_paths',
+        side_effect=[get_tile_paths_for_comparison_with_golden_dataset('los_angeles')],
+    )
+    geoid = get_geoid_for_golden_dataset_test('los_angeles')
+    geoid_started = threading.Event()
+
+    def read_geoid_mock(*args: object, **kwargs: object) -> tuple[np.ndarray, dict]:
+        geoid_started.set()
+        return geoid
+
+    read_geoid = mocker.patch('dem_stitcher.geoid.read_geoid', side_effect=read_geoid_mock)
+
+    overlapped = []
+
+    def merge_tiles_waiting_for_geoid(*args: object, **kwargs: object) -> tuple[np.ndarray, dict]:
+        overlapped.append(geoid_started.wait(timeout=30))
+        return merge_tile_datasets_within_extent(*args, **kwargs)
+
+    mocker.patch('dem_stitcher.stitcher.merge_tile_datasets_within_extent', side_effect=merge_tiles_waiting_for_geoid)
+
+    X, p = stitch_dem(bounds, dem_name='glo_30', dst_ellipsoidal_height=True, dst_area_or_point='Point')
+    assert overlapped == [True]
+    assert read_geoid.call_count == 1
+
+    with rasterio.open(get_golden_dataset_path('los_angeles', 'ellipsoid')) as ds:
+        X_golden = ds.read(1)
+        transform_golden = ds.transform
+    assert_allclose(X_golden, X, rtol=1e-6, atol=1e-4)
+    assert transform_golden == p['transform']
+
+
+@pytest.mark.parametrize('dst_ellipsoidal_height', [True, False])
+def test_stitch_dem_to_profile_warps_once(
+    dst_ellipsoidal_height: bool,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    get_geoid_for_golden_dataset_test: Callable[[str], tuple[np.ndarray, dict]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    """A UTM grid is resampled once from the tiles, as the native output of `stitch_dem` warped to it."""
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=[tile_paths, tile_paths])
+    read_geoid = mocker.patch(
+        'dem_stitcher.geoid.read_geoid', return_value=get_geoid_for_golden_dataset_test('los_angeles')
+    )
+    utm = CRS.from_epsg(32611)
+    (x,), (y,) = transform(CRS.from_epsg(4326), utm, [-118.035], [34.035])
+    ref_profile = {'crs': utm, 'transform': from_origin(round(x), round(y), 30, 30), 'height': 200, 'width': 200}
+
+    X, p = stitch_dem_to_profile(ref_profile, 'glo_30', dst_ellipsoidal_height=dst_ellipsoidal_height)
+    assert read_geoid.call_count == int(dst_ellipsoidal_height)
+    assert (p['crs'], p['transform'], p['height'], p['width']) == (utm, ref_profile['transform'], 200, 200)
+    assert (np.dtype(p['dtype']), X.dtype, p['count']) == (np.float32, np.float32, 1)
+    assert not np.any(np.isnan(X))
+
+    X_native, p_native = stitch_dem(
+        [-118.05, 33.95, -117.95, 34.05], 'glo_30', dst_ellipsoidal_height=dst_ellipsoidal_height
+    )
+    X_warped, _ = reproject_arr_to_match_profile(X_native, p_native, {**p_native, **ref_profile})
+    assert_allclose(X, X_warped[0], atol=1e-4)
+
+
+def test_stitch_dem_to_profile_crops_aligned_grid(
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=[tile_paths, tile_paths])
+    X_native, p_native = stitch_dem([-118.05, 33.95, -117.95, 34.05], 'glo_30', dst_ellipsoidal_height=False)
+    ref_profile = get_cropped_profile(p_native, slice(10, 110), slice(20, 150))
+
+    X, p = stitch_dem_to_profile(ref_profile, 'glo_30', dst_ellipsoidal_height=False)
+    assert p['transform'] == ref_profile['transform']
+    assert_array_equal(X, X_native[20:150, 10:110])
+
+
+def test_stitch_dem_to_profile_requires_grid() -> None:
+    with pytest.raises(ValueError, match='transform'):
+        stitch_dem_to_profile({'crs': CRS.from_epsg(32611), 'height': 10, 'width': 10}, 'glo_30')
+
+
+@pytest.mark.integration
+def test_stitch_dem_to_file_fills_missing_glo_30(tmp_path: Path) -> None:
+    bounds = [43.9, 38.9, 44.1, 39.1]
+    X, p = stitch_dem(bounds, 'glo_30', dst_ellipsoidal_height=False)
+    p_file = stitch_dem_to_file(bounds, 'glo_30', tmp_path / 'dem.tif', dst_ellipsoidal_height=False)
+    with rasterio.open(tmp_path / 'dem.tif') as ds:
+        X_file = ds.read(1)
+    assert p_file['transform'] == p['transform']
+    assert not np.isnan(X_file).any()
+    # glo_90 is resampled to the output grid per block rather than merged by `rasterio.merge`
+    assert np.nanmedian(np.abs(X_file - X)) < 1
+
+
 @pytest.mark.parametrize('dem_name, geoid_name', [('3dep', 'geoid_18'), ('glo_30', 'egm_08')])
 def test_stitcher_with_bring_your_own_geoid(dem_name: str, geoid_name: str) -> None:
     bounds = [-115.95, 33.85, -115.85, 33.95]
@@ -0,0 +1,300 @@
+import json
+import multiprocessing
+import shutil
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pytest
+import rasterio
+
+from dem_stitcher import stitch_dem
+from dem_stitcher.stitcher import download_tiles_to_gtiff
+from dem_stitcher.tile_cache import TileCache, TileCacheStats
+
+
+def _write_bytes(n: int) -> object:
+    return lambda path: path.write_bytes(b'0' * n)
+
+
+def test_hits_misses_and_bytes_saved(tmp_path: Path) -> None:
+    cache = TileCache(tmp_path / 'cache')
+    assert cache.get('https://a/tile.tif') is None
+    path = cache.put('https://a/tile.tif', 'tile.tif', _write_bytes(10))
+    assert path.read_bytes() == b'0' * 10
+    assert cache.get('https://a/tile.tif') == path
+    assert cache.get_or_put('https://a/tile.tif', 'tile.tif', _write_bytes(20)) == path
+
+    assert cache.stats == TileCacheStats(hits=2, misses=1, bytes_saved=20, bytes_written=10)
+    assert len(cache) == 1
+    assert cache.size() == 10
+
+    # A new instance starts its own counters but sees the counters persisted by all instances
+    cache_2 = TileCache(tmp_path / 'cache')
+    assert cache_2.get('https://a/tile.tif') == path
+    assert cache_2.stats == TileCacheStats(hits=1, bytes_saved=10)
+    assert cache_2.cumulative_stats() == cache.stats + cache_2.stats
+
+    cache.clear()
+    assert len(cache) == 0
+    assert not path.exists()
+    assert cache.cumulative_stats() == TileCacheStats()
+
+
+@pytest.mark.parametrize('policy, evicted', [('lru', 'b'), ('lfu', 'c')])
+def test_eviction(tmp_path: Path, policy: str, evicted: str) -> None:
+    cache = TileCache(tmp_path, max_bytes=30, policy=policy)
+    paths = {name: cache.put(name, f'{name}.tif', _write_bytes(10)) for name in 'abc'}
+    # a is the most recently used; b is used more than c
+    for name in ['b', 'b', 'c', 'a']:
+        cache.get(name)
+
+    cache.put('d', 'd.tif', _write_bytes(10))
+    assert not paths[evicted].exists()
+    assert cache.get(evicted) is None
+    assert cache.size() == 30
+    assert cache.stats.evictions == 1
+    assert cache.stats.bytes_evicted == 10
+
+    # The inserted entry is kept even when it alone exceeds max_bytes
+    path = cache.put('e', 'e.tif', _write_bytes(40))
+    assert path.exists()
+    assert len(cache) == 1
+
+
+def test_pinned_entries_are_not_evicted(tmp_path: Path) -> None:
+    cache = TileCache(tmp_path, max_bytes=10)
+    paths = [cache.get_or_put(name, f'{name}.tif', _write_bytes(8), pin=True) for name in 'abc']
+    assert all(path.exists() for path in paths)
+    assert cache.size() == 24
+    assert cache.stats.evictions == 0
+
+    # Pins are counted; the entry is evicted once all its pins are released
+    cache.get('a', pin=True)
+    cache.unpin(paths)
+    assert paths[0].exists()
+    assert not any(path.exists() for path in paths[1:])
+    assert cache.size() == 8
+    assert cache.stats.evictions == 2
+    cache.unpin(paths[:1] + [tmp_path / 'not_cached.tif'])
+    path_d = cache.put('d', 'd.tif', _write_bytes(8))
+    assert not paths[0].exists()
+    assert path_d.exists()
+    assert cache.stats.evictions == 3
+
+
+def _pin_in_process(root: Path) -> None:
+    TileCache(root).put('a', 'a.tif', _write_bytes(8), pin=True)
+
+
+def test_pins_of_exited_processes_are_ignored(tmp_path: Path) -> None:
+    process = multiprocessing.get_context('spawn').Process(target=_pin_in_process, args=(tmp_path,))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    cache = TileCache(tmp_path, max_bytes=10)
+    path_b = cache.put('b', 'b.tif', _write_bytes(8))
+    assert cache.get('a') is None
+    assert path_b.exists()
+
+
+def test_pins_of_other_hosts_expire(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # A worker on another node pins a tile and crashes before unpinning it
+    monkeypatch.setattr('dem_stitcher.tile_cache._get_pin_holder', lambda: 'another-host:1')
+    path_a = TileCache(tmp_path).put('a', 'a.tif', _write_bytes(8), pin=True)
+    monkeypatch.undo()
+
+    cache = TileCache(tmp_path, max_bytes=10, pin_ttl=3600)
+    cache.put('b', 'b.tif', _write_bytes(8))
+    assert path_a.exists()
+
+    # Once the pin is older than pin_ttl, it is dropped and the entry is evicted
+    time.sleep(0.01)
+    assert TileCache(tmp_path, max_bytes=10, pin_ttl=1e-3).release_stale_pins() == 1
+    assert not path_a.exists()
+    assert cache.size() == 8
+    assert cache.release_stale_pins() == 0
+
+    with pytest.raises(ValueError):
+        TileCache(tmp_path, pin_ttl=0)
+
+
+def test_lookups_do_not_lock_or_write_the_index(tmp_path: Path, mocker: pytest.MonkeyPatch) -> None:
+    cache = TileCache(tmp_path)
+    path_a = cache.put('a', 'a.tif', _write_bytes(8))
+    index_path = tmp_path / 'index.json'
+    content = index_path.read_text()
+
+    locked = mocker.patch('dem_stitcher.tile_cache._locked', side_effect=AssertionError('locked'))
+    assert cache.get('a') == path_a
+    assert cache.get('a', pin=True) == path_a
+    assert cache.get('b') is None
+    cache.unpin([path_a])
+    mocker.stop(locked)
+    assert index_path.read_text() == content
+    assert cache.stats == TileCacheStats(hits=2, misses=1, bytes_saved=16, bytes_written=8)
+
+    # Hits are logged and misses are written with the next update of the index, which merges the log
+    assert cache.cumulative_stats() == TileCacheStats(hits=2, bytes_saved=16, bytes_written=8)
+    cache.put('b', 'b.tif', _write_bytes(8))
+    assert cache.cumulative_stats() == cache.stats
+    assert list((tmp_path / '.logs').iterdir()) == []
+    assert 'pins' not in json.loads(index_path.read_text())['entries'][TileCache.key('a')]
+
+
+def test_pins_logged_during_eviction_are_seen(tmp_path: Path, mocker: pytest.MonkeyPatch) -> None:
+    cache = TileCache(tmp_path, max_bytes=10)
+    path_a = cache.put('a', 'a.tif', _write_bytes(8))
+
+    # Another instance pins a after the logs are merged but before its tile is moved aside for eviction
+    other = TileCache(tmp_path, max_bytes=10)
+    merge_logs = cache._merge_logs
+    n_merges = []
+
+    def merge_logs_with_pin(index: dict) -> None:
+        n_merges.append(1)
+        if len(n_merges) == 2:
+            other._log(TileCache.key('a'), [{'type': 'pin'}])
+        merge_logs(index)
+
+    mocker.patch.object(cache, '_merge_logs', side_effect=merge_logs_with_pin)
+    cache.put('b', 'b.tif', _write_bytes(8))
+    assert path_a.exists()
+    assert cache.stats.evictions == 0
+
+    other.unpin([path_a])
+    assert not path_a.exists()
+    assert cache.size() == 8
+    assert cache.release_stale_pins() == 0
+
+
+def test_reading_counters_does_not_write_the_index(tmp_path: Path) -> None:
+    cache = TileCache(tmp_path)
+    cache.put('a', 'a.tif', _write_bytes(8))
+    index_path = tmp_path / 'index.json'
+    mtime_ns, content = index_path.stat().st_mtime_ns, index_path.read_text()
+    assert (cache.size(), len(cache), cache.cumulative_stats().bytes_written) == (8, 1, 8)
+    assert index_path.stat().st_mtime_ns == mtime_ns
+    assert index_path.read_text() == content
+
+
+def test_failed_write_leaves_no_entry(tmp_path: Path) -> None:
+    cache = TileCache(tmp_path)
+
+    def fail(path: Path) -> None:
+        path.write_bytes(b'partial')
+        raise RuntimeError('download interrupted')
+
+    with pytest.raises(RuntimeError):
+        cache.put('https://a/tile.tif', 'tile.tif', fail)
+    assert cache.get('https://a/tile.tif') is None
+    assert list(tmp_path.glob('**/*.tif')) == []
+
+
+def test_entry_removed_by_hand_is_a_miss(tmp_path: Path) -> None:
+    cache = TileCache(tmp_path)
+    cache.put('https://a/tile.tif', 'tile.tif', _write_bytes(10)).unlink()
+    assert cache.get('https://a/tile.tif') is None
+    assert len(cache) == 0
+
+
+def test_bad_cache_arguments(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        TileCache(tmp_path, policy='fifo')
+    with pytest.raises(ValueError):
+        TileCache(tmp_path, max_bytes=-1)
+
+
+def _get_or_put_in_process(args: tuple[Path, int]) -> None:
+    root, i = args
+    cache = TileCache(root, max_bytes=50)
+    for j in range(10):
+        cache.get_or_put(f'tile_{(i + j) % 8}', 'tile.tif', _write_bytes(10))
+
+
+def test_concurrent_processes(tmp_path: Path) -> None:
+    with multiprocessing.get_context('spawn').Pool(4) as pool:
+        pool.map(_get_or_put_in_process, [(tmp_path, i) for i in range(4)])
+
+    cache = TileCache(tmp_path, max_bytes=50)
+    stats = cache.cumulative_stats()
+    # Each access is recorded (none are lost to concurrent index updates) and the size bound holds
+    assert stats.hits + stats.misses == 40
+    assert stats.bytes_written == 10 * stats.misses
+    assert cache.size() == 50
+    assert len(list(tmp_path.glob('*/*/tile.tif'))) == 5
+
+
+def _pin_and_read_in_process(args: tuple[Path, int]) -> None:
+    root, i = args
+    cache = TileCache(root, max_bytes=50)
+    for j in range(20):
+        paths = [cache.get_or_put(f'tile_{(i + j + k) % 12}', 'tile.tif', _write_bytes(10), pin=True) for k in range(3)]
+        # Pinned tiles are not evicted by the other processes while they are read
+        assert all(path.read_bytes() == b'0' * 10 for path in paths)
+        cache.unpin(paths)
+
+
+def test_concurrent_processes_with_pins(tmp_path: Path) -> None:
+    with multiprocessing.get_context('spawn').Pool(4) as pool:
+        pool.map(_pin_and_read_in_process, [(tmp_path, 3 * i) for i in range(4)])
+
+    cache = TileCache(tmp_path, max_bytes=50)
+    stats = cache.cumulative_stats()
+    assert stats.hits + stats.misses == 240
+    assert stats.bytes_written == 10 * stats.misses
+    assert cache.size() == 50
+    assert cache.release_stale_pins() == 0
+    assert list((tmp_path / '.logs').iterdir()) == []
+
+
+def test_download_tiles_to_gtiff_through_cache(test_data_dir: Path, tmp_path: Path) -> None:
+    urls = sorted(map(str, (test_data_dir / 'stitcher' / 'merge_tiles').glob('u*.tif')))
+    cache = TileCache(tmp_path / 'cache')
+
+    cached_paths = download_tiles_to_gtiff(urls, 'glo_30', None, tile_cache=cache)
+    assert cache.stats == TileCacheStats(misses=2, bytes_written=cache.size())
+    assert all(Path(path).parent.parent.parent == cache.root for path in cached_paths)
+
+    dest_paths = download_tiles_to_gtiff(urls, 'glo_30', tmp_path, tile_cache=cache)
+    assert dest_paths == [str(tmp_path / Path(url).name) for url in urls]
+    assert cache.stats.hits == 2
+    assert cache.stats.bytes_saved == cache.size()
+
+    for url, cached_path, dest_path in zip(urls, cached_paths, dest_paths):
+        with rasterio.open(url) as ds:
+            arr = ds.read()
+        for path in [cached_path, dest_path]:
+            with rasterio.open(path) as ds:
+                np.testing.assert_array_equal(ds.read(), arr)
+                assert ds.tags()['AREA_OR_POINT'] == 'Point'
+
+    with pytest.raises(ValueError):
+        download_tiles_to_gtiff(urls, 'glo_30', None)
+
+
+def test_stitch_dem_with_tiles_exceeding_max_bytes(
+    tmp_path: Path,
+    get_glo_30_urls_of_golden_tiles: Callable[[list[float]], dict[str, str]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    bounds = [-118.05, 33.95, -117.95, 34.05]
+    golden_tiles = get_glo_30_urls_of_golden_tiles(bounds)
+    assert len(golden_tiles) == 4
+
+    def copy_golden_tile(url: str, dest_path: Path, reader: Callable, dem_name: str) -> dict:
+        shutil.copyfile(golden_tiles[url], dest_path)
+
+    mocker.patch('dem_stitcher.stitcher._download_and_write_one_tile_to_gtiff', side_effect=copy_golden_tile)
+    kwargs = {'dst_ellipsoidal_height': False, 'fill_in_glo_30': False, 'progress': False}
+    X, _ = stitch_dem(bounds, 'glo_30', tile_cache=TileCache(tmp_path / 'unbounded'), **kwargs)
+
+    # Each tile alone exceeds the cache, so the tiles are only kept while they are stitched
+    cache = TileCache(tmp_path / 'bounded', max_bytes=1)
+    X_bounded, _ = stitch_dem(bounds, 'glo_30', tile_cache=cache, **kwargs)
+    np.testing.assert_array_equal(X_bounded, X)
+    assert cache.stats.misses == 4
+    assert cache.stats.evictions == 4
+    assert len(cache) == 0
@@ -0,0 +1,155 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pytest
+import rasterio
+from numpy.testing import assert_allclose, assert_array_equal
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+
+from dem_stitcher import stitch_dem, stitch_dem_to_vrt
+from dem_stitcher.vrt import open_translated_dataset, to_gdal_path
+
+
+BOUNDS_LA = [-118.05, 33.95, -117.95, 34.05]
+
+
+@pytest.mark.parametrize(
+    'stitch_kwargs',
+    [
+        {},
+        {'dst_ellipsoidal_height': False},
+        {'dst_area_or_point': 'Area'},
+        {'dst_resolution': 0.0002},
+        {'merge_nodata_value': 0},
+    ],
+)
+def test_vrt_matches_stitch_dem(
+    stitch_kwargs: dict,
+    tmp_path: Path,
+    test_data_dir: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    get_geoid_for_golden_dataset_test: Callable[[str], tuple[np.ndarray, dict]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=[tile_paths, tile_paths])
+    mocker.patch('dem_stitcher.geoid.read_geoid', return_value=get_geoid_for_golden_dataset_test('los_angeles'))
+    X, p = stitch_dem(BOUNDS_LA, 'glo_30', **stitch_kwargs)
+
+    vrt_kwargs = stitch_kwargs.copy()
+    if stitch_kwargs.get('dst_ellipsoidal_height', True):
+        vrt_kwargs['geoid_path'] = str(test_data_dir / 'golden_datasets' / 'egm_08_los_angeles.tif')
+    p_vrt = stitch_dem_to_vrt(BOUNDS_LA, 'glo_30', tmp_path / 'dem.vrt', **vrt_kwargs)
+
+    with rasterio.open(tmp_path / 'dem.vrt') as ds:
+        X_vrt = ds.read(1)
+        assert ds.tags()['AREA_OR_POINT'] == stitch_kwargs.get('dst_area_or_point', 'Point')
+        assert (ds.transform, ds.crs) == (p['transform'], p['crs'])
+    assert (p_vrt['transform'], p_vrt['height'], p_vrt['width']) == (p['transform'], p['height'], p['width'])
+    # The geoid is resampled by gdal's RasterIO rather than the separable interpolation (float32 rounding)
+    assert_allclose(X_vrt, X, atol=1e-4)
+
+
+def test_vrt_reads_only_windows(
+    tmp_path: Path,
+    get_tile_paths_for_comparison_with_golden_dataset: Callable[[str], list[str]],
+    mocker: pytest.MonkeyPatch,
+) -> None:
+    tile_paths = get_tile_paths_for_comparison_with_golden_dataset('los_angeles')
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=[tile_paths, tile_paths])
+    open_spy = mocker.spy(rasterio, 'open')
+    stitch_dem_to_vrt(BOUNDS_LA, 'glo_30', tmp_path / 'dem.vrt', dst_ellipsoidal_height=False)
+    # Only the tile headers are read to write the VRT
+    assert open_spy.call_count == len(tile_paths)
+
+    X, _ = stitch_dem(BOUNDS_LA, 'glo_30', dst_ellipsoidal_height=False)
+    with rasterio.open(tmp_path / 'dem.vrt') as ds:
+        window = ((100, 150), (200, 260))
+        assert_array_equal(ds.read(1, window=window), X[100:150, 200:260])
+
+
+def test_vrt_across_dateline(tmp_path: Path, mocker: pytest.MonkeyPatch) -> None:
+    """Tiles on either side of the dateline are placed contiguously by the VRT (no translated copies)."""
+    rng = np.random.default_rng(0)
+    n = 120
+    tile_paths = []
+    for lon in [179, -180]:
+        profile = {
+            'driver': 'GTiff',
+            'dtype': 'float32',
+            'nodata': None,
+            'count': 1,
+            'width': n,
+            'height': n,
+            'crs': CRS.from_epsg(4326),
+            'transform': from_origin(lon - 0.5 / n, 1 + 0.5 / n, 1 / n, 1 / n),
+        }
+        tile_path = tmp_path / f'tile_{lon}.tif'
+        with rasterio.open(tile_path, 'w', **profile) as ds:
+            ds.write(rng.uniform(0, 100, size=(1, n, n)).astype(np.float32))
+            ds.update_tags(AREA_OR_POINT='Point')
+        tile_paths.append(str(tile_path))
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=[tile_paths, tile_paths])
+
+    bounds = [179.5, 0.2, 180.5, 0.8]
+    X, p = stitch_dem(bounds, 'glo_30', dst_ellipsoidal_height=False, fill_in_glo_30=False)
+    p_vrt = stitch_dem_to_vrt(
+        bounds, 'glo_30', tmp_path / 'dem.vrt', dst_ellipsoidal_height=False, fill_in_glo_30=False
+    )
+    with rasterio.open(tmp_path / 'dem.vrt') as ds:
+        X_vrt = ds.read(1)
+    assert p_vrt['transform'] == p['transform']
+    assert_array_equal(X_vrt, X)
+
+    # The first tile is translated across the dateline
+    mocker.patch('dem_stitcher.stitcher.get_dem_tile_paths', side_effect=[tile_paths])
+    _, p_west = stitch_dem([-180.5, 0.2, -179.5, 0.8], 'glo_30', dst_ellipsoidal_height=False, fill_in_glo_30=False)
+    assert p_west['driver'] == 'GTiff'
+
+
+def test_translated_dataset_is_not_copied(test_data_dir: Path) -> None:
+    data_dir = test_data_dir / 'dateline' / 'translate_datasets'
+    ds_left = rasterio.open(data_dir / 'left.tif')
+    with rasterio.open(data_dir / 'right.tif') as ds_right:
+        X_right, t_right = ds_right.read(), ds_right.transform
+
+    with open_translated_dataset(ds_left, 360 / ds_left.res[0], 0) as ds_left_t:
+        assert ds_left.closed
+        assert ds_left_t.driver == 'VRT'
+        assert ds_left_t.transform == t_right
+        assert ds_left_t.profile['dtype'] == 'uint8'
+        assert_array_equal(ds_left_t.read(), X_right)
+        assert_array_equal(ds_left_t.read(1, window=((2, 5), (3, 9))), X_right[0, 2:5, 3:9])
+
+
+def test_vrt_requires_tiles_that_persist(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match='dst_tile_dir'):
+        stitch_dem_to_vrt([-118.05, 33.95, -117.95, 34.05], 'srtm_v3', tmp_path / 'dem.vrt')
+
+
+def test_vrt_fill_dems_share_geoid(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match='geoid'):
+        stitch_dem_to_vrt(
+            [-118.05, 33.95, -117.95, 34.05],
+            'glo_30',
+            tmp_path / 'dem.vrt',
+            fill_dem_names=['srtm_v3'],
+            dst_tile_dir=tmp_path / 'tiles',
+        )
+
+
+@pytest.mark.parametrize(
+    'path, gdal_path',
+    [
+        (
+            'https://copernicus-dem-30m.s3.amazonaws.com/tile.tif',
+            '/vsicurl/https://copernicus-dem-30m.s3.amazonaws.com/tile.tif',
+        ),
+        ('s3://bucket/key/tile.tif', '/vsis3/bucket/key/tile.tif'),
+        ('/vsizip/tiles.zip/tile.hgt', '/vsizip/tiles.zip/tile.hgt'),
+    ],
+)
+def test_to_gdal_path(path: str, gdal_path: str) -> None:
+    assert to_gdal_path(path) == gdal_path
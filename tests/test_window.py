@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import geopandas as gpd
@@ -15,8 +16,10 @@ from dem_stitcher.geoid import get_geoid_path, read_geoid
 from dem_stitcher.rio_window import (
     get_cropped_profile,
     get_indices_from_extent,
+    get_transformer,
     get_window_from_extent,
     read_raster_from_window,
+    transform_bounds,
 )
 
 
@@ -312,3 +315,27 @@ def test_get_cropped_profile() -> None:
 
     profile_cropped_actual = get_cropped_profile(profile, np.s_[start_x:end_x], np.s_[start_y:end_y])
     assert all(profile_cropped_actual[k] == profile_cropped_expected[k] for k in profile_cropped_expected.keys())
+
+
+def test_transform_bounds_caches_transformers() -> None:
+    get_transformer.cache_clear()
+    bounds = [-118.5, 34.0, -118.0, 34.5]
+    # Equal CRSs (however specified) are an identity without a transformer
+    assert transform_bounds(bounds, CRS.from_epsg(4326), 'EPSG:4326') == bounds
+    assert get_transformer.cache_info().currsize == 0
+
+    bounds_utm = transform_bounds(bounds, CRS.from_epsg(4326), CRS.from_epsg(32611))
+    assert get_transformer.cache_info().misses == 1
+    # Windows are computed in threads; all share the single cached transformer
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(lambda _: transform_bounds(bounds, CRS.from_epsg(4326), CRS.from_epsg(32611)), range(64))
+        )
+    assert all(result == bounds_utm for result in results)
+    assert get_transformer.cache_info().misses == 1
+    assert get_transformer.cache_info().hits == 64
+
+    # epsg:4269 is transformed by PROJ (a null offset without NAD83 grids) rather than assumed equal to epsg:4326
+    bounds_4269 = transform_bounds(bounds, CRS.from_epsg(4326), CRS.from_epsg(4269))
+    assert get_transformer.cache_info().currsize == 2
+    np.testing.assert_allclose(bounds_4269, bounds, atol=1e-4)